@@ -7,21 +7,71 @@ serial devices, and Docker containers.
 
 from importlib.metadata import version
 
+from ._pexpect_helpers import (
+    PatternCacheInfo,
+    clear_pattern_cache,
+    pattern_cache_info,
+)
+from .async_pexpect_io import AsyncPexpectIO
+from .async_templated_io import AsyncTemplatedIO
+from .device_group import DeviceGroup
 from .device_io import DeviceIO
 from .docker_io import DockerExecConfig, DockerExecIO, DockerRunConfig, DockerRunIO
+from .file_transfer import TransferError, TransferResult
+from .log_sink import FileSink, LogSink, MemorySink, QueueSink, StdoutSink, TeeSink
 from .process_io import ProcessIO
-from .ssh_io import SSHConfig, SSHProcessIO
-from .templated_io import TemplatedIO
+from .reactor import Reactor
+from .reconnect_policy import ReconnectPolicy
+from .replay_io import ReplayError, ReplayIO
+from .send_pacing import SendPacing
+from .serial_reader import SerialReader
+from .session_group import SessionGroup, SessionResult
+from .session_pool import SessionPool
+from .session_recorder import RecordedChunk, SessionRecorder, read_recording
+from .ssh_io import SSHConfig, SSHProcessIO, close_shared_connections
+from .templated_io import FailurePatternError, IOOptions, PatternMatch, TemplatedIO
+from .transcript import TranscriptBuffer
 
 __version__ = version("blabot")
 __all__ = [
+    "AsyncPexpectIO",
+    "AsyncTemplatedIO",
+    "DeviceGroup",
     "DeviceIO",
     "DockerExecConfig",
     "DockerExecIO",
     "DockerRunConfig",
     "DockerRunIO",
+    "FailurePatternError",
+    "FileSink",
+    "IOOptions",
+    "LogSink",
+    "MemorySink",
+    "PatternCacheInfo",
+    "PatternMatch",
     "ProcessIO",
+    "QueueSink",
+    "Reactor",
+    "ReconnectPolicy",
+    "RecordedChunk",
+    "ReplayError",
+    "ReplayIO",
     "SSHConfig",
     "SSHProcessIO",
+    "SendPacing",
+    "SerialReader",
+    "SessionGroup",
+    "SessionPool",
+    "SessionRecorder",
+    "SessionResult",
+    "StdoutSink",
+    "TeeSink",
     "TemplatedIO",
+    "TranscriptBuffer",
+    "TransferError",
+    "TransferResult",
+    "clear_pattern_cache",
+    "close_shared_connections",
+    "pattern_cache_info",
+    "read_recording",
 ]
@@ -1,13 +1,887 @@
 """Helper functions for pexpect-based process communication."""
 
+import asyncio
+import functools
+import io
+import re
+import time
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import NamedTuple
+
 import pexpect
+from pexpect.expect import Expecter, searcher_re, searcher_string
 from pexpect_serial import SerialSpawn
 
+from .log_sink import TeeSink
+from .send_pacing import SendPacer
+from .templated_io import FailurePatternError, IOOptions, PatternMatch
+from .transcript import TranscriptBuffer
+
+# Upper bound of distinct pattern lists kept compiled across all sessions.
+_PATTERN_CACHE_SIZE = 256
+
+# Pattern list type accepted by pexpect's `expect_list`
+PatternList = list[re.Pattern | type[pexpect.EOF] | type[pexpect.TIMEOUT]]
+
+# Patterns are text, or bytes matched against the raw output as they are
+Patterns = Sequence[str | bytes]
+
+
+@functools.lru_cache(maxsize=_PATTERN_CACHE_SIZE)
+def _compile_patterns(
+    patterns: tuple[str | bytes, ...],
+    *,
+    as_bytes: bool,
+    ignorecase: bool,
+) -> tuple[re.Pattern, ...]:
+    """Compile a pattern list the same way pexpect's compile_pattern_list does.
+
+    Args:
+        patterns: Regular expression patterns to compile. Text patterns are
+            encoded as UTF-8 for processes working on bytes.
+        as_bytes: Whether the process works on bytes (no encoding configured).
+        ignorecase: Whether the process matches case-insensitively.
+
+    Returns:
+        Compiled patterns in the same order as given.
+
+    """
+    # pexpect lets dot match newlines
+    flags = re.DOTALL
+    if ignorecase:
+        flags |= re.IGNORECASE
+
+    if as_bytes:
+        return tuple(re.compile(_encode(p), flags) for p in patterns)
+    return tuple(re.compile(p, flags) for p in patterns)
+
+
+def _encode(pattern: str | bytes) -> bytes:
+    """Encode a text pattern as UTF-8, leaving bytes patterns as they are."""
+    return pattern if isinstance(pattern, bytes) else pattern.encode("utf-8")
+
+
+def compile_patterns(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: Patterns,
+) -> PatternList:
+    """Get compiled patterns for the process from the process-wide cache.
+
+    Args:
+        process: pexpect-compatible process object.
+        patterns: Regular expression patterns to compile.
+
+    Returns:
+        Compiled patterns ready to be passed to `expect_list`.
+
+    """
+    compiled: PatternList = []
+    compiled += _compile_patterns(
+        tuple(patterns),
+        as_bytes=process.encoding is None,
+        ignorecase=bool(process.ignorecase),
+    )
+    return compiled
+
+
+# Patterns made of ordinary characters and escaped punctuation only
+_LITERAL_PATTERN = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^0-9A-Za-z])*", re.DOTALL)
+_ESCAPED_CHARACTER = re.compile(r"\\(.)", re.DOTALL)
+_LITERAL_BYTES = re.compile(_LITERAL_PATTERN.pattern.encode(), re.DOTALL)
+_ESCAPED_BYTE = re.compile(_ESCAPED_CHARACTER.pattern.encode(), re.DOTALL)
+
+
+# Literal strings of a pattern list, all text or all bytes
+Literals = tuple[bytes, ...] | tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=_PATTERN_CACHE_SIZE)
+def _compile_literals(
+    patterns: tuple[str | bytes, ...],
+    *,
+    as_bytes: bool,
+) -> Literals | None:
+    """Turn a pattern list into literals if none of them needs a regex.
+
+    Escaped punctuation such as produced by `re.escape` counts as literal.
+
+    Args:
+        patterns: Regular expression patterns.
+        as_bytes: Whether the process works on bytes (no encoding configured).
+
+    Returns:
+        The literals in pattern order, or None if a pattern uses regular
+        expression syntax.
+
+    """
+    if as_bytes:
+        encoded = [_encode(p) for p in patterns]
+        if not all(_LITERAL_BYTES.fullmatch(p) for p in encoded):
+            return None
+        return tuple(_ESCAPED_BYTE.sub(rb"\1", p) for p in encoded)
+
+    texts = [p for p in patterns if isinstance(p, str)]
+    if len(texts) < len(patterns) or not all(
+        _LITERAL_PATTERN.fullmatch(p) for p in texts
+    ):
+        return None
+    return tuple(_ESCAPED_CHARACTER.sub(r"\1", p) for p in texts)
+
+
+# Number of literals from which one automaton pass beats a substring search
+# per literal. Measured on 2000-byte reads of random text with 4 to 12 byte
+# literals: 10 literals take 16 us with find and 410 us with the automaton,
+# 300 take 630 us and 580 us, 1000 take 1960 us and 470 us.
+_AUTOMATON_MIN_LITERALS = 300
+
+
+@dataclass(frozen=True)
+class _LiteralAutomaton:
+    """Aho-Corasick automaton finding many literals in one pass.
+
+    Attributes:
+        transitions: Next state by symbol for each state.
+        fallbacks: State of the longest proper suffix for each state.
+        outputs: (length, index) of the literals ending in each state.
+
+    """
+
+    transitions: list[dict[object, int]]
+    fallbacks: list[int]
+    outputs: list[tuple[tuple[int, int], ...]]
+
+
+@functools.lru_cache(maxsize=_PATTERN_CACHE_SIZE)
+def _build_automaton(literals: Literals) -> _LiteralAutomaton:
+    """Build the automaton of a literal list.
+
+    Args:
+        literals: Non-empty literals, all text or all bytes.
+
+    Returns:
+        Automaton whose outputs refer to the literals by index.
+
+    """
+    transitions: list[dict[object, int]] = [{}]
+    outputs: list[tuple[tuple[int, int], ...]] = [()]
+    for index, literal in enumerate(literals):
+        state = 0
+        for symbol in literal:
+            if symbol not in transitions[state]:
+                transitions[state][symbol] = len(transitions)
+                transitions.append({})
+                outputs.append(())
+            state = transitions[state][symbol]
+        outputs[state] += ((len(literal), index),)
+
+    fallbacks = [0] * len(transitions)
+    queue = deque(transitions[0].values())
+    while queue:
+        state = queue.popleft()
+        for symbol, child in transitions[state].items():
+            queue.append(child)
+            fallback = fallbacks[state]
+            while fallback and symbol not in transitions[fallback]:
+                fallback = fallbacks[fallback]
+            fallbacks[child] = transitions[fallback].get(symbol, 0)
+            outputs[child] += outputs[fallbacks[child]]
+    return _LiteralAutomaton(transitions, fallbacks, outputs)
+
+
+class _LiteralSearcher(searcher_string):
+    """pexpect searcher finding literal strings in the fresh output only.
+
+    Unlike pexpect's regex searcher, which rescans the whole buffer on every
+    read, only the newly read output and the few bytes before it where a
+    literal could start are searched. A few literals are searched with one
+    substring search each, which runs in C and stops where it could no
+    longer beat the earliest match found so far. From
+    `_AUTOMATON_MIN_LITERALS` literals on, one pass of an Aho-Corasick
+    automaton is faster despite running in Python. Like pexpect's
+    searchers, the earliest match wins and ties go to the first pattern.
+    """
+
+    def __init__(self, literals: Literals) -> None:
+        super().__init__(list(literals))
+        self._literals = literals
+        self._overlap = max(len(literal) for literal in literals)
+        self._automaton = (
+            _build_automaton(literals)
+            if len(literals) >= _AUTOMATON_MIN_LITERALS
+            else None
+        )
+        self.start = -1
+        self.end = -1
+        self.match: bytes | str | None = None
+
+    def search(
+        self,
+        buffer: bytes | str,
+        freshlen: int,
+        searchwindowsize: int | None = None,
+    ) -> int:
+        """Search the buffer like pexpect's searchers do.
+
+        Returns:
+            Index of the matched literal, or -1 if none is found.
+
+        """
+        searchstart = max(0, len(buffer) - freshlen - self._overlap)
+        if searchwindowsize is not None:
+            searchstart = max(searchstart, len(buffer) - searchwindowsize)
+
+        if self._automaton:
+            best_index, best_start = self._scan(self._automaton, buffer, searchstart)
+        else:
+            best_index, best_start = self._find(buffer, searchstart)
+        if best_index < 0:
+            return -1
+
+        self.match = self._literals[best_index]
+        self.start = best_start
+        self.end = best_start + len(self.match)
+        return best_index
+
+    def _find(self, buffer: bytes | str, searchstart: int) -> tuple[int, int]:
+        """Find the earliest literal with one substring search per literal."""
+        best_index = -1
+        best_start = len(buffer)
+        for index, literal in enumerate(self._literals):
+            # A match starting at or after the best one cannot win
+            limit = min(best_start - 1 + len(literal), len(buffer))
+            start = buffer.find(literal, searchstart, limit)  # type: ignore[arg-type]
+            if start >= 0:
+                best_index, best_start = index, start
+        return best_index, best_start
+
+    def _scan(
+        self, automaton: _LiteralAutomaton, buffer: bytes | str, searchstart: int
+    ) -> tuple[int, int]:
+        """Find the earliest literal in one pass of the automaton."""
+        transitions, fallbacks = automaton.transitions, automaton.fallbacks
+        outputs = automaton.outputs
+        best_index = -1
+        best_start = len(buffer)
+        # Matches ending after `stop` start after the best match
+        stop = best_start + self._overlap
+        state = 0
+        for end, symbol in enumerate(buffer[searchstart:], searchstart + 1):
+            if end > stop:
+                break
+            next_state = transitions[state].get(symbol)
+            while next_state is None:
+                if not state:
+                    next_state = 0
+                    break
+                state = fallbacks[state]
+                next_state = transitions[state].get(symbol)
+            state = next_state
+            for length, index in outputs[state]:
+                if (end - length, index) < (best_start, best_index):
+                    best_index, best_start = index, end - length
+                    stop = best_start + self._overlap
+        return best_index, best_start
+
+
+def _literals_for(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: Patterns,
+) -> Literals | None:
+    """Get the patterns as literals if the process can search them so."""
+    if process.ignorecase:
+        return None
+    return _compile_literals(tuple(patterns), as_bytes=process.encoding is None)
+
+
+def make_searcher(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: Patterns,
+) -> searcher_re | _LiteralSearcher:
+    """Create a pexpect searcher for the patterns.
+
+    Plain literals are searched with a substring search over the fresh output
+    only, everything else with pexpect's regex searcher over cached compiled
+    patterns.
+
+    Args:
+        process: pexpect-compatible process object.
+        patterns: Regular expression patterns to search for.
+
+    Returns:
+        Searcher for one expect call.
+
+    """
+    literals = _literals_for(process, patterns)
+    if literals:
+        return _LiteralSearcher(literals)
+    return searcher_re(compile_patterns(process, patterns))
+
+
+class PatternCacheInfo(NamedTuple):
+    """Statistics of the compiled pattern caches.
+
+    Attributes:
+        hits: Number of lookups served from the caches.
+        misses: Number of lookups that compiled the patterns.
+        maxsize: Maximum number of entries of the caches together.
+        currsize: Number of entries currently cached.
+
+    """
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def pattern_cache_info() -> PatternCacheInfo:
+    """Get statistics of the compiled pattern caches.
+
+    Pattern lists are looked up both as literals and, unless all patterns are
+    literal, as compiled regular expressions. The statistics of both caches
+    are added up.
+
+    Returns:
+        Hits, misses, maximum size and current size of the caches.
+
+    """
+    regexes = _compile_patterns.cache_info()
+    literals = _compile_literals.cache_info()
+    return PatternCacheInfo(
+        hits=regexes.hits + literals.hits,
+        misses=regexes.misses + literals.misses,
+        maxsize=_PATTERN_CACHE_SIZE * 2,
+        currsize=regexes.currsize + literals.currsize,
+    )
+
+
+def clear_pattern_cache() -> None:
+    """Clear the compiled pattern cache and reset its statistics."""
+    _compile_patterns.cache_clear()
+    _compile_literals.cache_clear()
+    _build_automaton.cache_clear()
+
+
+def _check_patterns(patterns: Patterns) -> None:
+    """Check that at least one expected pattern is given.
+
+    Raises:
+        ValueError: If no pattern is given.
+
+    """
+    if not patterns:
+        msg = "At least one pattern is required"
+        raise ValueError(msg)
+
+
+def _matched_result(
+    process: pexpect.spawn | SerialSpawn,
+    index: int,
+    patterns: list[str],
+    failures: list[str],
+) -> tuple[int, str]:
+    """Build the result of a successful expect call.
+
+    Raises:
+        TypeError: If the matched output is not bytes.
+        FailurePatternError: If the matched pattern is a failure pattern.
+
+    """
+    if not isinstance(process.after, bytes):
+        err_msg = "Expected bytes from process.after"
+        raise TypeError(err_msg)
+
+    matched = process.after.decode("utf-8")
+    if failures and index >= len(patterns):
+        raise FailurePatternError(failures[index - len(patterns)], matched)
+
+    return index, matched
+
+
+def setup_process(
+    process: pexpect.spawn | SerialSpawn,
+    options: IOOptions,
+    transcript: TranscriptBuffer | None,
+) -> None:
+    """Configure a newly started process for an IO instance.
+
+    Args:
+        process: pexpect-compatible process object.
+        options: Options of the IO instance.
+        transcript: Buffer keeping the latest received bytes.
+
+    """
+    process.logfile = options.log_sink
+    process.logfile_read = transcript
+    if options.recorder:
+        received = options.recorder.received
+        process.logfile_read = TeeSink(transcript, received) if transcript else received
+        process.logfile_send = options.recorder.sent
+    # Sends are paced by the IO instead of a fixed sleep before each send
+    process.delaybeforesend = None
+    process.maxread = options.maxread
+    process.searchwindowsize = options.search_window_size
+    if options.reactor:
+        options.reactor.attach(process)
+
+
+class BufferLimit:
+    """Bound on the output kept by a process between matches.
+
+    pexpect keeps all output since the last match, both as `before` and as
+    the buffer that patterns are searched in. Once it exceeds twice
+    `max_size` bytes, only the latest `max_size` bytes are kept and the rest
+    is counted in `discarded_bytes`. Patterns can no longer match discarded
+    output, and it is missing from `before`. The output before a match is
+    trimmed the same way, so `before` never exceeds twice `max_size` bytes.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize BufferLimit instance.
+
+        Args:
+            max_size: Number of unmatched bytes to keep. Must be at least 1.
+
+        Raises:
+            ValueError: If max_size is less than 1.
+
+        """
+        if max_size < 1:
+            msg = f"max_size must be at least 1, got {max_size}"
+            raise ValueError(msg)
+
+        self.max_size = max_size
+        self.discarded_bytes = 0
+
+    def trim(self, process: pexpect.spawn | SerialSpawn) -> None:
+        """Discard the oldest unmatched output of the process if too large.
+
+        Args:
+            process: pexpect-compatible process object.
+
+        """
+        # Trimming only at twice the size keeps the copying cost per byte flat
+        before = process._before  # type: ignore[union-attr]  # noqa: SLF001
+        size = before.seek(0, io.SEEK_END)
+        if size <= 2 * self.max_size:
+            return
+
+        self.discarded_bytes += size - self.max_size
+        process._before = self._tail(before)  # type: ignore[union-attr]  # noqa: SLF001
+        buffer = process._buffer  # type: ignore[union-attr]  # noqa: SLF001
+        if buffer.seek(0, io.SEEK_END) > self.max_size:
+            process._buffer = self._tail(buffer)  # type: ignore[union-attr]  # noqa: SLF001
+
+    def trim_match(self, process: pexpect.spawn | SerialSpawn) -> None:
+        """Discard the oldest output before the last match if too large.
+
+        The read that matched may have grown the unmatched output past the
+        limit before it could be trimmed.
+
+        Args:
+            process: pexpect-compatible process object.
+
+        """
+        before = process.before
+        if isinstance(before, bytes) and len(before) > 2 * self.max_size:
+            self.discarded_bytes += len(before) - self.max_size
+            process.before = before[-self.max_size :]
+
+    def _tail(self, buffer: io.BytesIO) -> io.BytesIO:
+        """Copy the latest `max_size` bytes of a buffer into a new one."""
+        tail = io.BytesIO()
+        tail.write(buffer.getvalue()[-self.max_size :])
+        return tail
+
+
+class _BoundedExpecter(Expecter):
+    """pexpect Expecter that applies a BufferLimit after every read."""
+
+    def __init__(
+        self,
+        process: pexpect.spawn | SerialSpawn,
+        searcher: searcher_re | searcher_string,
+        limit: BufferLimit,
+    ) -> None:
+        super().__init__(process, searcher, process.searchwindowsize)
+        self._limit = limit
+
+    def existing_data(self) -> int | None:  # type: ignore[override]
+        """Search the output read before the wait, then trim it."""
+        index: int | None = super().existing_data()
+        self._trim(index)
+        return index
+
+    def new_data(self, data: bytes) -> int | None:  # type: ignore[override]
+        """Search the new output, then trim the unmatched output."""
+        index: int | None = super().new_data(data)
+        self._trim(index)
+        return index
+
+    def _trim(self, index: int | None) -> None:
+        """Trim the unmatched output, or the output before a match."""
+        if index is None:
+            self._limit.trim(self.spawn)
+        else:
+            self._limit.trim_match(self.spawn)
+
+
+def restore_unmatched_output(process: pexpect.spawn | SerialSpawn) -> None:
+    """Put the output pexpect moved to `before` on EOF back into its buffer.
+
+    pexpect empties its buffer when a wait ends with EOF. Restoring it lets
+    a wait resumed after reconnecting match output from before the EOF.
+
+    Args:
+        process: pexpect-compatible process object.
+
+    """
+    before = process.before
+    if isinstance(before, bytes):
+        unread_output(process, before)
+
+
+def unread_output(process: pexpect.spawn | SerialSpawn, data: bytes) -> None:
+    """Put consumed output back in front of the unmatched output.
+
+    The next wait or drain reads `data` first, as if it had not been
+    consumed yet.
+
+    Args:
+        process: pexpect-compatible process object working on bytes.
+        data: Output to put back.
+
+    """
+    if not data:
+        return
+
+    # pexpect searches `_buffer` and keeps all unmatched output in `_before`
+    buffer = data + process._buffer.getvalue()  # type: ignore[union-attr]  # noqa: SLF001
+    before = data + process._before.getvalue()  # type: ignore[union-attr]  # noqa: SLF001
+    process._buffer = io.BytesIO()  # type: ignore[union-attr]  # noqa: SLF001
+    process._buffer.write(buffer)  # type: ignore[union-attr]  # noqa: SLF001
+    process._before = io.BytesIO()  # type: ignore[union-attr]  # noqa: SLF001
+    process._before.write(before)  # type: ignore[union-attr]  # noqa: SLF001
+
+
+def matched_output(process: pexpect.spawn | SerialSpawn) -> bytes:
+    """Get the output matched by the last successful wait.
+
+    Args:
+        process: pexpect-compatible process object.
+
+    Returns:
+        The matched output without the output before it, or empty bytes if
+        the last wait did not match.
+
+    """
+    after = process.after
+    return after if isinstance(after, bytes) else b""
+
+
+def wait_for_any_pattern(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: list[str],
+    timeout_sec: float = 3.0,
+    fail_on: list[str] | None = None,
+    limit: BufferLimit | None = None,
+) -> tuple[int, str] | None:
+    """Wait for any of the expected patterns in process output.
+
+    All patterns are searched in a single pass over the output. When several
+    patterns match, the one matching earliest in the output wins.
+
+    Args:
+        process: pexpect-compatible process object.
+        patterns: Regular expression patterns to wait for.
+        timeout_sec: Maximum time to wait in seconds.
+        fail_on: Failure patterns searched along with the expected patterns.
+        limit: Bound on the unmatched output kept while waiting.
+
+    Returns:
+        tuple[int, str]: Index of the matched pattern and the matched string.
+        None: If timeout occurs before any pattern is matched.
+
+    Raises:
+        ValueError: If no pattern is given.
+        TypeError: If the matched output is not bytes.
+        FailurePatternError: If a failure pattern matches first.
+
+    """
+    _check_patterns(patterns)
+
+    failures = fail_on or []
+    try:
+        index = _expect(process, [*patterns, *failures], timeout_sec, limit)
+    except pexpect.TIMEOUT:
+        return None
+
+    return _matched_result(process, index, patterns, failures)
+
+
+def wait_for_any_match(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: list[str],
+    timeout_sec: float = 3.0,
+    fail_on: list[str] | None = None,
+    limit: BufferLimit | None = None,
+) -> PatternMatch | None:
+    """Wait for any of the expected patterns and return the decoded match.
+
+    Same as `wait_for_any_pattern`, but the groups of pexpect's match and the
+    output before it are decoded once into a PatternMatch.
+
+    Args:
+        process: pexpect-compatible process object.
+        patterns: Regular expression patterns to wait for.
+        timeout_sec: Maximum time to wait in seconds.
+        fail_on: Failure patterns searched along with the expected patterns.
+        limit: Bound on the unmatched output kept while waiting.
+
+    Returns:
+        PatternMatch: The match of the first matching pattern.
+        None: If timeout occurs before any pattern is matched.
+
+    Raises:
+        ValueError: If no pattern is given.
+        TypeError: If the matched output is not bytes.
+        FailurePatternError: If a failure pattern matches first.
+
+    """
+    _check_patterns(patterns)
+
+    failures = fail_on or []
+    try:
+        index = _expect(process, [*patterns, *failures], timeout_sec, limit)
+    except pexpect.TIMEOUT:
+        return None
+
+    _, matched = _matched_result(process, index, patterns, failures)
+    before = process.before
+    match = process.match
+    # Literal patterns are matched without a regex and have no groups
+    if not isinstance(before, bytes) or not isinstance(match, re.Match):
+        return PatternMatch(matched, before=_decode(before), index=index)
+
+    return PatternMatch(
+        matched,
+        tuple(_decode_group(group) for group in match.groups()),
+        {name: _decode_group(group) for name, group in match.groupdict().items()},
+        _decode(before),
+        index,
+    )
+
+
+def wait_for_any_bytes(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: list[bytes],
+    timeout_sec: float = 3.0,
+    fail_on: Patterns | None = None,
+    limit: BufferLimit | None = None,
+) -> tuple[int, bytes] | None:
+    """Wait for any of the expected bytes patterns without decoding output.
+
+    Same as `wait_for_any_pattern`, but the patterns are matched against the
+    raw output and the match is returned as the bytes pexpect read.
+
+    Args:
+        process: pexpect-compatible process object.
+        patterns: Regular expression bytes patterns to wait for.
+        timeout_sec: Maximum time to wait in seconds.
+        fail_on: Failure patterns searched along with the expected patterns.
+            Text patterns are encoded as UTF-8.
+        limit: Bound on the unmatched output kept while waiting.
+
+    Returns:
+        tuple[int, bytes]: Index of the matched pattern and the matched bytes.
+        None: If timeout occurs before any pattern is matched.
+
+    Raises:
+        ValueError: If no pattern is given.
+        TypeError: If the matched output is not bytes.
+        FailurePatternError: If a failure pattern matches first.
+
+    """
+    _check_patterns(patterns)
+
+    failures = fail_on or []
+    try:
+        index = _expect(process, [*patterns, *failures], timeout_sec, limit)
+    except pexpect.TIMEOUT:
+        return None
+
+    matched = process.after
+    if not isinstance(matched, bytes):
+        err_msg = "Expected bytes from process.after"
+        raise TypeError(err_msg)
+
+    if index >= len(patterns):
+        # Only the error is decoded
+        pattern = _encode(failures[index - len(patterns)])
+        raise FailurePatternError(
+            pattern.decode("utf-8", errors="backslashreplace"),
+            matched.decode("utf-8", errors="backslashreplace"),
+        )
+    return index, matched
+
+
+def _decode(output: object) -> str:
+    """Decode output bytes leniently.
+
+    The output before a match may start in the middle of a character when
+    older output was discarded, so undecodable bytes are replaced.
+    """
+    if not isinstance(output, bytes):
+        return ""
+    return output.decode("utf-8", errors="replace")
+
+
+def _decode_group(group: bytes | None) -> str | None:
+    """Decode a captured group, keeping None for groups that did not match."""
+    return None if group is None else group.decode("utf-8")
+
+
+def _expect(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: Patterns,
+    timeout_sec: float,
+    limit: BufferLimit | None,
+) -> int:
+    """Run pexpect's expect loop with the searcher suited to the patterns.
+
+    Returns:
+        Index of the matched pattern.
+
+    Raises:
+        pexpect.TIMEOUT: If no pattern matches within the timeout.
+
+    """
+    if limit:
+        expecter = _BoundedExpecter(process, make_searcher(process, patterns), limit)
+        return int(expecter.expect_loop(timeout_sec))
+
+    literals = _literals_for(process, patterns)
+    if literals:
+        return process.expect_loop(_LiteralSearcher(literals), timeout_sec)
+    return process.expect_list(compile_patterns(process, patterns), timeout=timeout_sec)
+
+
+def _feed_expecter(
+    process: pexpect.spawn | SerialSpawn,
+    expecter: Expecter,
+    found: asyncio.Future[int],
+) -> None:
+    """Read available output into the expecter and resolve on a match."""
+    if found.done():
+        return
+
+    try:
+        data = process.read_nonblocking(process.maxread, timeout=0)
+        index: int | None = expecter.new_data(data)
+    except pexpect.TIMEOUT:
+        return
+    except pexpect.EOF as e:
+        try:
+            expecter.eof(e)
+        except pexpect.EOF as eof:
+            found.set_exception(eof)
+        return
+    except Exception as e:  # noqa: BLE001
+        expecter.errored()
+        found.set_exception(e)
+        return
+
+    if index is not None:
+        found.set_result(index)
+
+
+async def _expect_async(
+    process: pexpect.spawn | SerialSpawn,
+    expecter: Expecter,
+    timeout_sec: float,
+) -> int | None:
+    """Run pexpect's Expecter with an event loop reader instead of select().
+
+    Returns:
+        int: Index of the matched pattern.
+        None: If timeout occurs before any pattern is matched.
+
+    """
+    index: int | None = expecter.existing_data()
+    if index is not None:
+        return index
+
+    loop = asyncio.get_running_loop()
+    found: asyncio.Future[int] = loop.create_future()
+    fd = process.child_fd
+    loop.add_reader(fd, _feed_expecter, process, expecter, found)
+    try:
+        return await asyncio.wait_for(found, timeout_sec)
+    except TimeoutError:
+        try:
+            expecter.timeout()
+        except pexpect.TIMEOUT:
+            return None
+        raise
+    finally:
+        loop.remove_reader(fd)
+
+
+async def wait_for_any_pattern_async(
+    process: pexpect.spawn | SerialSpawn,
+    patterns: list[str],
+    timeout_sec: float = 3.0,
+    fail_on: list[str] | None = None,
+    limit: BufferLimit | None = None,
+) -> tuple[int, str] | None:
+    """Wait for any of the expected patterns without blocking the event loop.
+
+    Registers the process file descriptor as a reader on the running event
+    loop only for the duration of the wait and feeds what it reads into
+    pexpect's Expecter, so buffers, logs and match attributes behave exactly
+    as with `wait_for_any_pattern`.
+
+    Args:
+        process: pexpect-compatible process object.
+        patterns: Regular expression patterns to wait for.
+        timeout_sec: Maximum time to wait in seconds.
+        fail_on: Failure patterns searched along with the expected patterns.
+        limit: Bound on the unmatched output kept while waiting.
+
+    Returns:
+        tuple[int, str]: Index of the matched pattern and the matched string.
+        None: If timeout occurs before any pattern is matched.
+
+    Raises:
+        ValueError: If no pattern is given.
+        TypeError: If the matched output is not bytes.
+        FailurePatternError: If a failure pattern matches first.
+
+    """
+    _check_patterns(patterns)
+
+    failures = fail_on or []
+    searcher = make_searcher(process, [*patterns, *failures])
+    expecter = (
+        _BoundedExpecter(process, searcher, limit)
+        if limit
+        else Expecter(process, searcher, process.searchwindowsize)
+    )
+    index = await _expect_async(process, expecter, timeout_sec)
+    if index is None:
+        return None
+
+    return _matched_result(process, index, patterns, failures)
+
 
 def wait_for_pattern(
     process: pexpect.spawn | SerialSpawn,
     expect: str,
     timeout_sec: float = 3.0,
+    fail_on: list[str] | None = None,
+    limit: BufferLimit | None = None,
 ) -> str | None:
     """Wait for expected pattern in process output.
 
@@ -15,6 +889,8 @@ def wait_for_pattern(
         process: pexpect-compatible process object.
         expect: Regular expression pattern to wait for.
         timeout_sec: Maximum time to wait in seconds.
+        fail_on: Failure patterns searched along with the expected pattern.
+        limit: Bound on the unmatched output kept while waiting.
 
     Returns:
         str: The matched string if pattern is found.
@@ -22,15 +898,97 @@ def wait_for_pattern(
 
     Raises:
         TypeError: If the matched output is not bytes.
+        FailurePatternError: If a failure pattern matches first.
 
     """
-    try:
-        process.expect(expect, timeout=timeout_sec)
-    except pexpect.TIMEOUT:
+    result = wait_for_any_pattern(process, [expect], timeout_sec, fail_on, limit)
+    if result is None:
         return None
 
-    if not isinstance(process.after, bytes):
-        err_msg = "Expected bytes from process.after"
+    return result[1]
+
+
+def drain_output(
+    process: pexpect.spawn | SerialSpawn,
+    quiet_sec: float = 0.0,
+    timeout_sec: float = 3.0,
+) -> bytes:
+    """Consume the buffered output and everything the process has sent.
+
+    Reading stops when no output arrives for `quiet_sec`, when the process
+    closes its output, or when `timeout_sec` has elapsed, whichever is first.
+
+    Args:
+        process: pexpect-compatible process object.
+        quiet_sec: Time without output after which reading stops.
+            0 reads only what is already available.
+        timeout_sec: Maximum total time to read, to bound draining a process
+            that never stops printing.
+
+    Returns:
+        The consumed output, including output buffered by earlier waits.
+
+    Raises:
+        TypeError: If the process output is not bytes.
+
+    """
+    # pexpect keeps all output since the last match in `_before` and rebuilds
+    # the search buffer from it on the next expect, so both must be consumed
+    unmatched = process._before  # type: ignore[union-attr]  # noqa: SLF001
+    chunks = [unmatched.getvalue()]
+    unmatched.seek(0)
+    unmatched.truncate()
+    process.buffer = process.string_type()
+    deadline = time.monotonic() + timeout_sec
+    while time.monotonic() < deadline:
+        try:
+            chunks.append(process.read_nonblocking(process.maxread, quiet_sec))
+        except (pexpect.TIMEOUT, pexpect.EOF):
+            break
+
+    if not all(isinstance(chunk, bytes) for chunk in chunks):
+        err_msg = "Expected bytes from process output"
         raise TypeError(err_msg)
+    return b"".join(chunks)
+
+
+def send_bytes(
+    process: pexpect.spawn | SerialSpawn,
+    data: bytes,
+    pacer: SendPacer | None = None,
+) -> None:
+    """Send raw bytes to the process without appending a line separator.
+
+    Args:
+        process: pexpect-compatible process object.
+        data: Bytes to send.
+        pacer: Pacer limiting how fast the bytes are written. None writes
+            them at once.
+
+    """
+    if pacer is None:
+        process.send(data)
+        return
+
+    pacer.send_line(process.send, data)
+
+
+def send_line(
+    process: pexpect.spawn | SerialSpawn,
+    line: str,
+    pacer: SendPacer | None = None,
+) -> None:
+    """Send a line to the process.
+
+    Args:
+        process: pexpect-compatible process object.
+        line: Line to send. The line separator of the process is appended.
+        pacer: Pacer limiting how fast the line is written. None writes it
+            at once.
+
+    """
+    if pacer is None:
+        process.sendline(line)
+        return
 
-    return process.after.decode("utf-8")
+    pacer.send_line(process.send, line.encode("utf-8") + process.linesep)
@@ -0,0 +1,367 @@
+"""Shared implementation of the pexpect-based IO classes.
+
+This module provides PexpectIOBase class that implements sending and waiting
+of the TemplatedIO interface on top of a pexpect-compatible process object.
+ProcessIO and DeviceIO only add how the process is started and stopped.
+"""
+
+from collections.abc import Callable
+from typing import TypeVar
+
+import pexpect
+from pexpect_serial import SerialSpawn
+
+from ._pexpect_helpers import (
+    BufferLimit,
+    Patterns,
+    drain_output,
+    matched_output,
+    send_bytes,
+    send_line,
+    unread_output,
+    wait_for_any_bytes,
+    wait_for_any_match,
+    wait_for_any_pattern,
+    wait_for_pattern,
+)
+from .templated_io import IOOptions, PatternMatch, TemplatedIO
+
+_T = TypeVar("_T")
+
+
+class PexpectIOBase(TemplatedIO):
+    """Base class for communication through a pexpect-compatible process.
+
+    Subclasses set `process` in `start`, narrowing its type to the process
+    class they use, and clear it in `stop`. Sends and waits run through
+    `_run_send` and `_run_wait`, which subclasses can override, e.g. to
+    recover from a disconnect.
+    This class is intended for internal use only and should not be used directly.
+    """
+
+    def __init__(
+        self,
+        prompt: str = "",
+        newline: str = "",
+        options: IOOptions | None = None,
+    ) -> None:
+        """Initialize PexpectIOBase instance.
+
+        Args:
+            prompt: Expected prompt string to wait for.
+            newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
+
+        """
+        super().__init__(prompt, newline, options)
+        max_buffer_size = self._options.max_buffer_size
+        self._buffer_limit = BufferLimit(max_buffer_size) if max_buffer_size else None
+        self.process: pexpect.spawn | SerialSpawn | None = None
+
+    @property
+    def buffer_limit(self) -> BufferLimit | None:
+        """Bound on the unmatched output kept while waiting, if configured."""
+        return self._buffer_limit
+
+    @property
+    def discarded_bytes(self) -> int:
+        """Number of output bytes discarded because of `max_buffer_size`."""
+        return self._buffer_limit.discarded_bytes if self._buffer_limit else 0
+
+    def send_command(self, command: str) -> None:
+        """Send a command to the process.
+
+        Appends the configured newline character and sends the command
+        to the process.
+
+        Args:
+            command: Command string to send.
+
+        Raises:
+            RuntimeError: If process is not started.
+
+        """
+        process = self._started_process()
+        output_line = command + self._newline
+        self._clear_prompt()
+        self._run_send(lambda: send_line(process, output_line, self._send_pacer))
+
+    def wait_for(
+        self,
+        expect: str,
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> str | None:
+        """Wait for expected pattern in process output.
+
+        Uses pexpect to wait for the specified pattern to appear in the
+        process output stream.
+
+        Args:
+            expect: Regular expression pattern to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            str: The matched string if pattern is found.
+            None: If timeout occurs before pattern is matched.
+
+        Raises:
+            RuntimeError: If process is not started.
+            TypeError: If the matched output is not bytes.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        process = self._started_process()
+        failures = self._failure_patterns(fail_on)
+        result = self._run_wait(
+            lambda timeout: wait_for_pattern(
+                process, expect, timeout, failures, self._buffer_limit
+            ),
+            timeout_sec,
+        )
+        if result is not None:
+            self._track_prompt(matched_output(process))
+        return result
+
+    def _wait_with_failures(
+        self, expect: str, timeout_sec: float, fail_on: list[str] | None
+    ) -> str | None:
+        """Wait for a pattern with `wait_for`, searching the failure patterns."""
+        return self.wait_for(expect, timeout_sec, fail_on)
+
+    def wait_for_any(
+        self,
+        patterns: list[str],
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> tuple[int, str] | None:
+        """Wait for any of the expected patterns in the process output stream.
+
+        Uses pexpect's pattern list form so that all patterns are searched
+        in a single pass over the output.
+
+        Args:
+            patterns: Regular expression patterns to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            tuple[int, str]: Index of the matched pattern and the matched string.
+            None: If timeout occurs before any pattern is matched.
+
+        Raises:
+            RuntimeError: If process is not started.
+            ValueError: If no pattern is given.
+            TypeError: If the matched output is not bytes.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        process = self._started_process()
+        failures = self._failure_patterns(fail_on)
+        result = self._run_wait(
+            lambda timeout: wait_for_any_pattern(
+                process, patterns, timeout, failures, self._buffer_limit
+            ),
+            timeout_sec,
+        )
+        if result is not None:
+            self._track_prompt(matched_output(process))
+        return result
+
+    def wait_for_match(
+        self,
+        expect: str,
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> PatternMatch | None:
+        """Wait for expected pattern and return the match with its groups.
+
+        The groups and the output before the match are taken from pexpect's
+        match and decoded once, without searching the output again.
+
+        Args:
+            expect: Regular expression pattern to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            PatternMatch: The match if expected pattern is found.
+            None: If timeout occurs before pattern is matched.
+
+        Raises:
+            RuntimeError: If process is not started.
+            TypeError: If the matched output is not bytes.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        process = self._started_process()
+        failures = self._failure_patterns(fail_on)
+        match = self._run_wait(
+            lambda timeout: wait_for_any_match(
+                process, [expect], timeout, failures, self._buffer_limit
+            ),
+            timeout_sec,
+        )
+        if match is not None:
+            self._track_prompt(matched_output(process))
+        return match
+
+    def send_bytes(self, data: bytes) -> None:
+        """Send raw bytes to the process as they are.
+
+        No newline is appended. The send pacing of the instance applies.
+
+        Args:
+            data: Bytes to send.
+
+        Raises:
+            RuntimeError: If process is not started.
+
+        """
+        process = self._started_process()
+        self._clear_prompt()
+        self._run_send(lambda: send_bytes(process, data, self._send_pacer))
+
+    def wait_for_bytes(
+        self,
+        expect: bytes,
+        timeout_sec: float = 3.0,
+        fail_on: Patterns | None = None,
+    ) -> bytes | None:
+        """Wait for a bytes pattern in the process output without decoding it.
+
+        Args:
+            expect: Regular expression bytes pattern to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on, as text or bytes. If None,
+                the default failure patterns of the instance are used.
+
+        Returns:
+            bytes: The matched bytes if pattern is found.
+            None: If timeout occurs before pattern is matched.
+
+        Raises:
+            RuntimeError: If process is not started.
+            TypeError: If the matched output is not bytes.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        result = self.wait_for_any_bytes([expect], timeout_sec, fail_on)
+        return result[1] if result else None
+
+    def wait_for_any_bytes(
+        self,
+        patterns: list[bytes],
+        timeout_sec: float = 3.0,
+        fail_on: Patterns | None = None,
+    ) -> tuple[int, bytes] | None:
+        """Wait for any of the bytes patterns without decoding the output.
+
+        Args:
+            patterns: Regular expression bytes patterns to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on, as text or bytes. If None,
+                the default failure patterns of the instance are used.
+
+        Returns:
+            tuple[int, bytes]: Index of the matched pattern and the matched
+                bytes.
+            None: If timeout occurs before any pattern is matched.
+
+        Raises:
+            RuntimeError: If process is not started.
+            ValueError: If no pattern is given.
+            TypeError: If the matched output is not bytes.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        process = self._started_process()
+        failures = self._fail_patterns if fail_on is None else fail_on
+        result = self._run_wait(
+            lambda timeout: wait_for_any_bytes(
+                process, patterns, timeout, failures, self._buffer_limit
+            ),
+            timeout_sec,
+        )
+        if result is not None:
+            self._track_prompt(matched_output(process))
+        return result
+
+    def drain(self, quiet_sec: float = 0.0, timeout_sec: float = 3.0) -> bytes:
+        """Consume all output the process has sent so far.
+
+        Args:
+            quiet_sec: Time without output after which reading stops.
+                0 reads only what is already available.
+            timeout_sec: Maximum total time to read.
+
+        Returns:
+            The consumed output, including output buffered by earlier waits.
+
+        Raises:
+            RuntimeError: If process is not started.
+            TypeError: If the output is not bytes.
+
+        """
+        output = drain_output(self._started_process(), quiet_sec, timeout_sec)
+        self._track_prompt(output[output.rfind(b"\n") + 1 :])
+        return output
+
+    def _wait_for_before(
+        self,
+        expect: str,
+        timeout_sec: float,
+        fail_on: list[str] | None,
+    ) -> bytes | None:
+        """Wait for a pattern and return pexpect's output before it as is."""
+        if self.wait_for(expect, timeout_sec, fail_on) is None or not self.process:
+            return None
+        before = self.process.before
+        return before if isinstance(before, bytes) else b""
+
+    def _unread(self, data: bytes) -> None:
+        """Put consumed output back into pexpect's buffer."""
+        if self.process:
+            unread_output(self.process, data)
+
+    def _output_ended(self) -> bool:
+        """Check whether pexpect has seen the end of the output."""
+        return bool(self.process and self.process.flag_eof)
+
+    def _run_send(self, send: Callable[[], None]) -> None:
+        """Write to the process.
+
+        Args:
+            send: Write to run.
+
+        """
+        send()
+
+    def _run_wait(self, wait: Callable[[float], _T], timeout_sec: float) -> _T | None:
+        """Run a wait on the process output.
+
+        Args:
+            wait: Wait to run with the timeout.
+            timeout_sec: Maximum time to wait in seconds.
+
+        Returns:
+            Result of the wait.
+
+        """
+        return wait(timeout_sec)
+
+    def _started_process(self) -> pexpect.spawn | SerialSpawn:
+        """Get the process, checking that it is started.
+
+        Raises:
+            RuntimeError: If process is not started.
+
+        """
+        if not self.process:
+            msg = "Process not started"
+            raise RuntimeError(msg)
+        return self.process
@@ -0,0 +1,107 @@
+"""Prompt and failure pattern state shared by the IO interfaces.
+
+This module provides PromptState class that keeps track of the prompt and the
+default failure patterns of a session, so that TemplatedIO and its asyncio
+counterpart AsyncTemplatedIO decide the same way when the process is idle and
+which failure patterns apply, and only differ in how they wait.
+"""
+
+import re
+
+
+class PromptState:
+    """Prompt tracking and failure pattern resolution of a session.
+
+    Waits call `_track_prompt` with the output they consumed and sends call
+    `_clear_prompt`, so that `_prompt_ready` tells whether the process is
+    already idle at its prompt.
+    This class is intended for internal use only and should not be used directly.
+    """
+
+    _FIRST_PROMPT_TIMEOUT_SEC = 0.5
+
+    def __init__(self, prompt: str, newline: str, fail_patterns: list[str]) -> None:
+        """Initialize PromptState instance.
+
+        Args:
+            prompt: Expected prompt string to wait for before sending commands.
+            newline: Newline character to append to commands.
+            fail_patterns: Default failure patterns of waits.
+
+        """
+        self._prompt = prompt
+        self._newline = newline
+        self._prompt_regex = (
+            re.compile(prompt.encode("utf-8"), re.DOTALL) if prompt else None
+        )
+        self._prompt_seen = False
+        self._fail_patterns = list(fail_patterns)
+
+    def _track_prompt(self, consumed: bytes) -> None:
+        """Remember whether the prompt ended the output consumed by a wait.
+
+        Subclasses call this with the output matched by every successful
+        wait, or with the last unterminated line of drained output, and call
+        `_clear_prompt` whenever they send input, so that `wait_for_prompt`
+        knows when the process is already idle. Output before the match is
+        not passed, since a prompt there may have been printed before the
+        last input was sent and only been read after it.
+
+        Args:
+            consumed: End of the output consumed by the wait.
+
+        """
+        if self._prompt_regex and self._prompt_regex.search(consumed):
+            self._prompt_seen = True
+
+    def _clear_prompt(self) -> None:
+        """Forget the prompt seen so far, e.g. because input was sent."""
+        self._prompt_seen = False
+
+    def _prompt_ready(self) -> bool:
+        """Check whether commands can be sent without waiting for the prompt.
+
+        Returns:
+            True if no prompt is set, or the prompt was already consumed by a
+            wait since the last input was sent.
+
+        """
+        return not self._prompt or self._prompt_seen
+
+    def _failure_patterns(self, fail_on: list[str] | None) -> list[str]:
+        """Resolve the failure patterns to use for a wait.
+
+        Args:
+            fail_on: Failure patterns given by the caller, or None.
+
+        Returns:
+            The given patterns, or the instance defaults if None is given.
+
+        """
+        if fail_on is None:
+            return self._fail_patterns
+        return fail_on
+
+    @staticmethod
+    def _check_attempts(attempts: int) -> None:
+        """Validate the number of times a command is sent.
+
+        Raises:
+            ValueError: If attempts is less than 1.
+
+        """
+        if attempts < 1:
+            msg = f"attempts must be at least 1, got {attempts}"
+            raise ValueError(msg)
+
+    @staticmethod
+    def _check_prompt(appeared: bool) -> None:  # noqa: FBT001
+        """Fail a command whose prompt did not appear.
+
+        Raises:
+            RuntimeError: If the prompt did not appear.
+
+        """
+        if not appeared:
+            msg = "Prompt does not appear"
+            raise RuntimeError(msg)
@@ -0,0 +1,157 @@
+"""asyncio adapter for the pexpect-based process communication classes.
+
+This module provides AsyncPexpectIO class that implements the AsyncTemplatedIO
+interface on top of ProcessIO, SSHProcessIO, DockerRunIO, DockerExecIO and
+DeviceIO instances.
+"""
+
+import asyncio
+
+from ._pexpect_helpers import matched_output, wait_for_any_pattern_async
+from .async_templated_io import AsyncTemplatedIO
+from .device_io import DeviceIO
+from .process_io import ProcessIO
+
+
+class AsyncPexpectIO(AsyncTemplatedIO):
+    """asyncio-based communication through a pexpect-based IO instance.
+
+    Waits register the process file descriptor on the running event loop
+    instead of blocking a thread in select(), so one event loop can drive many
+    sessions. Starting and stopping still run the wrapped blocking
+    implementation (e.g. SSH login or docker startup) in a worker thread.
+
+    Waits search the output of the wrapped process directly, so a DeviceIO
+    re-opening its port after disconnects (see `DeviceIO.reconnect`) is not
+    supported: a disconnect would end the wait instead of being recovered.
+    """
+
+    def __init__(self, io: ProcessIO | DeviceIO) -> None:
+        """Initialize AsyncPexpectIO instance.
+
+        Args:
+            io: pexpect-based IO to drive. The prompt, newline and default
+                failure patterns are taken from it.
+
+        Raises:
+            ValueError: If the IO reads its output through a reactor or a
+                reader thread, or has a reconnect policy.
+
+        """
+        if io.options.reactor:
+            msg = "AsyncPexpectIO cannot drive an IO attached to a reactor"
+            raise ValueError(msg)
+        if isinstance(io, DeviceIO) and io.reader_thread:
+            msg = "AsyncPexpectIO cannot drive an IO read by a reader thread"
+            raise ValueError(msg)
+        if isinstance(io, DeviceIO) and io.reconnect_policy:
+            msg = "AsyncPexpectIO cannot drive an IO that reconnects"
+            raise ValueError(msg)
+
+        super().__init__(io.prompt, io.newline, io.fail_patterns)
+        self.io = io
+
+    async def start(self) -> None:
+        """Start the wrapped IO in a worker thread.
+
+        Raises:
+            RuntimeError: If process is already started or fails to start.
+
+        """
+        self._clear_prompt()
+        await asyncio.to_thread(self.io.start)
+
+    async def stop(self) -> None:
+        """Stop the wrapped IO in a worker thread.
+
+        Raises:
+            RuntimeError: If process is not started.
+
+        """
+        await asyncio.to_thread(self.io.stop)
+
+    async def send_command(self, command: str) -> None:
+        """Send a command to the process.
+
+        Commands to an IO with send pacing are sent in a worker thread so
+        that the pacing delay does not block the event loop.
+
+        Args:
+            command: Command string to send.
+
+        Raises:
+            RuntimeError: If process is not started.
+
+        """
+        self._clear_prompt()
+        if self.io.send_pacing is None:
+            self.io.send_command(command)
+        else:
+            await asyncio.to_thread(self.io.send_command, command)
+
+    async def wait_for(
+        self,
+        expect: str,
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> str | None:
+        """Wait for expected pattern in process output.
+
+        Args:
+            expect: Regular expression pattern to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            str: The matched string if pattern is found.
+            None: If timeout occurs before pattern is matched.
+
+        Raises:
+            RuntimeError: If process is not started.
+            TypeError: If the matched output is not bytes.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        result = await self.wait_for_any([expect], timeout_sec, fail_on)
+        if result is None:
+            return None
+
+        return result[1]
+
+    async def wait_for_any(
+        self,
+        patterns: list[str],
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> tuple[int, str] | None:
+        """Wait for any of the expected patterns in process output.
+
+        Args:
+            patterns: Regular expression patterns to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            tuple[int, str]: Index of the matched pattern and the matched string.
+            None: If timeout occurs before any pattern is matched.
+
+        Raises:
+            RuntimeError: If process is not started.
+            ValueError: If no pattern is given.
+            TypeError: If the matched output is not bytes.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        if not self.io.process:
+            msg = "Process not started"
+            raise RuntimeError(msg)
+
+        failures = self._failure_patterns(fail_on)
+        result = await wait_for_any_pattern_async(
+            self.io.process, patterns, timeout_sec, failures, self.io.buffer_limit
+        )
+        if result is not None:
+            self._track_prompt(matched_output(self.io.process))
+        return result
@@ -0,0 +1,216 @@
+"""Abstract base class for asyncio-based process communication interfaces.
+
+This module provides the asyncio counterpart of TemplatedIO, so that a single
+event loop can drive many sessions without a thread per session.
+"""
+
+from abc import ABC, abstractmethod
+from typing import overload
+
+from ._prompt_state import PromptState
+
+
+class AsyncTemplatedIO(PromptState, ABC):
+    """Abstract base class for asyncio-based process communication.
+
+    Provides the same interface as TemplatedIO with awaitable methods.
+    This class is designed to be inherited by concrete implementations for
+    specific process types.
+    """
+
+    def __init__(
+        self,
+        prompt: str = "",
+        newline: str = "",
+        fail_patterns: list[str] | None = None,
+    ) -> None:
+        """Initialize the AsyncTemplatedIO instance.
+
+        Args:
+            prompt: Expected prompt string to wait for before sending commands.
+            newline: Newline character to append to commands.
+            fail_patterns: Default failure patterns. If one of them appears
+                while waiting for output, the wait is aborted immediately with
+                `FailurePatternError`.
+
+        """
+        super().__init__(prompt, newline, fail_patterns or [])
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Start the process communication.
+
+        This method must be implemented by subclasses according to their
+        specific process type.
+        """
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop the process communication.
+
+        This method must be implemented by subclasses according to their
+        specific process type.
+        """
+
+    @abstractmethod
+    async def send_command(self, command: str) -> None:
+        """Send a command string to the process.
+
+        This method must be implemented by subclasses according to their
+        specific process communication mechanism.
+        """
+
+    @abstractmethod
+    async def wait_for(
+        self,
+        expect: str,
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> str | None:
+        """Wait for expected string from the process.
+
+        This method must be implemented by subclasses according to their
+        specific process communication mechanism.
+
+        Args:
+            expect: Regular expression pattern to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            str: The matched string if expected pattern is found.
+            None: If timeout occurs before pattern is matched.
+
+        Raises:
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+
+    @abstractmethod
+    async def wait_for_any(
+        self,
+        patterns: list[str],
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> tuple[int, str] | None:
+        """Wait for any of the expected strings from the process.
+
+        This method must be implemented by subclasses according to their
+        specific process communication mechanism.
+
+        Args:
+            patterns: Regular expression patterns to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            tuple[int, str]: Index of the matched pattern and the matched string.
+            None: If timeout occurs before any pattern is matched.
+
+        Raises:
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+
+    async def restart(self) -> None:
+        """Restart the process by stopping and starting it again."""
+        await self.stop()
+        await self.start()
+
+    @overload
+    async def run_command(
+        self,
+        command: str,
+        expect: str = "",
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+    ) -> str | None: ...
+
+    @overload
+    async def run_command(
+        self,
+        command: str,
+        expect: list[str],
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+    ) -> tuple[int, str] | None: ...
+
+    async def run_command(
+        self,
+        command: str,
+        expect: str | list[str] = "",
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+    ) -> str | tuple[int, str] | None:
+        """Send command and wait for expected response.
+
+        Behaves like `TemplatedIO.run_command`.
+
+        Args:
+            command: Command string to send.
+            expect: Expected response pattern to wait for. If a list is given,
+                wait for any of the patterns (see `wait_for_any`).
+            timeout_sec: Maximum time to wait for response.
+            attempts: Number of retry attempts. Must be at least 1.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            str: The matched string if expected pattern is found.
+            tuple[int, str]: Index of the matched pattern and the matched string
+                if a list of patterns is given and one of them is found.
+            None: If timeout occurs or pattern not matched after all attempts.
+
+        Raises:
+            ValueError: If attempts is less than 1.
+            RuntimeError: If the prompt does not appear.
+            FailurePatternError: If a failure pattern appears.
+
+        """
+        self._check_attempts(attempts)
+        self._check_prompt(await self.wait_for_prompt())
+
+        match: str | tuple[int, str] | None = None
+        for _ in range(attempts):
+            await self.send_command(command)
+            if isinstance(expect, list):
+                match = await self.wait_for_any(expect, timeout_sec, fail_on)
+            else:
+                match = await self.wait_for(expect, timeout_sec, fail_on)
+            if match is not None:
+                break
+
+        return match
+
+    async def wait_for_prompt(self, timeout_sec: float = 3.0) -> bool:
+        """Wait for the configured prompt to appear.
+
+        Returns immediately if the prompt has already been consumed by a wait
+        since the last input was sent.
+
+        Args:
+            timeout_sec: Maximum time to wait for the prompt.
+
+        Returns:
+            True if prompt appears within timeout, False otherwise.
+
+        """
+        if self._prompt_ready():
+            return True
+
+        # Failure patterns are for command responses, not for synchronization
+        res = await self.wait_for(
+            self._prompt, self._FIRST_PROMPT_TIMEOUT_SEC, fail_on=[]
+        )
+        if res == self._prompt:
+            return True
+
+        # Send a new line and try again
+        await self.send_command(self._newline)
+        res = await self.wait_for(self._prompt, timeout_sec, fail_on=[])
+        return res == self._prompt
@@ -0,0 +1,141 @@
+"""Many serial ports served by one reader thread.
+
+This module provides DeviceGroup class that opens a DeviceIO per serial port
+and attaches all of them to a single Reactor, so that watching dozens of
+consoles costs one selector loop instead of a reader per port.
+"""
+
+import dataclasses
+from collections.abc import Iterator
+from types import TracebackType
+from typing import Self
+
+from .device_io import DeviceIO
+from .reactor import Reactor
+from .templated_io import IOOptions
+
+
+class DeviceGroup:
+    """Serial ports read by one shared reactor thread.
+
+    Each port is a regular DeviceIO, available by port path, so it can be
+    driven like any TemplatedIO. Waits run in the calling thread and block on
+    the port's buffer; only the reactor thread reads the ports. Combine with
+    SessionGroup to operate on the ports concurrently.
+    """
+
+    def __init__(
+        self,
+        ports: list[str],
+        baudrate: int = 9600,
+        prompt: str = "",
+        newline: str = "",
+        options: IOOptions | None = None,
+    ) -> None:
+        """Initialize DeviceGroup instance.
+
+        Args:
+            ports: Serial port paths (e.g., '/dev/ttyUSB0').
+            baudrate: Serial communication speed in bits per second.
+            prompt: Expected prompt string to wait for.
+            newline: Newline character to append to commands.
+            options: Optional behavior shared by all ports. If it has no
+                reactor, the group creates and owns one.
+
+        Raises:
+            ValueError: If a port is given twice.
+            serial.SerialException: If a port cannot be opened. The ports
+                opened so far and the reactor created by the group are
+                closed again.
+
+        """
+        if len(set(ports)) != len(ports):
+            msg = "Each port can be given only once"
+            raise ValueError(msg)
+
+        options = options or IOOptions()
+        self._owns_reactor = options.reactor is None
+        self._reactor = options.reactor or Reactor()
+        shared = dataclasses.replace(options, reactor=self._reactor)
+        self._devices: dict[str, DeviceIO] = {}
+        try:
+            for port in ports:
+                self._devices[port] = DeviceIO(port, baudrate, prompt, newline, shared)
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> Self:
+        """Start all ports."""
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop all ports and close the reactor."""
+        self.close()
+
+    def __getitem__(self, port: str) -> DeviceIO:
+        """Get the IO of a port."""
+        return self._devices[port]
+
+    def __iter__(self) -> Iterator[DeviceIO]:
+        """Iterate over the IOs of all ports in the given order."""
+        return iter(self._devices.values())
+
+    def __len__(self) -> int:
+        """Get the number of ports."""
+        return len(self._devices)
+
+    @property
+    def ports(self) -> list[str]:
+        """Port paths of the group."""
+        return list(self._devices)
+
+    @property
+    def devices(self) -> list[DeviceIO]:
+        """IOs of all ports in the order of the ports."""
+        return list(self._devices.values())
+
+    @property
+    def reactor(self) -> Reactor:
+        """Reactor reading all ports."""
+        return self._reactor
+
+    def start(self) -> None:
+        """Start all ports.
+
+        If a port fails to start, the ports started so far are stopped again.
+
+        Raises:
+            RuntimeError: If a port is already started.
+
+        """
+        started: list[DeviceIO] = []
+        try:
+            for device in self._devices.values():
+                device.start()
+                started.append(device)
+        except Exception:
+            for device in started:
+                device.stop()
+            raise
+
+    def stop(self) -> None:
+        """Stop all started ports."""
+        for device in self._devices.values():
+            if device.process:
+                device.stop()
+
+    def close(self) -> None:
+        """Stop and close all ports and close the reactor if the group created it."""
+        self.stop()
+        # DeviceIO opens its port on creation, so ports never started are open
+        for device in self._devices.values():
+            device.device.close()
+        if self._owns_reactor:
+            self._reactor.close()
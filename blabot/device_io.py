@@ -4,29 +4,86 @@ This module provides DeviceIO class that implements the TemplatedIO interface
 for communicating with serial devices such as USB-to-serial adapters.
 """
 
-import sys
+import contextlib
+import time
+from collections.abc import Callable
+from typing import TypeVar
 
+import pexpect
+import pexpect_serial
 import serial
-from pexpect_serial import SerialSpawn
 
-from ._pexpect_helpers import wait_for_pattern
-from .templated_io import TemplatedIO
+from ._pexpect_helpers import restore_unmatched_output, setup_process
+from ._pexpect_io import PexpectIOBase
+from .reconnect_policy import ReconnectPolicy
+from .send_pacing import SendPacing
+from .serial_reader import SerialReader
+from .templated_io import IOOptions
 
+_T = TypeVar("_T")
 
-class DeviceIO(TemplatedIO):
+
+class SerialSpawn(pexpect_serial.SerialSpawn):
+    """pexpect_serial's SerialSpawn with a working end-of-file flag.
+
+    pexpect keeps the flag on its pseudo-terminal process, which a serial
+    port does not have, so a disconnect raised AttributeError instead of
+    pexpect.EOF. The bytes written are counted in `sent_bytes`, so that a
+    send failing after part of it was written is not repeated.
+    """
+
+    flag_eof = False
+    sent_bytes = 0
+
+    def send(self, s: str | bytes) -> int:
+        """Write to the port and count the bytes written.
+
+        Returns:
+            Number of bytes written.
+
+        """
+        written: int = super().send(s)
+        self.sent_bytes += written
+        return written
+
+
+class DeviceIO(PexpectIOBase):
     """Serial device communication using pexpect_serial.
 
     Implements the TemplatedIO interface for communicating with serial devices
     such as USB-to-serial adapters. Uses pyserial for device connection and
     pexpect_serial for interaction.
+
+    By default, commands are sent at least 50 ms apart so that slow consoles
+    can keep up. Pass `IOOptions(send_pacing=SendPacing())` to send without
+    any delay, or tighter limits for consoles that drop input.
+
+    With `reader_thread`, a SerialReader reads the port continuously in bulk
+    instead of only while waiting, so fast devices do not overflow the port
+    between waits. Its counters are available as `reader`.
+
+    With `reconnect`, a disconnect of the port (e.g. a USB-serial adapter
+    disappearing while the device reboots) does not end the session: the
+    port is re-opened in place with backoff, and pending waits resume with
+    the output received before the disconnect. Pass a stable path such as
+    `/dev/serial/by-id/...` as the port so that the adapter is found again
+    after it re-enumerates.
     """
 
-    def __init__(
+    _DEFAULT_SEND_PACING = SendPacing(line_gap_sec=0.05)
+    # Sends have no timeout of their own; reconnect as long as a default wait
+    _SEND_RECONNECT_TIMEOUT_SEC = 3.0
+
+    def __init__(  # noqa: PLR0913
         self,
         port: str,
         baudrate: int = 9600,
         prompt: str = "",
         newline: str = "",
+        options: IOOptions | None = None,
+        *,
+        reader_thread: bool = False,
+        reconnect: ReconnectPolicy | None = None,
     ) -> None:
         """Initialize DeviceIO instance.
 
@@ -35,11 +92,51 @@ class DeviceIO(TemplatedIO):
             baudrate: Serial communication speed in bits per second.
             prompt: Expected prompt string to wait for.
             newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
+            reader_thread: Whether to read the port in a dedicated thread.
+            reconnect: Policy for re-opening the port after a disconnect.
+                None lets a disconnect raise pexpect.EOF from waits.
+
+        Raises:
+            ValueError: If a reader thread is combined with a reactor.
 
         """
-        super().__init__(prompt, newline)
+        super().__init__(prompt, newline, options)
+        if reader_thread and self._reactor:
+            msg = "A reader thread cannot be combined with a reactor"
+            raise ValueError(msg)
         self.process: SerialSpawn | None = None
         self.device = serial.Serial(port, baudrate, timeout=1)
+        self._reader_thread = reader_thread
+        self._reader: SerialReader | None = None
+        self._reconnect_policy = reconnect
+        self._reconnect_count = 0
+        self._last_reconnect_sec = 0.0
+
+    @property
+    def reader_thread(self) -> bool:
+        """Whether the port is read in a dedicated thread."""
+        return self._reader_thread
+
+    @property
+    def reader(self) -> SerialReader | None:
+        """Reader of the current or last session, if `reader_thread` is set."""
+        return self._reader
+
+    @property
+    def reconnect_policy(self) -> ReconnectPolicy | None:
+        """Policy for re-opening the port after a disconnect, if any."""
+        return self._reconnect_policy
+
+    @property
+    def reconnect_count(self) -> int:
+        """Number of times the port was re-opened after a disconnect."""
+        return self._reconnect_count
+
+    @property
+    def last_reconnect_sec(self) -> float:
+        """Time the last reconnect took to re-open the port."""
+        return self._last_reconnect_sec
 
     def start(self) -> None:
         """Start serial device communication.
@@ -58,8 +155,10 @@ class DeviceIO(TemplatedIO):
         if not self.device.is_open:
             self.device.open()
 
+        self._clear_prompt()
         self.process = SerialSpawn(self.device)
-        self.process.logfile = sys.stdout.buffer
+        setup_process(self.process, self._options, self._transcript)
+        self._start_reader()
 
     def stop(self) -> None:
         """Stop serial device communication.
@@ -75,51 +174,194 @@ class DeviceIO(TemplatedIO):
             msg = "Process not started"
             raise RuntimeError(msg)
 
+        self._stop_reading()
         self.process.close()
         self.device.close()
         self.process = None
 
-    def send_command(self, command: str) -> None:
-        """Send a command to the serial device.
+    def reconnect(self, timeout_sec: float | None = None) -> bool:
+        """Re-open the serial port in place after a disconnect.
 
-        Appends the configured newline character and sends the command
-        to the device.
+        The SerialSpawn instance is kept, so its buffered output, the
+        transcript and the log sink continue across the reconnect. Attempts
+        follow the reconnect policy of the instance, or the default policy
+        if none is set.
 
         Args:
-            command: Command string to send.
+            timeout_sec: Time after which to stop trying, e.g. the time left
+                for a wait. The timeout of the policy applies if it is
+                shorter. If the time runs out, the port stays closed and the
+                next wait or send tries to re-open it again. None tries for
+                the timeout of the policy.
+
+        Returns:
+            True if the port was re-opened, False if it was not re-opened
+            before `timeout_sec` or the timeout of the policy ran out.
 
         Raises:
-            RuntimeError: If communication is not started.
+            RuntimeError: If communication is not started, or if no
+                `timeout_sec` is given and the port cannot be re-opened
+                within the timeout of the policy.
 
         """
         if not self.process:
             msg = "Process not started"
             raise RuntimeError(msg)
 
-        output_line = command + self._newline
-        self.process.sendline(output_line)
+        policy = self._reconnect_policy or ReconnectPolicy()
+        started = time.monotonic()
+        limit_sec = policy.timeout_sec
+        if timeout_sec is not None:
+            limit_sec = min(limit_sec, timeout_sec)
+        self._stop_reading()
+        with contextlib.suppress(serial.SerialException, OSError):
+            self.device.close()
+
+        error: Exception | None = None
+        for delay in policy.delays():
+            try:
+                self.device.open()
+                break
+            except serial.SerialException as e:
+                error = e
+            remaining = limit_sec - (time.monotonic() - started)
+            if remaining <= 0:
+                if timeout_sec is not None:
+                    return False
+                msg = f"Port did not come back within {policy.timeout_sec} s"
+                raise RuntimeError(msg) from error
+            time.sleep(min(delay, remaining))
+
+        self.process.child_fd = self.device.fileno()
+        self.process.flag_eof = False
+        self._clear_prompt()
+        if self._reactor:
+            self._reactor.attach(self.process)
+        self._start_reader()
+        self._reconnect_count += 1
+        self._last_reconnect_sec = time.monotonic() - started
+        return True
+
+    def _start_reader(self) -> None:
+        """Start the reader thread for the current port, if configured."""
+        if self._reader_thread and self.process:
+            self._reader = SerialReader(self.device)
+            self._reader.attach(self.process)
+
+    def _stop_reading(self) -> None:
+        """Detach the process from the reactor or reader thread reading it."""
+        if not self.process:
+            return
+        if self._reactor:
+            self._reactor.detach(self.process)
+        if self._reader:
+            self._reader.close()
 
-    def wait_for(self, expect: str, timeout_sec: float = 3.0) -> str | None:
-        """Wait for expected pattern from the serial device.
+    def _run_wait(self, wait: Callable[[float], _T], timeout_sec: float) -> _T | None:
+        """Run a wait, resuming it on the re-opened port after a disconnect.
 
-        Uses pexpect to wait for the specified pattern to appear in the
-        device output stream.
+        Reconnecting counts against the timeout of the wait: if the port is
+        not back when the timeout runs out, the wait times out.
 
         Args:
-            expect: Regular expression pattern to wait for.
-            timeout_sec: Maximum time to wait in seconds.
+            wait: Wait to run with the remaining timeout.
+            timeout_sec: Maximum total time to wait.
 
         Returns:
-            str: The matched string if pattern is found.
-            None: If timeout occurs before pattern is matched.
+            Result of the wait, or None if the timeout runs out, including
+            while reconnecting.
 
         Raises:
-            RuntimeError: If communication is not started.
-            TypeError: If the matched output is not bytes.
+            pexpect.EOF: If the port disconnects and reconnecting is disabled.
 
         """
-        if not self.process:
+        deadline = time.monotonic() + timeout_sec
+        if not self._reopen_if_closed(timeout_sec):
+            return None
+        while True:
+            try:
+                return wait(max(0.0, deadline - time.monotonic()))
+            except pexpect.EOF:
+                if not self._reconnect_policy or not self.process:
+                    raise
+                # pexpect moves unmatched output to `before` on EOF
+                restore_unmatched_output(self.process)
+                if not self.reconnect(max(0.0, deadline - time.monotonic())):
+                    return None
+            if time.monotonic() >= deadline:
+                return None
+
+    def _reopen_if_closed(self, timeout_sec: float) -> bool:
+        """Finish a reconnect that an earlier wait ran out of time for.
+
+        Args:
+            timeout_sec: Time left for the current wait.
+
+        Returns:
+            False if the port is still closed when the time runs out.
+
+        """
+        if not self._reconnect_policy or self.device.is_open:
+            return True
+        return self.reconnect(timeout_sec)
+
+    def _run_send(self, send: Callable[[], None]) -> None:
+        """Send, re-opening the port and sending again after a disconnect.
+
+        Reconnecting is bounded by `_SEND_RECONNECT_TIMEOUT_SEC`. The send is
+        repeated only if none of it was written before the port failed: a
+        paced send that failed after some of its writes is not repeated,
+        since the device already received the beginning of it. Bytes lost
+        inside the failing write itself cannot be told apart and count as
+        not written.
+
+        Raises:
+            RuntimeError: If process is not started.
+            serial.SerialException: If the port fails and reconnecting is
+                disabled, the port does not come back in time, or part of
+                the data was already written.
+            OSError: In the same cases as serial.SerialException.
+
+        """
+        process = self.process
+        if not process:
             msg = "Process not started"
             raise RuntimeError(msg)
 
-        return wait_for_pattern(self.process, expect, timeout_sec)
+        sent_bytes = process.sent_bytes
+        try:
+            send()
+        except (serial.SerialException, OSError):
+            if not self._reconnect_policy:
+                raise
+            reopened = self.reconnect(self._SEND_RECONNECT_TIMEOUT_SEC)
+            if not reopened or process.sent_bytes != sent_bytes:
+                raise
+            send()
+
+    def drain(self, quiet_sec: float = 0.0, timeout_sec: float = 3.0) -> bytes:
+        """Consume all output the device has sent so far.
+
+        A disconnect ends draining; the port is re-opened within the
+        remaining time if the instance has a reconnect policy.
+
+        Args:
+            quiet_sec: Time without output after which reading stops.
+                0 reads only what is already available.
+            timeout_sec: Maximum total time to read.
+
+        Returns:
+            The consumed output, including output buffered by earlier waits.
+
+        Raises:
+            RuntimeError: If process is not started.
+            TypeError: If the output is not bytes.
+
+        """
+        deadline = time.monotonic() + timeout_sec
+        if not self._reopen_if_closed(timeout_sec):
+            return b""
+        output = super().drain(quiet_sec, max(0.0, deadline - time.monotonic()))
+        if self.process and self.process.flag_eof and self._reconnect_policy:
+            self.reconnect(max(0.0, deadline - time.monotonic()))
+        return output
@@ -7,12 +7,13 @@ with 'docker exec'. Choose the appropriate class for your use case.
 """
 
 import subprocess
-import sys
 from dataclasses import dataclass
 
 import pexpect
 
+from ._pexpect_helpers import setup_process
 from .process_io import ProcessIO
+from .templated_io import IOOptions
 
 
 @dataclass
@@ -50,7 +51,7 @@ class _DockerIOBase(ProcessIO):
 
         """
         self.process = pexpect.spawn(docker_activate_command)
-        self.process.logfile = sys.stdout.buffer
+        setup_process(self.process, self._options, self._transcript)
 
         # Wait for login to complete
         if not self.wait_for(r"#"):
@@ -78,6 +79,7 @@ class DockerRunIO(_DockerIOBase):
         docker_run_config: DockerRunConfig,
         prompt: str = "",
         newline: str = "",
+        options: IOOptions | None = None,
     ) -> None:
         """Initialize DockerRunIO instance.
 
@@ -86,9 +88,10 @@ class DockerRunIO(_DockerIOBase):
             docker_run_config: Docker run configuration.
             prompt: Expected prompt string to wait for.
             newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
 
         """
-        super().__init__(start_command, prompt, newline)
+        super().__init__(start_command, prompt, newline, options)
         self._docker_image_name = docker_run_config.image_name
         self._docker_container_name = docker_run_config.container_name
         self._remove_container = docker_run_config.remove_container
@@ -144,6 +147,7 @@ class DockerExecIO(_DockerIOBase):
         docker_exec_config: DockerExecConfig,
         prompt: str = "",
         newline: str = "",
+        options: IOOptions | None = None,
     ) -> None:
         """Initialize DockerExecIO instance.
 
@@ -152,9 +156,10 @@ class DockerExecIO(_DockerIOBase):
             docker_exec_config: Docker exec configuration.
             prompt: Expected prompt string to wait for.
             newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
 
         """
-        super().__init__(start_command, prompt, newline)
+        super().__init__(start_command, prompt, newline, options)
         self._docker_container_name = docker_exec_config.container_name
         self._remove_container = docker_exec_config.remove_container
 
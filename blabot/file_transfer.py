@@ -0,0 +1,148 @@
+"""Moving files through an interactive shell.
+
+Consoles often have no network path, only the shell on the other end of the
+serial line or terminal. This module provides the shell commands and result
+types used by `TemplatedIO.send_file` and `TemplatedIO.receive_file`, which
+move files as base64 text: uploads are written in heredoc chunks, each
+acknowledged by the exit status of the shell, and both directions are
+verified with SHA-256. The target needs a POSIX shell with `base64` and
+`sha256sum`, as provided by coreutils or BusyBox.
+"""
+
+import base64
+import binascii
+import re
+import shlex
+from dataclasses import dataclass
+
+HEREDOC_END = "BLABOT_EOF"
+STATUS_MARKER = "BLABOT_STATUS"
+STATUS_PATTERN = rf"{STATUS_MARKER}:(\d+)"
+_DIGEST = re.compile(r"([0-9a-f]{64})\s")
+_DIGEST_LINE = re.compile(r"([0-9a-f]{64})\s+\S.*")
+_BASE64_LINE = re.compile(r"[A-Za-z0-9+/=]+")
+_STATUS_LINE = re.compile(STATUS_PATTERN)
+
+
+class TransferError(RuntimeError):
+    """Raised when a file cannot be transferred or arrives corrupted."""
+
+
+@dataclass(frozen=True)
+class TransferResult:
+    """Outcome of a verified file transfer.
+
+    Attributes:
+        remote_path: Path of the file on the target.
+        size: Number of bytes of the file.
+        sha256: Hex SHA-256 digest of the file, checked on both sides.
+        elapsed_sec: Time the transfer took, including the verification.
+
+    """
+
+    remote_path: str
+    size: int
+    sha256: str
+    elapsed_sec: float
+
+    @property
+    def bytes_per_sec(self) -> float:
+        """Average transfer rate of the file contents."""
+        return self.size / self.elapsed_sec if self.elapsed_sec > 0 else 0.0
+
+
+def with_status(command: str) -> str:
+    """Make a command print its exit status after its output.
+
+    The status is written as `$?` in the command, so the echo of the command
+    by the terminal never matches `STATUS_PATTERN`.
+    """
+    return f"{command}; echo {STATUS_MARKER}:$?"
+
+
+def upload_chunk(remote_path: str, chunk: bytes, newline: str, *, append: bool) -> str:
+    """Build the shell input writing one chunk of a file.
+
+    Args:
+        remote_path: Path of the file on the target.
+        chunk: Bytes to write.
+        newline: Line separator of the console.
+        append: Whether to append to the file instead of truncating it.
+
+    Returns:
+        A `base64 -d` command followed by the chunk as a heredoc, with lines
+        separated by `newline`. The heredoc terminator has no line end, so
+        that it is sent as a command, ended like any other.
+
+    """
+    redirect = ">>" if append else ">"
+    path = shlex.quote(remote_path)
+    header = with_status(f"base64 -d {redirect} {path} <<'{HEREDOC_END}'")
+    lines = base64.encodebytes(chunk).decode("ascii").split()
+    return newline.join([header, *lines, HEREDOC_END])
+
+
+def digest_command(remote_path: str) -> str:
+    """Build the command printing the SHA-256 digest of a file."""
+    return with_status(f"sha256sum {shlex.quote(remote_path)}")
+
+
+def download_command(remote_path: str) -> str:
+    """Build the command printing the digest of a file and then its base64."""
+    path = shlex.quote(remote_path)
+    return with_status(f"sha256sum {path} && base64 {path}")
+
+
+def parse_digest(output: str) -> str | None:
+    """Find the digest printed by `sha256sum` in command output."""
+    match = _DIGEST.search(output)
+    return match.group(1) if match else None
+
+
+class DownloadParser:
+    """Collector of the lines printed by `download_command`.
+
+    Lines before the digest, such as the echo of the command, are ignored.
+    After it, base64 lines are collected until the exit status.
+    """
+
+    def __init__(self) -> None:
+        """Initialize DownloadParser instance."""
+        self.digest: str | None = None
+        self.status: int | None = None
+        self._lines: list[str] = []
+
+    def feed(self, line: str) -> bool:
+        """Take the next line of output.
+
+        Args:
+            line: Line of output without its line end.
+
+        Returns:
+            True once the exit status has been seen.
+
+        """
+        # Terminals may put control sequences ending in CR before the output
+        stripped = line.rsplit("\r", 1)[-1].strip()
+        if match := _STATUS_LINE.fullmatch(stripped):
+            self.status = int(match.group(1))
+            return True
+        if self.digest is None:
+            if match := _DIGEST_LINE.fullmatch(stripped):
+                self.digest = match.group(1)
+        elif _BASE64_LINE.fullmatch(stripped):
+            self._lines.append(stripped)
+        return False
+
+    def data(self) -> bytes:
+        """Decode the collected file contents.
+
+        Raises:
+            TransferError: If the collected lines are not valid base64.
+
+        """
+        try:
+            return base64.b64decode("".join(self._lines), validate=True)
+        except binascii.Error as e:
+            msg = f"Received contents are not valid base64: {e}"
+            raise TransferError(msg) from e
@@ -0,0 +1,208 @@
+"""Destinations for the transcript of process communication.
+
+Every IO class writes the bytes it sends and receives to a log sink. This
+module provides the sinks blabot ships with. Any object with `write(bytes)`
+and `flush()` methods, such as a file opened in binary mode, can be used too.
+Pass None as the sink to disable the transcript entirely.
+"""
+
+import queue
+import sys
+import threading
+from pathlib import Path
+from typing import Protocol
+
+
+class LogSink(Protocol):
+    """Interface of a transcript destination.
+
+    pexpect calls `flush` after every `write`, so sinks that batch their
+    output should make `flush` cheap and do the real work elsewhere.
+    """
+
+    def write(self, data: bytes, /) -> object:
+        """Write a chunk of the transcript."""
+
+    def flush(self) -> object:
+        """Flush the transcript written so far."""
+
+
+class StdoutSink:
+    """Write the transcript to the standard output immediately.
+
+    This is the default sink of every IO class. The current `sys.stdout` is
+    looked up on every write so that output capture (e.g. by pytest) works.
+    """
+
+    def write(self, data: bytes) -> None:
+        """Write a chunk of the transcript to the standard output."""
+        sys.stdout.buffer.write(data)
+
+    def flush(self) -> None:
+        """Flush the standard output."""
+        sys.stdout.buffer.flush()
+
+
+STDOUT_SINK = StdoutSink()
+
+
+class FileSink:
+    """Write the transcript to a file with buffered writes.
+
+    Flushes requested by pexpect are ignored; the file buffer is written out
+    when it is full and on `close`.
+    """
+
+    def __init__(self, path: str | Path, buffer_size: int = 1024 * 1024) -> None:
+        """Initialize FileSink instance.
+
+        Args:
+            path: Path of the file. Written data is appended.
+            buffer_size: Size of the write buffer in bytes.
+
+        """
+        self._file = Path(path).open("ab", buffering=buffer_size)  # noqa: SIM115
+
+    def write(self, data: bytes) -> None:
+        """Write a chunk of the transcript to the file buffer."""
+        self._file.write(data)
+
+    def flush(self) -> None:
+        """Do nothing; the buffer is written out when full or on close."""
+
+    def close(self) -> None:
+        """Write out the buffer and close the file."""
+        self._file.close()
+
+
+class MemorySink:
+    """Keep the latest part of the transcript in memory.
+
+    Only the last `max_bytes` bytes are kept; older output is discarded.
+    """
+
+    def __init__(self, max_bytes: int = 1024 * 1024) -> None:
+        """Initialize MemorySink instance.
+
+        Args:
+            max_bytes: Maximum number of bytes to keep. Must be at least 1.
+
+        Raises:
+            ValueError: If max_bytes is less than 1.
+
+        """
+        if max_bytes < 1:
+            msg = f"max_bytes must be at least 1, got {max_bytes}"
+            raise ValueError(msg)
+
+        self._max_bytes = max_bytes
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> None:
+        """Append a chunk of the transcript, discarding the oldest bytes."""
+        with self._lock:
+            self._buffer += data
+            overflow = len(self._buffer) - self._max_bytes
+            if overflow > 0:
+                del self._buffer[:overflow]
+
+    def flush(self) -> None:
+        """Do nothing; the transcript is always up to date."""
+
+    def getvalue(self) -> bytes:
+        """Get the kept part of the transcript.
+
+        Returns:
+            Copy of the kept bytes, oldest first.
+
+        """
+        with self._lock:
+            return bytes(self._buffer)
+
+
+class QueueSink:
+    """Hand the transcript to a background thread writing to another sink.
+
+    Writes only enqueue the chunk, so the expect loop never waits for the
+    transcript I/O. The writer thread joins all chunks queued while it was
+    busy into one write. If `max_pending` chunks are already queued, new
+    chunks are dropped and counted in `dropped_bytes` instead of blocking.
+    """
+
+    def __init__(self, target: LogSink, max_pending: int = 10000) -> None:
+        """Initialize QueueSink instance and start its writer thread.
+
+        Args:
+            target: Sink that the writer thread writes to.
+            max_pending: Maximum number of chunks waiting to be written.
+
+        """
+        self._target = target
+        self._queue: queue.Queue[bytes | None] = queue.Queue(max_pending)
+        self.dropped_bytes = 0
+        self._writer = threading.Thread(target=self._write_batches, daemon=True)
+        self._writer.start()
+
+    def write(self, data: bytes) -> None:
+        """Queue a chunk of the transcript for the writer thread."""
+        try:
+            self._queue.put_nowait(bytes(data))
+        except queue.Full:
+            self.dropped_bytes += len(data)
+
+    def flush(self) -> None:
+        """Do nothing; the writer thread flushes the target after each batch."""
+
+    def close(self) -> None:
+        """Write all queued chunks and stop the writer thread.
+
+        The target sink is flushed but not closed.
+        """
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_batches(self) -> None:
+        """Write queued chunks to the target until closed."""
+        closing = False
+        while not closing:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+
+            batch = [chunk]
+            while True:
+                try:
+                    chunk = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if chunk is None:
+                    closing = True
+                    break
+                batch.append(chunk)
+
+            self._target.write(b"".join(batch))
+            self._target.flush()
+
+
+class TeeSink:
+    """Write the transcript to several sinks in turn."""
+
+    def __init__(self, *targets: LogSink) -> None:
+        """Initialize TeeSink instance.
+
+        Args:
+            targets: Sinks to write to, in order.
+
+        """
+        self._targets = targets
+
+    def write(self, data: bytes) -> None:
+        """Write a chunk of the transcript to every sink."""
+        for target in self._targets:
+            target.write(data)
+
+    def flush(self) -> None:
+        """Flush every sink."""
+        for target in self._targets:
+            target.flush()
@@ -4,15 +4,14 @@ This module provides ProcessIO class that implements the TemplatedIO interface
 for communicating with local processes using the pexpect library.
 """
 
-import sys
-
 import pexpect
 
-from ._pexpect_helpers import wait_for_pattern
-from .templated_io import TemplatedIO
+from ._pexpect_helpers import setup_process
+from ._pexpect_io import PexpectIOBase
+from .templated_io import IOOptions
 
 
-class ProcessIO(TemplatedIO):
+class ProcessIO(PexpectIOBase):
     """Local process communication using pexpect.
 
     Implements the TemplatedIO interface for communicating with local processes
@@ -25,6 +24,7 @@ class ProcessIO(TemplatedIO):
         start_command: str,
         prompt: str = "",
         newline: str = "",
+        options: IOOptions | None = None,
     ) -> None:
         """Initialize ProcessIO instance.
 
@@ -32,9 +32,10 @@ class ProcessIO(TemplatedIO):
             start_command: Command to start the target process.
             prompt: Expected prompt string to wait for.
             newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
 
         """
-        super().__init__(prompt, newline)
+        super().__init__(prompt, newline, options)
         self.process: pexpect.spawn | None = None
         self._start_command = start_command
 
@@ -52,8 +53,9 @@ class ProcessIO(TemplatedIO):
             msg = "Process has already started"
             raise RuntimeError(msg)
 
+        self._clear_prompt()
         self.process = pexpect.spawn(self._start_command)
-        self.process.logfile = sys.stdout.buffer
+        setup_process(self.process, self._options, self._transcript)
 
     def stop(self) -> None:
         """Stop the local process.
@@ -69,51 +71,8 @@ class ProcessIO(TemplatedIO):
             msg = "Process not started"
             raise RuntimeError(msg)
 
+        if self._reactor:
+            self._reactor.detach(self.process)
         self.process.terminate()
         self.process.wait()
         self.process = None
-
-    def send_command(self, command: str) -> None:
-        """Send a command to the process.
-
-        Appends the configured newline character and sends the command
-        to the process stdin.
-
-        Args:
-            command: Command string to send.
-
-        Raises:
-            RuntimeError: If process is not started.
-
-        """
-        if not self.process:
-            msg = "Process not started"
-            raise RuntimeError(msg)
-
-        output_line = command + self._newline
-        self.process.sendline(output_line)
-
-    def wait_for(self, expect: str, timeout_sec: float = 3.0) -> str | None:
-        """Wait for expected pattern in process output.
-
-        Uses pexpect to wait for the specified pattern to appear in the
-        process output stream.
-
-        Args:
-            expect: Regular expression pattern to wait for.
-            timeout_sec: Maximum time to wait in seconds.
-
-        Returns:
-            str: The matched string if pattern is found.
-            None: If timeout occurs before pattern is matched.
-
-        Raises:
-            RuntimeError: If process is not started.
-            TypeError: If the matched output is not bytes.
-
-        """
-        if not self.process:
-            msg = "Process not started"
-            raise RuntimeError(msg)
-
-        return wait_for_pattern(self.process, expect, timeout_sec)
@@ -0,0 +1,263 @@
+"""Single reader thread shared by many sessions.
+
+Without a reactor, every wait runs its own select() loop on the process file
+descriptor in the calling thread. This module provides Reactor class that
+instead reads the output of all attached processes in one selector loop into
+per-session buffers, and makes waits block on a condition variable until
+their buffer has data. Idle sessions then cost neither threads nor wakeups.
+"""
+
+import contextlib
+import os
+import selectors
+import threading
+from types import TracebackType
+from typing import Self
+
+import pexpect
+from pexpect_serial import SerialSpawn
+
+
+class _Channel:
+    """Output of one process buffered by the reactor."""
+
+    def __init__(
+        self, process: pexpect.spawn | SerialSpawn, reactor: "Reactor"
+    ) -> None:
+        self.process = process
+        self.fd = process.child_fd
+        self.paused = False
+        self._reactor = reactor
+        self._buffer = bytearray()
+        self.ended = False
+        self._condition = threading.Condition()
+
+    def feed(self, data: bytes) -> bool:
+        """Append data read by the reactor.
+
+        Returns:
+            True if the buffer is full and reading should pause.
+
+        """
+        with self._condition:
+            self._buffer += data
+            self._condition.notify_all()
+            return len(self._buffer) >= self._reactor.max_buffer_size
+
+    def close(self) -> None:
+        """Mark the output as ended."""
+        with self._condition:
+            self.ended = True
+            self._condition.notify_all()
+
+    def read_nonblocking(self, size: int = 1, timeout: float | None = -1) -> bytes:
+        """Read up to `size` bytes from the buffer instead of the process.
+
+        Follows the contract of pexpect: wait at most `timeout` seconds for at
+        least one byte (-1 for the process timeout, None for no limit), then
+        return up to `size` bytes, or raise TIMEOUT or EOF.
+        """
+        if timeout == -1:
+            timeout = self.process.timeout
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._buffer or self.ended, timeout)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            eof = self.ended
+
+        if not data:
+            if eof:
+                self.process.flag_eof = True
+                msg = "End Of File (EOF)."
+                raise pexpect.EOF(msg)
+            msg = "Timeout exceeded."
+            raise pexpect.TIMEOUT(msg)
+
+        if self.paused:
+            self._reactor.resume(self)
+
+        # Decode and log like pexpect's own read_nonblocking
+        process = self.process
+        decoded: bytes = process._decoder.decode(data, final=False)  # type: ignore[union-attr]  # noqa: SLF001
+        process._log(decoded, "read")  # type: ignore[union-attr]  # noqa: SLF001
+        return decoded
+
+
+class Reactor:
+    """Selector loop reading the output of many processes in one thread.
+
+    Pass a reactor to several IO instances via `IOOptions(reactor=...)`. Each
+    IO attaches its process when started and detaches it when stopped. The
+    reader thread starts with the first attached process.
+
+    Output is buffered per process up to `max_buffer_size` bytes; beyond
+    that, reading the process pauses until its buffer is consumed, so a busy
+    process is throttled by the pseudo-terminal as without a reactor.
+    AsyncPexpectIO registers file descriptors on its own event loop and
+    cannot drive an IO attached to a reactor.
+    """
+
+    _READ_SIZE = 65536
+
+    def __init__(self, max_buffer_size: int = 1024 * 1024) -> None:
+        """Initialize Reactor instance.
+
+        Args:
+            max_buffer_size: Number of unconsumed bytes per process after which
+                reading it pauses.
+
+        """
+        self.max_buffer_size = max_buffer_size
+        self._selector = selectors.DefaultSelector()
+        self._channels: dict[int, _Channel] = {}
+        self._lock = threading.Lock()
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        # A full pipe already wakes the selector, so waking must never block
+        os.set_blocking(self._wake_write, False)
+        self._selector.register(self._wake_read, selectors.EVENT_READ)
+        self._thread: threading.Thread | None = None
+        self._closing = False
+
+    def __enter__(self) -> Self:
+        """Return the reactor itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the reactor."""
+        self.close()
+
+    @property
+    def process_count(self) -> int:
+        """Number of attached processes."""
+        return len(self._channels)
+
+    def attach(self, process: pexpect.spawn | SerialSpawn) -> None:
+        """Read the output of a process in the reactor thread.
+
+        The `read_nonblocking` method of the process is replaced, so every
+        pexpect operation on it reads from the reactor's buffer.
+
+        Args:
+            process: Started process to attach.
+
+        Raises:
+            RuntimeError: If the reactor is closed or the process is attached.
+
+        """
+        channel = _Channel(process, self)
+        with self._lock:
+            if self._closing:
+                msg = "Reactor is closed"
+                raise RuntimeError(msg)
+            if channel.fd in self._channels:
+                msg = "Process is already attached"
+                raise RuntimeError(msg)
+
+            self._channels[channel.fd] = channel
+            self._selector.register(channel.fd, selectors.EVENT_READ, channel)
+            process.read_nonblocking = channel.read_nonblocking  # type: ignore[method-assign]
+            if not self._thread:
+                self._thread = threading.Thread(
+                    target=self._run, name="blabot-reactor", daemon=True
+                )
+                self._thread.start()
+        self._wake()
+
+    def detach(self, process: pexpect.spawn | SerialSpawn) -> None:
+        """Stop reading a process and restore its own read method.
+
+        Output buffered but not consumed yet is discarded. After this returns,
+        the reactor thread does not touch the process anymore, so it can be
+        closed safely.
+
+        Args:
+            process: Attached process.
+
+        """
+        with self._lock:
+            channel = self._channels.pop(process.child_fd, None)
+            if channel is None:
+                return
+            if not channel.paused:
+                self._selector.unregister(channel.fd)
+            with contextlib.suppress(AttributeError):
+                del process.read_nonblocking
+        channel.close()
+        self._wake()
+
+    def resume(self, channel: _Channel) -> None:
+        """Resume reading a process paused because its buffer was full."""
+        with self._lock:
+            if (
+                channel.paused
+                and not channel.ended
+                and self._channels.get(channel.fd) is channel
+            ):
+                channel.paused = False
+                self._selector.register(channel.fd, selectors.EVENT_READ, channel)
+        self._wake()
+
+    def close(self) -> None:
+        """Stop the reactor thread and detach all processes."""
+        with self._lock:
+            self._closing = True
+            channels = list(self._channels.values())
+        for channel in channels:
+            self.detach(channel.process)
+
+        self._wake()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._selector.close()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+    def _wake(self) -> None:
+        """Interrupt the selector so that it picks up registration changes."""
+        with contextlib.suppress(BlockingIOError, OSError):
+            os.write(self._wake_write, b"\0")
+
+    def _run(self) -> None:
+        """Read ready processes until closed."""
+        while not self._closing:
+            events = self._selector.select()
+            with self._lock:
+                for key, _ in events:
+                    if key.fd == self._wake_read:
+                        with contextlib.suppress(BlockingIOError):
+                            os.read(self._wake_read, self._READ_SIZE)
+                        continue
+                    channel = self._channels.get(key.fd)
+                    if channel is not None:
+                        self._read(channel)
+
+    def _read(self, channel: _Channel) -> None:
+        """Read available output of a process into its buffer.
+
+        Must be called with the lock held.
+        """
+        try:
+            data = os.read(channel.fd, self._READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            # Linux reports the end of a pseudo-terminal with EIO
+            data = b""
+
+        if not data:
+            self._selector.unregister(channel.fd)
+            channel.paused = True
+            channel.close()
+            return
+
+        if channel.feed(data):
+            self._selector.unregister(channel.fd)
+            channel.paused = True
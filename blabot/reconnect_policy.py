@@ -0,0 +1,55 @@
+"""Backoff policy for re-opening a serial port after a disconnect.
+
+When a device reboots, its USB-serial adapter often disappears for a moment
+and comes back under the same name. DeviceIO can re-open the port in place
+instead of being rebuilt; this module provides the policy deciding how often
+it retries and for how long.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReconnectPolicy:
+    """Exponential backoff between attempts to re-open a port.
+
+    Attributes:
+        initial_delay_sec: Delay after the first failed attempt.
+        max_delay_sec: Upper bound of the delay between attempts.
+        multiplier: Factor applied to the delay after each failed attempt.
+        timeout_sec: Time after which reconnecting gives up.
+
+    """
+
+    initial_delay_sec: float = 0.05
+    max_delay_sec: float = 1.0
+    multiplier: float = 2.0
+    timeout_sec: float = 30.0
+
+    def __post_init__(self) -> None:
+        """Validate the policy.
+
+        Raises:
+            ValueError: If a value is out of range.
+
+        """
+        if self.initial_delay_sec <= 0 or self.max_delay_sec < self.initial_delay_sec:
+            msg = (
+                "Delays must satisfy 0 < initial_delay_sec <= max_delay_sec, got "
+                f"{self.initial_delay_sec} and {self.max_delay_sec}"
+            )
+            raise ValueError(msg)
+        if self.multiplier < 1:
+            msg = f"multiplier must be at least 1, got {self.multiplier}"
+            raise ValueError(msg)
+        if self.timeout_sec < 0:
+            msg = f"timeout_sec must not be negative, got {self.timeout_sec}"
+            raise ValueError(msg)
+
+    def delays(self) -> Iterator[float]:
+        """Yield the delays between successive attempts, without end."""
+        delay = self.initial_delay_sec
+        while True:
+            yield delay
+            delay = min(delay * self.multiplier, self.max_delay_sec)
@@ -0,0 +1,361 @@
+"""Replay of a recorded session without the process.
+
+This module provides ReplayIO class that implements the TemplatedIO interface
+on top of a recording written by SessionRecorder. Output recorded after an
+input is released once the same input is sent again, so scenario code runs
+against the recorded responses at memory speed, or at a chosen multiple of
+the recorded speed, without the device, host or container.
+"""
+
+import re
+import time
+from pathlib import Path
+
+import pexpect
+
+from ._pexpect_helpers import setup_process
+from ._pexpect_io import PexpectIOBase
+from .session_recorder import RecordedChunk, read_recording
+from .templated_io import IOOptions
+
+
+class ReplayError(RuntimeError):
+    """Raised when the input sent differs from the recording."""
+
+
+class ReplaySpawn(pexpect.spawn):
+    """pexpect spawn serving reads and checking sends against a recording.
+
+    No process is started. Reads return recorded output up to the next
+    recorded input and time out there until that input is sent. Once the
+    whole recording has been read, reads raise EOF.
+    """
+
+    # pexpect.spawn delegates this flag to the process it would have started
+    flag_eof = False
+
+    def __init__(
+        self,
+        chunks: list[RecordedChunk],
+        speed: float | None = None,
+        start_sec: float = 0.0,
+    ) -> None:
+        """Initialize ReplaySpawn instance.
+
+        Args:
+            chunks: Recorded chunks to replay.
+            speed: Factor by which the recorded gaps between input and output
+                are shortened. None releases output without delay.
+            start_sec: Recorded time at which the replay starts, e.g. the
+                time of the last skipped chunk.
+
+        """
+        super().__init__(None)  # type: ignore[arg-type]
+        self._chunks = chunks
+        self._speed = speed
+        self._next = 0
+        self._pending = bytearray()
+        self._expected = b""
+        self._recorded_at = start_sec
+        self._replayed_at = time.monotonic()
+
+    @property
+    def remaining_chunks(self) -> int:
+        """Number of recorded chunks not replayed yet."""
+        return len(self._chunks) - self._next
+
+    @property
+    def awaiting_input(self) -> bool:
+        """Whether all output before the next recorded input has been read."""
+        return not self._pending and (
+            self._next < len(self._chunks)
+            and self._chunks[self._next].direction == "send"
+        )
+
+    def read_nonblocking(self, size: int = 1, timeout: float | None = -1) -> bytes:
+        """Read up to `size` bytes of recorded output.
+
+        Follows the contract of pexpect: wait at most `timeout` seconds for
+        output that is due (-1 for the spawn timeout, None for no limit),
+        then return up to `size` bytes, or raise TIMEOUT or EOF.
+        """
+        if timeout == -1:
+            timeout = self.timeout
+
+        if not self._pending:
+            self._release_output(timeout)
+
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        self._log(data, "read")  # type: ignore[attr-defined]
+        return data
+
+    def send(self, s: str | bytes) -> int:
+        """Check input against the recording and release the output after it.
+
+        Line ends are ignored in the comparison, so that recordings of IOs
+        with other line separators can be replayed.
+
+        Raises:
+            ReplayError: If the input differs from the recorded input.
+
+        """
+        data = s.encode("utf-8") if isinstance(s, str) else s
+        self._log(data, "send")  # type: ignore[attr-defined]
+        # Every send takes recorded input, even one of only line ends
+        if not self._expected:
+            self._expected = _strip_line_ends(self._next_input(data))
+        unmatched = _strip_line_ends(data)
+        while unmatched:
+            if not self._expected:
+                self._expected = _strip_line_ends(self._next_input(data))
+                continue
+            size = min(len(unmatched), len(self._expected))
+            if unmatched[:size] != self._expected[:size]:
+                msg = f"Sent {data!r}, but the recording expects {self._expected!r}"
+                raise ReplayError(msg)
+            unmatched = unmatched[size:]
+            self._expected = self._expected[size:]
+        return len(data)
+
+    def terminate(self, force: bool = False) -> bool:  # noqa: ARG002, FBT001, FBT002
+        """Do nothing; there is no process to terminate."""
+        return True
+
+    def wait(self) -> int:
+        """Do nothing; there is no process to wait for."""
+        return 0
+
+    def isalive(self) -> bool:
+        """Check whether recorded output is left."""
+        return bool(self._pending) or self._next < len(self._chunks)
+
+    def close(self, force: bool = True) -> None:  # noqa: FBT001, FBT002
+        """Do nothing; there is no process to close."""
+
+    def _release_output(self, timeout: float | None) -> None:
+        """Move the next recorded output to the pending output once it is due.
+
+        Raises:
+            pexpect.TIMEOUT: If the next chunk is input, or output that is not
+                due within the timeout.
+            pexpect.EOF: If the recording has been replayed completely.
+
+        """
+        if self._next == len(self._chunks):
+            self.flag_eof = True
+            msg = "End of the recording."
+            raise pexpect.EOF(msg)
+
+        chunk = self._chunks[self._next]
+        if chunk.direction == "send":
+            msg = "Timeout exceeded."
+            raise pexpect.TIMEOUT(msg)
+
+        if self._speed is not None:
+            due = self._replayed_at + (chunk.time_sec - self._recorded_at) / self._speed
+            delay = due - time.monotonic()
+            if timeout is not None and delay > timeout:
+                time.sleep(max(timeout, 0))
+                msg = "Timeout exceeded."
+                raise pexpect.TIMEOUT(msg)
+            time.sleep(max(delay, 0))
+
+        self._pending += chunk.data
+        self._next += 1
+
+    def _next_input(self, sent: bytes) -> bytes:
+        """Skip to the next recorded input, keeping the output before it.
+
+        Raises:
+            ReplayError: If the recording has no more input.
+
+        """
+        while self._next < len(self._chunks):
+            chunk = self._chunks[self._next]
+            self._next += 1
+            if chunk.direction == "send":
+                self._recorded_at = chunk.time_sec
+                self._replayed_at = time.monotonic()
+                return chunk.data
+            self._pending += chunk.data
+
+        msg = f"Sent {sent!r}, but the recording has no more input"
+        raise ReplayError(msg)
+
+
+def _strip_line_ends(data: bytes) -> bytes:
+    """Remove carriage returns and line feeds."""
+    return data.replace(b"\r", b"").replace(b"\n", b"")
+
+
+def _skip_setup(
+    chunks: list[RecordedChunk],
+    start_command: str | None,
+    prompt: re.Pattern[bytes] | None,
+) -> tuple[list[RecordedChunk], float]:
+    """Drop the recorded input that `start` sent, with the output before it.
+
+    Args:
+        chunks: Recorded chunks.
+        start_command: Recorded command that started the target. The chunks
+            up to and including the input that ends with it are dropped.
+        prompt: Prompt to look for in the recorded output when no start
+            command is given. The chunks up to and including the last input
+            before the first output containing the prompt are dropped.
+
+    Returns:
+        The chunks after the dropped input, and the recorded time of that
+        input. All chunks if neither a start command nor a prompt is given,
+        or if no input precedes the first prompt.
+
+    Raises:
+        ValueError: If the start command is not in the recorded input.
+
+    """
+    if start_command is not None:
+        last_send = _find_input(chunks, _strip_line_ends(start_command.encode()))
+        if last_send < 0:
+            msg = f"The recording never sends {start_command!r}"
+            raise ValueError(msg)
+    elif prompt is not None:
+        last_send = _find_input_before_prompt(chunks, prompt)
+    else:
+        last_send = -1
+
+    if last_send < 0:
+        return chunks, 0.0
+    return chunks[last_send + 1 :], chunks[last_send].time_sec
+
+
+def _find_input(chunks: list[RecordedChunk], command: bytes) -> int:
+    """Find the index of the recorded input that completes `command`."""
+    sent = bytearray()
+    for index, chunk in enumerate(chunks):
+        if chunk.direction == "send":
+            sent += _strip_line_ends(chunk.data)
+            if sent.endswith(command):
+                return index
+    return -1
+
+
+def _find_input_before_prompt(
+    chunks: list[RecordedChunk], prompt: re.Pattern[bytes]
+) -> int:
+    """Find the index of the last recorded input before the first prompt."""
+    last_send = -1
+    output: list[bytes] = []
+    for index, chunk in enumerate(chunks):
+        if chunk.direction == "read":
+            output.append(chunk.data)
+            continue
+        # Each run of output between two inputs is joined and searched once
+        if prompt.search(b"".join(output)):
+            return last_send
+        last_send = index
+        output.clear()
+    return last_send if prompt.search(b"".join(output)) else -1
+
+
+class ReplayIO(PexpectIOBase):
+    """Replay of a recorded session behind the TemplatedIO interface.
+
+    Scenario code must send the same input as the recorded session; any
+    other input raises ReplayError. Waits for output that the recording does
+    not contain before the next input time out immediately instead of after
+    their timeout, and `iter_lines` ends there.
+
+    Recordings of SSHProcessIO or the Docker classes start with input that
+    `start` sent to log in or to start the target, which the scenario does
+    not send again. By default, recorded input up to the start command is
+    skipped together with the output before it; without a start command,
+    recorded input before the first prompt is skipped instead.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        recording: str | Path,
+        prompt: str = "",
+        newline: str = "",
+        options: IOOptions | None = None,
+        speed: float | None = None,
+        *,
+        skip_setup: bool = True,
+        start_command: str | None = None,
+    ) -> None:
+        """Initialize ReplayIO instance.
+
+        Args:
+            recording: Path of a file written by SessionRecorder.
+            prompt: Expected prompt string to wait for.
+            newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
+            speed: Factor by which the recorded delays of the output are
+                shortened, e.g. 1.0 for real time. None replays the output
+                without delay.
+            skip_setup: Whether to skip the recorded input that `start` sent,
+                and the output before it.
+            start_command: Start command of the recorded IO. The recorded
+                input up to and including it is skipped. If None, the
+                recorded input before the first prompt is skipped.
+
+        Raises:
+            ValueError: If speed is not positive or a reactor is configured.
+
+        """
+        super().__init__(prompt, newline, options)
+        if speed is not None and speed <= 0:
+            msg = f"speed must be positive, got {speed}"
+            raise ValueError(msg)
+        if self._reactor:
+            msg = "ReplayIO cannot be read by a reactor"
+            raise ValueError(msg)
+        self.process: ReplaySpawn | None = None
+        self._recording = Path(recording)
+        self._speed = speed
+        self._skip_setup = skip_setup
+        self._start_command = start_command
+
+    def start(self) -> None:
+        """Load the recording and start replaying it from the beginning.
+
+        Raises:
+            RuntimeError: If replay is already started.
+            ValueError: If the file is not a recording, or the start command
+                is not in the recorded input.
+
+        """
+        if self.process:
+            msg = "Process has already started"
+            raise RuntimeError(msg)
+
+        chunks = read_recording(self._recording)
+        start_sec = 0.0
+        if self._skip_setup:
+            chunks, start_sec = _skip_setup(
+                chunks, self._start_command, self._prompt_regex
+            )
+        self._clear_prompt()
+        self.process = ReplaySpawn(chunks, self._speed, start_sec)
+        setup_process(self.process, self._options, self._transcript)
+
+    def stop(self) -> None:
+        """Stop replaying.
+
+        Raises:
+            RuntimeError: If replay is not started.
+
+        """
+        if not self.process:
+            msg = "Process not started"
+            raise RuntimeError(msg)
+
+        self.process.close()
+        self.process = None
+
+    def _output_ended(self) -> bool:
+        """Check whether no output can arrive before more input is sent."""
+        process = self.process
+        if not process or process.buffer:
+            return False
+        return bool(process.flag_eof) or process.awaiting_input
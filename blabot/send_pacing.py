@@ -0,0 +1,113 @@
+"""Pacing of input written to a process.
+
+pexpect sleeps a fixed 50 ms before every send by default. blabot disables
+that delay and paces input explicitly instead: PTY backends send without any
+delay, while slow serial consoles can be given a byte rate and a gap between
+lines so that their input buffers never overflow.
+"""
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SendPacing:
+    """Limits on how fast input is written to a process.
+
+    Attributes:
+        bytes_per_sec: Maximum average write rate. None does not limit it.
+        line_gap_sec: Minimum time between the end of one line and the start
+            of the next. Time spent waiting for responses counts towards it.
+        burst_bytes: Maximum number of bytes written at once when
+            `bytes_per_sec` is set.
+
+    """
+
+    bytes_per_sec: float | None = None
+    line_gap_sec: float = 0.0
+    burst_bytes: int = 16
+
+    def __post_init__(self) -> None:
+        """Validate the limits.
+
+        Raises:
+            ValueError: If a limit is out of range.
+
+        """
+        if self.bytes_per_sec is not None and self.bytes_per_sec <= 0:
+            msg = f"bytes_per_sec must be positive, got {self.bytes_per_sec}"
+            raise ValueError(msg)
+        if self.line_gap_sec < 0:
+            msg = f"line_gap_sec must not be negative, got {self.line_gap_sec}"
+            raise ValueError(msg)
+        if self.burst_bytes < 1:
+            msg = f"burst_bytes must be at least 1, got {self.burst_bytes}"
+            raise ValueError(msg)
+
+    @property
+    def limited(self) -> bool:
+        """Whether any limit is set."""
+        return self.bytes_per_sec is not None or self.line_gap_sec > 0
+
+
+class SendPacer:
+    """Token bucket applying SendPacing to the lines sent by one IO."""
+
+    def __init__(self, pacing: SendPacing) -> None:
+        """Initialize SendPacer instance.
+
+        Args:
+            pacing: Limits to apply.
+
+        """
+        self._pacing = pacing
+        self._tokens = float(pacing.burst_bytes)
+        self._refilled_at = time.monotonic()
+        self._line_sent_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def pacing(self) -> SendPacing:
+        """Limits applied by this pacer."""
+        return self._pacing
+
+    def send_line(self, write: Callable[[bytes], object], line: bytes) -> None:
+        """Write a line, sleeping only as long as the limits require.
+
+        Args:
+            write: Function writing bytes to the process.
+            line: Line to write, including its line terminator.
+
+        """
+        with self._lock:
+            if self._line_sent_at is not None:
+                gap = time.monotonic() - self._line_sent_at
+                if gap < self._pacing.line_gap_sec:
+                    time.sleep(self._pacing.line_gap_sec - gap)
+
+            if self._pacing.bytes_per_sec is None:
+                write(line)
+            else:
+                view = memoryview(line)
+                for start in range(0, len(view), self._pacing.burst_bytes):
+                    chunk = view[start : start + self._pacing.burst_bytes]
+                    self._take_tokens(len(chunk), self._pacing.bytes_per_sec)
+                    write(bytes(chunk))
+
+            self._line_sent_at = time.monotonic()
+
+    def _take_tokens(self, count: int, rate: float) -> None:
+        """Wait until `count` bytes may be written and consume their tokens."""
+        now = time.monotonic()
+        self._tokens = min(
+            float(self._pacing.burst_bytes),
+            self._tokens + (now - self._refilled_at) * rate,
+        )
+        self._refilled_at = now
+        if self._tokens < count:
+            time.sleep((count - self._tokens) / rate)
+            self._tokens = float(count)
+            self._refilled_at = time.monotonic()
+        self._tokens -= count
@@ -0,0 +1,189 @@
+"""Dedicated reader thread for serial devices.
+
+pexpect_serial reads a serial port only while a wait is running, with small
+reads, so fast devices can overflow the port's input buffer between waits.
+This module provides SerialReader class that reads the port continuously in
+its own thread, in chunks as large as the pending input, and wakes waiters as
+soon as data lands.
+"""
+
+import contextlib
+import threading
+import time
+from types import TracebackType
+from typing import Self
+
+import pexpect
+import serial
+from pexpect_serial import SerialSpawn
+
+
+class SerialReader:
+    """Thread reading a serial port into a buffer consumed by pexpect.
+
+    Attach the SerialSpawn of the port to route every pexpect read through
+    the buffer. Unlike a pseudo-terminal, a serial port cannot be paused, so
+    once more than `max_buffer_size` bytes are unconsumed, the oldest ones
+    are dropped and counted in `overrun_bytes`.
+    """
+
+    def __init__(
+        self,
+        device: serial.Serial,
+        max_buffer_size: int = 1024 * 1024,
+        chunk_size: int = 65536,
+    ) -> None:
+        """Initialize SerialReader instance.
+
+        Args:
+            device: Open serial port. Its read timeout bounds how long closing
+                the reader can take on ports that cannot cancel reads.
+            max_buffer_size: Number of unconsumed bytes kept at most.
+            chunk_size: Maximum number of bytes read at once.
+
+        Raises:
+            ValueError: If a size is less than 1.
+
+        """
+        if max_buffer_size < 1 or chunk_size < 1:
+            msg = "max_buffer_size and chunk_size must be at least 1"
+            raise ValueError(msg)
+
+        self.max_buffer_size = max_buffer_size
+        self.bytes_read = 0
+        self.read_calls = 0
+        self.overrun_bytes = 0
+        self._device = device
+        self._chunk = bytearray(chunk_size)
+        self._buffer = bytearray()
+        self._condition = threading.Condition()
+        self._process: SerialSpawn | None = None
+        self._thread: threading.Thread | None = None
+        self._started_at: float | None = None
+        self._closing = False
+        self._ended = False
+
+    def __enter__(self) -> Self:
+        """Return the reader itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the reader."""
+        self.close()
+
+    @property
+    def bytes_per_sec(self) -> float:
+        """Average read throughput since the reader started."""
+        if self._started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self._started_at
+        return self.bytes_read / elapsed if elapsed > 0 else 0.0
+
+    def attach(self, process: SerialSpawn) -> None:
+        """Start reading and serve the reads of a process from the buffer.
+
+        The `read_nonblocking` method of the process is replaced, so every
+        pexpect operation on it reads from the reader's buffer.
+
+        Args:
+            process: SerialSpawn of the port read by this reader.
+
+        Raises:
+            RuntimeError: If a process is already attached.
+
+        """
+        if self._thread:
+            msg = "Process is already attached"
+            raise RuntimeError(msg)
+
+        self._process = process
+        process.read_nonblocking = self.read_nonblocking
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="blabot-serial-reader", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the reader thread and restore the read method of the process.
+
+        Output read but not consumed yet is discarded.
+        """
+        self._closing = True
+        with contextlib.suppress(serial.SerialException, OSError):
+            self._device.cancel_read()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._process is not None:
+            with contextlib.suppress(AttributeError):
+                del self._process.read_nonblocking
+            self._process = None
+
+    def read_nonblocking(self, size: int = 1, timeout: float | None = -1) -> bytes:
+        """Read up to `size` bytes from the buffer instead of the port.
+
+        Follows the contract of pexpect: wait at most `timeout` seconds for at
+        least one byte (-1 for the process timeout, None for no limit), then
+        return up to `size` bytes, or raise TIMEOUT or EOF.
+        """
+        process = self._process
+        if process is None:
+            msg = "No process is attached"
+            raise RuntimeError(msg)
+        if timeout == -1:
+            timeout = process.timeout
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._buffer or self._ended, timeout)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            eof = self._ended
+
+        if not data:
+            if eof:
+                process.flag_eof = True
+                msg = "End Of File (EOF)."
+                raise pexpect.EOF(msg)
+            msg = "Timeout exceeded."
+            raise pexpect.TIMEOUT(msg)
+
+        # Decode and log like pexpect's own read_nonblocking
+        decoded: bytes = process._decoder.decode(data, final=False)  # noqa: SLF001
+        process._log(decoded, "read")  # noqa: SLF001
+        return decoded
+
+    def _run(self) -> None:
+        """Read the port until closed or the port fails."""
+        view = memoryview(self._chunk)
+        try:
+            while not self._closing:
+                # Block for one byte when idle, then take all pending input
+                size = min(max(self._device.in_waiting, 1), len(view))
+                count = self._device.readinto(view[:size])
+                if count:
+                    self._feed(view[:count])
+        except (serial.SerialException, OSError):
+            # The port was closed or disconnected
+            pass
+        finally:
+            with self._condition:
+                self._ended = True
+                self._condition.notify_all()
+
+    def _feed(self, data: memoryview) -> None:
+        """Append read data, dropping the oldest data beyond the limit."""
+        with self._condition:
+            self._buffer += data
+            excess = len(self._buffer) - self.max_buffer_size
+            if excess > 0:
+                del self._buffer[:excess]
+                self.overrun_bytes += excess
+            self.bytes_read += len(data)
+            self.read_calls += 1
+            self._condition.notify_all()
@@ -0,0 +1,166 @@
+"""Concurrent operations across many sessions.
+
+This module provides SessionGroup class that runs the same operation on many
+TemplatedIO instances at once on a bounded thread pool, so that driving
+hundreds of devices takes about as long as driving the slowest one.
+"""
+
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from .templated_io import TemplatedIO
+
+
+@dataclass
+class SessionResult:
+    """Outcome of an operation on one session.
+
+    Attributes:
+        session: The session the operation ran on.
+        value: Return value of the operation, or None if it raised.
+        error: Exception raised by the operation, or None if it succeeded.
+        elapsed_sec: Time the operation took.
+
+    """
+
+    session: TemplatedIO
+    value: Any = None
+    error: Exception | None = None
+    elapsed_sec: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the operation completed without raising."""
+        return self.error is None
+
+
+class SessionGroup:
+    """Run operations across many sessions concurrently.
+
+    Each operation runs once per session on a thread pool of at most
+    `max_workers` threads. Exceptions are collected per session instead of
+    aborting the other sessions. Results are returned in the order of the
+    sessions.
+    """
+
+    def __init__(self, sessions: list[TemplatedIO], max_workers: int = 32) -> None:
+        """Initialize SessionGroup instance.
+
+        Args:
+            sessions: Sessions to operate on.
+            max_workers: Maximum number of sessions operated on at once.
+                Must be at least 1.
+
+        Raises:
+            ValueError: If max_workers is less than 1.
+
+        """
+        if max_workers < 1:
+            msg = f"max_workers must be at least 1, got {max_workers}"
+            raise ValueError(msg)
+
+        self._sessions = list(sessions)
+        self._max_workers = max_workers
+
+    @property
+    def sessions(self) -> list[TemplatedIO]:
+        """Sessions of the group."""
+        return list(self._sessions)
+
+    def map(self, operation: Callable[[TemplatedIO], object]) -> list[SessionResult]:
+        """Run an operation on every session concurrently.
+
+        Args:
+            operation: Function called with each session.
+
+        Returns:
+            Result of the operation for each session, in session order.
+
+        """
+        if not self._sessions:
+            return []
+
+        workers = min(self._max_workers, len(self._sessions))
+        with ThreadPoolExecutor(workers, thread_name_prefix="blabot") as executor:
+            futures = [
+                executor.submit(self._run, operation, session)
+                for session in self._sessions
+            ]
+            return [future.result() for future in futures]
+
+    def start(self) -> list[SessionResult]:
+        """Start every session.
+
+        Returns:
+            Result of `start` for each session.
+
+        """
+        return self.map(lambda session: session.start())
+
+    def stop(self) -> list[SessionResult]:
+        """Stop every session.
+
+        Returns:
+            Result of `stop` for each session.
+
+        """
+        return self.map(lambda session: session.stop())
+
+    def run_command(
+        self,
+        command: str,
+        expect: str | list[str] = "",
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+    ) -> list[SessionResult]:
+        """Send a command to every session and wait for the expected response.
+
+        See `TemplatedIO.run_command` for the meaning of the arguments.
+
+        Returns:
+            Result of `run_command` for each session.
+
+        """
+        return self.map(
+            lambda session: session.run_command(
+                command, expect, timeout_sec, attempts, fail_on
+            )
+        )
+
+    def wait_for(
+        self,
+        expect: str,
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> list[SessionResult]:
+        """Wait for the expected pattern on every session.
+
+        See `TemplatedIO.wait_for_match` for the meaning of the arguments.
+
+        Returns:
+            The matched string or None for each session, as `wait_for`
+            returns it.
+
+        """
+
+        def wait(session: TemplatedIO) -> str | None:
+            match = session.wait_for_match(expect, timeout_sec, fail_on)
+            return None if match is None else match.text
+
+        return self.map(wait)
+
+    @staticmethod
+    def _run(
+        operation: Callable[[TemplatedIO], object], session: TemplatedIO
+    ) -> SessionResult:
+        """Run an operation on a session, recording its outcome."""
+        start = time.monotonic()
+        try:
+            value = operation(session)
+        except Exception as e:  # noqa: BLE001
+            return SessionResult(session, error=e, elapsed_sec=time.monotonic() - start)
+        return SessionResult(session, value, elapsed_sec=time.monotonic() - start)
@@ -0,0 +1,230 @@
+"""Pool of pre-started ProcessIO sessions.
+
+This module provides SessionPool class that keeps ProcessIO sessions started
+and waiting at their prompt in the background, so that tests can acquire a
+ready session without paying the startup time of the target process.
+"""
+
+import queue
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from .process_io import ProcessIO
+from .templated_io import IOOptions
+
+
+class SessionPool:
+    """Pool of pre-started, prompt-ready ProcessIO sessions.
+
+    A background thread starts sessions of the configured command until
+    `size` sessions are ready. Acquired sessions are stopped on release
+    because their state is unknown, and a new one is started to replace them.
+    Startup output printed before the first prompt is consumed while warming
+    up, so use a pool only when callers do not need to check it.
+    """
+
+    _RETRY_INTERVAL_SEC = 1.0
+
+    def __init__(  # noqa: PLR0913
+        self,
+        start_command: str,
+        size: int = 2,
+        prompt: str = "",
+        newline: str = "",
+        options: IOOptions | None = None,
+        *,
+        ready_timeout_sec: float = 10.0,
+    ) -> None:
+        """Initialize SessionPool instance.
+
+        Args:
+            start_command: Command to start the target process.
+            size: Number of ready sessions to keep. Must be at least 1.
+            prompt: Expected prompt string that marks a session as ready.
+            newline: Newline character to append to commands.
+            options: Optional behavior of the sessions.
+            ready_timeout_sec: Maximum time to wait for a session's prompt.
+
+        Raises:
+            ValueError: If size is less than 1.
+
+        """
+        if size < 1:
+            msg = f"size must be at least 1, got {size}"
+            raise ValueError(msg)
+
+        self._start_command = start_command
+        self._size = size
+        self._prompt = prompt
+        self._newline = newline
+        self._options = options
+        self._ready_timeout_sec = ready_timeout_sec
+
+        self._ready: queue.Queue[ProcessIO] = queue.Queue()
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._stopping = False
+        self._worker: threading.Thread | None = None
+        self._last_error: Exception | None = None
+
+    @property
+    def ready_count(self) -> int:
+        """Number of sessions ready to be acquired."""
+        return self._ready.qsize()
+
+    @property
+    def last_error(self) -> Exception | None:
+        """Latest error of a session that failed to start or become ready.
+
+        None if no session has failed yet. The error is kept after later
+        sessions succeed, and `acquire` raises from it when no session
+        becomes ready in time.
+        """
+        return self._last_error
+
+    def start(self) -> None:
+        """Start warming up sessions in the background.
+
+        Raises:
+            RuntimeError: If the pool is already started.
+
+        """
+        if self._worker:
+            msg = "Pool has already started"
+            raise RuntimeError(msg)
+
+        self._stopping = False
+        self._pending = self._size
+        self._worker = threading.Thread(target=self._replenish, daemon=True)
+        self._worker.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and all sessions that are not acquired.
+
+        Raises:
+            RuntimeError: If the pool is not started.
+
+        """
+        if not self._worker:
+            msg = "Pool not started"
+            raise RuntimeError(msg)
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._worker.join()
+        self._worker = None
+
+        while not self._ready.empty():
+            self._ready.get_nowait().stop()
+
+    @contextmanager
+    def acquire(self, timeout_sec: float | None = None) -> Iterator[ProcessIO]:
+        """Acquire a ready session for the duration of a with block.
+
+        The session is stopped when the block exits and a replacement is
+        started in the background.
+
+        Args:
+            timeout_sec: Maximum time to wait for a ready session.
+                None waits until one is available.
+
+        Yields:
+            A started session whose prompt is the next output to read.
+
+        Raises:
+            RuntimeError: If the pool is not started or no session becomes
+                ready within the timeout.
+
+        """
+        if not self._worker:
+            msg = "Pool not started"
+            raise RuntimeError(msg)
+
+        try:
+            session = self._ready.get(timeout=timeout_sec)
+        except queue.Empty as e:
+            msg = "No session became ready"
+            raise RuntimeError(msg) from (self._last_error or e)
+
+        try:
+            yield session
+        finally:
+            if session.process:
+                session.stop()
+            with self._condition:
+                self._pending += 1
+                self._condition.notify_all()
+
+    def _replenish(self) -> None:
+        """Start sessions whenever the pool is short of ready ones."""
+        while True:
+            with self._condition:
+                while not self._stopping and self._pending == 0:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+                count = self._pending
+                self._pending = 0
+
+            # Spawn all missing sessions first so that their startup overlaps
+            sessions = [self._spawn() for _ in range(count)]
+            for session in sessions:
+                if session and self._wait_ready(session):
+                    self._ready.put(session)
+                    continue
+
+                with self._condition:
+                    self._pending += 1
+                    self._condition.wait(self._RETRY_INTERVAL_SEC)
+
+    def _spawn(self) -> ProcessIO | None:
+        """Create and start a session.
+
+        Returns:
+            The started session, or None if it fails to start.
+
+        """
+        session = ProcessIO(
+            self._start_command, self._prompt, self._newline, self._options
+        )
+        try:
+            session.start()
+        except Exception as e:  # noqa: BLE001
+            self._last_error = e
+            return None
+        return session
+
+    def _wait_ready(self, session: ProcessIO) -> bool:
+        """Wait until the session shows its prompt, then hand it over.
+
+        The prompt is matched with a lookahead so that it stays in the buffer
+        for the first `run_command` of the user.
+
+        Returns:
+            True if the session is ready, False if it was stopped instead.
+
+        """
+        if self._stopping:
+            session.stop()
+            return False
+
+        match: str | None = ""
+        if self._prompt:
+            try:
+                match = session.wait_for(
+                    f"(?={self._prompt})", self._ready_timeout_sec, fail_on=[]
+                )
+            except Exception as e:  # noqa: BLE001
+                self._last_error = e
+                match = None
+            else:
+                if match is None:
+                    self._last_error = RuntimeError("Prompt does not appear")
+
+        if match is not None and not self._stopping:
+            return True
+
+        session.stop()
+        return False
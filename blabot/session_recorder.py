@@ -0,0 +1,144 @@
+"""Recording of the input and output of a session.
+
+This module provides SessionRecorder class that writes every chunk an IO
+sends and receives, with its time, to a compact binary file, and
+`read_recording` that loads such a file again, e.g. to replay it with
+ReplayIO. A recording starts with a magic line followed by records of a
+fixed 13-byte header (time as float64, direction, length as uint32) and the
+chunk itself.
+"""
+
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Literal, Self
+
+MAGIC = b"BLABOT-RECORDING 1\n"
+_HEADER = struct.Struct("<dBI")
+_DIRECTIONS: tuple[Literal["read"], Literal["send"]] = ("read", "send")
+
+
+@dataclass(frozen=True)
+class RecordedChunk:
+    """Chunk of a recorded session.
+
+    Attributes:
+        time_sec: Time since the recording started.
+        direction: "send" for input written to the process, "read" for
+            output received from it.
+        data: The chunk as it was written or received.
+
+    """
+
+    time_sec: float
+    direction: Literal["read", "send"]
+    data: bytes
+
+
+class _DirectionSink:
+    """Log sink recording the chunks of one direction."""
+
+    def __init__(self, recorder: "SessionRecorder", direction: int) -> None:
+        self._recorder = recorder
+        self._direction = direction
+
+    def write(self, data: bytes) -> None:
+        """Record a chunk."""
+        self._recorder._record(self._direction, data)  # noqa: SLF001
+
+    def flush(self) -> None:
+        """Do nothing; the recording is flushed on close."""
+
+
+class SessionRecorder:
+    """Writer of the chunks sent and received by IOs to a recording file.
+
+    Pass the recorder as `IOOptions.recorder` to record an IO. Chunks are
+    written to a buffered file, so recording costs no more than a buffered
+    log sink; call `close` to write out the buffer.
+    """
+
+    def __init__(self, path: str | Path, buffer_size: int = 1024 * 1024) -> None:
+        """Initialize SessionRecorder instance and start the recording.
+
+        Args:
+            path: Path of the recording. An existing file is overwritten.
+            buffer_size: Size of the write buffer in bytes.
+
+        """
+        self._file = Path(path).open("wb", buffering=buffer_size)  # noqa: SIM115
+        self._file.write(MAGIC)
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.sent = _DirectionSink(self, _DIRECTIONS.index("send"))
+        self.received = _DirectionSink(self, _DIRECTIONS.index("read"))
+
+    def __enter__(self) -> Self:
+        """Return the recorder itself."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the recording."""
+        self.close()
+
+    def close(self) -> None:
+        """Write out the buffer and close the recording.
+
+        Chunks sent or received after closing are not recorded.
+        """
+        with self._lock:
+            self._file.close()
+
+    def _record(self, direction: int, data: bytes) -> None:
+        """Write one chunk with the current time."""
+        if not data:
+            return
+        with self._lock:
+            if self._file.closed:
+                return
+            elapsed = time.monotonic() - self._started_at
+            self._file.write(_HEADER.pack(elapsed, direction, len(data)))
+            self._file.write(data)
+
+
+def read_recording(path: str | Path) -> list[RecordedChunk]:
+    """Load the chunks of a recording.
+
+    Args:
+        path: Path of a file written by SessionRecorder.
+
+    Returns:
+        The recorded chunks in order.
+
+    Raises:
+        ValueError: If the file is not a recording or is truncated.
+
+    """
+    content = Path(path).read_bytes()
+    if not content.startswith(MAGIC):
+        msg = f"{path} is not a blabot recording"
+        raise ValueError(msg)
+
+    chunks: list[RecordedChunk] = []
+    offset = len(MAGIC)
+    while offset < len(content):
+        if offset + _HEADER.size > len(content):
+            msg = f"{path} is truncated at byte {offset}"
+            raise ValueError(msg)
+        time_sec, direction, size = _HEADER.unpack_from(content, offset)
+        offset += _HEADER.size
+        if offset + size > len(content) or direction >= len(_DIRECTIONS):
+            msg = f"{path} is truncated or corrupt at byte {offset}"
+            raise ValueError(msg)
+        data = content[offset : offset + size]
+        chunks.append(RecordedChunk(time_sec, _DIRECTIONS[direction], data))
+        offset += size
+    return chunks
@@ -4,22 +4,137 @@ This module provides SSHProcessIO class that implements the TemplatedIO interfac
 for communicating with processes on remote machines via SSH connections.
 """
 
-import sys
+import atexit
+import shutil
+import subprocess
+import tempfile
+import threading
 from dataclasses import dataclass
+from pathlib import Path
 
 import pexpect
 
+from ._pexpect_helpers import setup_process
 from .process_io import ProcessIO
+from .templated_io import IOOptions
 
 
 @dataclass
 class SSHConfig:
-    """Configuration for SSH connection parameters."""
+    """Configuration for SSH connection parameters.
+
+    If `share_connection` is True, sessions to the same destination reuse one
+    authenticated connection (OpenSSH ControlMaster). The connection is kept
+    for `control_persist_sec` seconds after the last session closes, and is
+    closed by `close_shared_connections` or at interpreter exit.
+    """
 
     user_name: str
     host_name: str
     key_path: str
     port: int = 22
+    share_connection: bool = False
+    control_persist_sec: int = 600
+
+
+class _ControlMasters:
+    """Control sockets of the shared SSH connections opened by blabot."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._directory: Path | None = None
+        self._destinations: set[tuple[str, int]] = set()
+
+    def ssh_options(self, destination: str, port: int, persist_sec: int) -> str:
+        """Get ssh options sharing the connection to the destination.
+
+        Args:
+            destination: ssh destination in 'user@host' form.
+            port: ssh port of the destination.
+            persist_sec: Seconds to keep the connection after its last session.
+
+        Returns:
+            Options to put on the ssh command line.
+
+        """
+        with self._lock:
+            if self._directory is None:
+                self._directory = Path(tempfile.mkdtemp(prefix="blabot-ssh-"))
+            self._destinations.add((destination, port))
+            control_path = self._directory / "%C"
+
+        return (
+            f"-o ControlMaster=auto -o ControlPath={control_path} "
+            f"-o ControlPersist={persist_sec}"
+        )
+
+    def close(self, destination: str, port: int, operation: str = "stop") -> None:
+        """Send a control command to the shared connection to the destination.
+
+        Args:
+            destination: ssh destination in 'user@host' form.
+            port: ssh port of the destination.
+            operation: 'stop' to stop accepting new sessions while running
+                sessions continue until they exit, or 'exit' to close the
+                connection together with its sessions.
+
+        """
+        with self._lock:
+            if self._directory is None:
+                return
+            self._destinations.discard((destination, port))
+            control_path = self._directory / "%C"
+
+        ssh_control_command = [
+            "ssh",
+            "-O",
+            operation,
+            "-o",
+            f"ControlPath={control_path}",
+            "-p",
+            str(port),
+            destination,
+        ]
+        # The connection may already be gone (e.g. ControlPersist expired)
+        subprocess.run(
+            ssh_control_command,
+            check=False,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def close_all(self, operation: str = "stop") -> None:
+        """Close every shared connection and remove the socket directory.
+
+        Args:
+            operation: Control command sent to each connection (see `close`).
+
+        """
+        with self._lock:
+            destinations = list(self._destinations)
+
+        for destination, port in destinations:
+            self.close(destination, port, operation)
+
+        with self._lock:
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+
+
+_control_masters = _ControlMasters()
+# Nothing is left to finish at exit, so the connections exit with their sessions
+atexit.register(_control_masters.close_all, "exit")
+
+
+def close_shared_connections() -> None:
+    """Stop all SSH connections shared by SSHProcessIO instances.
+
+    The connections stop accepting new sessions. Sessions that are still
+    running keep working and each connection closes when its last session
+    exits; new sessions open a new shared connection.
+    """
+    _control_masters.close_all()
 
 
 class SSHProcessIO(ProcessIO):
@@ -35,6 +150,7 @@ class SSHProcessIO(ProcessIO):
         ssh_config: SSHConfig,
         prompt: str = "",
         newline: str = "",
+        options: IOOptions | None = None,
     ) -> None:
         """Initialize SSHProcessIO instance.
 
@@ -43,13 +159,16 @@ class SSHProcessIO(ProcessIO):
             ssh_config: SSH connection configuration.
             prompt: Expected prompt string to wait for.
             newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
 
         """
-        super().__init__(start_command, prompt, newline)
+        super().__init__(start_command, prompt, newline, options)
         self._user_name = ssh_config.user_name
         self._host_name = ssh_config.host_name
         self._key_path = ssh_config.key_path
         self._port = ssh_config.port
+        self._share_connection = ssh_config.share_connection
+        self._control_persist_sec = ssh_config.control_persist_sec
 
     def start(self) -> None:
         """Start SSH connection and remote process.
@@ -65,12 +184,16 @@ class SSHProcessIO(ProcessIO):
             msg = "Process has already started"
             raise RuntimeError(msg)
 
-        ssh_login_cmd = (
-            f"ssh -i {self._key_path} -p {self._port} "
-            f"{self._user_name}@{self._host_name}"
-        )
+        destination = f"{self._user_name}@{self._host_name}"
+        ssh_login_cmd = f"ssh -i {self._key_path} -p {self._port} "
+        if self._share_connection:
+            control_options = _control_masters.ssh_options(
+                destination, self._port, self._control_persist_sec
+            )
+            ssh_login_cmd += f"{control_options} "
+        ssh_login_cmd += destination
         self.process = pexpect.spawn(ssh_login_cmd)
-        self.process.logfile = sys.stdout.buffer
+        setup_process(self.process, self._options, self._transcript)
 
         # Wait for login to complete
         if not self.wait_for(r"\$", 15):
@@ -82,3 +205,16 @@ class SSHProcessIO(ProcessIO):
         # the log immediately after login does not contain this.
         # This self.prompt is for test target process.
         self.send_command(self._start_command)
+
+    def close_shared_connection(self) -> None:
+        """Stop the shared connection to the remote host.
+
+        The connection stops accepting new sessions and closes when its last
+        running session exits. Does nothing if connection sharing is not
+        enabled in the SSHConfig.
+        """
+        if not self._share_connection:
+            return
+
+        destination = f"{self._user_name}@{self._host_name}"
+        _control_masters.close(destination, self._port)
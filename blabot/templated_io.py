@@ -4,10 +4,170 @@ This module provides the core abstraction for communicating with processes
 across different environments (local, SSH, Docker, serial devices).
 """
 
+import codecs
+import contextlib
+import hashlib
+import os
+import re
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Generator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal, Self, TypeVar, overload
 
+from ._prompt_state import PromptState
+from .file_transfer import (
+    STATUS_PATTERN,
+    DownloadParser,
+    TransferError,
+    TransferResult,
+    digest_command,
+    download_command,
+    parse_digest,
+    upload_chunk,
+)
+from .log_sink import STDOUT_SINK, LogSink
+from .reactor import Reactor
+from .send_pacing import SendPacer, SendPacing
+from .session_recorder import SessionRecorder
+from .transcript import TranscriptBuffer
 
-class TemplatedIO(ABC):
+_T = TypeVar("_T")
+
+
+class FailurePatternError(RuntimeError):
+    """Raised when a failure pattern appears while waiting for output.
+
+    Attributes:
+        pattern: The failure pattern that matched.
+        output: The matched output.
+
+    """
+
+    def __init__(self, pattern: str, output: str) -> None:
+        """Initialize the FailurePatternError instance.
+
+        Args:
+            pattern: The failure pattern that matched.
+            output: The matched output.
+
+        """
+        super().__init__(f"Failure pattern '{pattern}' matched: {output!r}")
+        self.pattern = pattern
+        self.output = output
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    """Match of an expected pattern in the process output, decoded once.
+
+    Attributes:
+        text: The matched string.
+        groups: Captured groups in order. None for groups that did not take
+            part in the match.
+        named_groups: Captured named groups by name.
+        before: Output between the previous match and this one.
+        index: Index of the matched pattern in the list of expected patterns.
+
+    """
+
+    text: str
+    groups: tuple[str | None, ...] = ()
+    named_groups: dict[str, str | None] = field(default_factory=dict)
+    before: str = ""
+    index: int = 0
+
+    @classmethod
+    def from_match(cls, match: re.Match[str], before: str = "", index: int = 0) -> Self:
+        """Create an instance from a regular expression match.
+
+        Args:
+            match: Match of the pattern on the decoded output.
+            before: Output between the previous match and this one.
+            index: Index of the matched pattern.
+
+        Returns:
+            The match with its groups.
+
+        """
+        return cls(match.group(), match.groups(), match.groupdict(), before, index)
+
+    @property
+    def span(self) -> tuple[int, int]:
+        """Start and end of the match in the output consumed by the wait.
+
+        The consumed output is `before` followed by `text`.
+        """
+        start = len(self.before)
+        return start, start + len(self.text)
+
+    def group(self, key: int | str = 0) -> str | None:
+        """Get the whole match or one captured group like `re.Match.group`.
+
+        Args:
+            key: 0 for the whole match, a group number or a group name.
+
+        Returns:
+            The captured string, or None if the group did not take part.
+
+        Raises:
+            IndexError: If there is no group with the given number.
+            KeyError: If there is no group with the given name.
+
+        """
+        if isinstance(key, str):
+            return self.named_groups[key]
+        if key == 0:
+            return self.text
+        if not 0 < key <= len(self.groups):
+            msg = f"no such group: {key}"
+            raise IndexError(msg)
+        return self.groups[key - 1]
+
+
+@dataclass
+class IOOptions:
+    """Optional behavior shared by all IO classes.
+
+    Attributes:
+        fail_patterns: Default failure patterns. If one of them appears while
+            waiting for output, the wait is aborted immediately with
+            `FailurePatternError`.
+        log_sink: Destination of the transcript of sent and received bytes.
+            None disables the transcript.
+        transcript_size: Number of received bytes to keep in memory for
+            post-mortem inspection (see `TemplatedIO.transcript`).
+            0 disables it.
+        send_pacing: Limits on how fast commands are written. None uses the
+            default of the IO class: no limits for PTY based classes and a
+            short gap between lines for serial devices.
+        reactor: Reactor reading the process output in a thread shared with
+            other sessions. None reads it in the thread that waits.
+        search_window_size: Number of trailing output bytes that regular
+            expressions are searched in. None searches all output since the
+            last match, which rescans it on every read.
+        maxread: Maximum number of bytes read from the process at once.
+        max_buffer_size: Number of unmatched output bytes kept while waiting.
+            Older output is discarded and counted (see `BufferLimit`).
+            None keeps all of it.
+        recorder: Recorder writing every sent and received chunk with its
+            time to a file (see `SessionRecorder`). None records nothing.
+
+    """
+
+    fail_patterns: list[str] = field(default_factory=list)
+    log_sink: LogSink | None = STDOUT_SINK
+    transcript_size: int = 0
+    send_pacing: SendPacing | None = None
+    reactor: Reactor | None = None
+    search_window_size: int | None = None
+    maxread: int = 2000
+    max_buffer_size: int | None = None
+    recorder: SessionRecorder | None = None
+
+
+class TemplatedIO(PromptState, ABC):
     """Abstract base class for process communication.
 
     Provides a unified interface for exchanging input and output with processes
@@ -15,18 +175,67 @@ class TemplatedIO(ABC):
     concrete implementations for specific process types.
     """
 
-    _FIRST_PROMPT_TIMEOUT_SEC = 0.5
+    _STREAM_READ_SEC = 0.05
+    _DEFAULT_SEND_PACING: SendPacing | None = None
 
-    def __init__(self, prompt: str = "", newline: str = "") -> None:
+    def __init__(
+        self,
+        prompt: str = "",
+        newline: str = "",
+        options: IOOptions | None = None,
+    ) -> None:
         """Initialize the TemplatedIO instance.
 
         Args:
             prompt: Expected prompt string to wait for before sending commands.
             newline: Newline character to append to commands.
+            options: Optional behavior. Defaults are used if None.
 
         """
-        self._prompt = prompt
-        self._newline = newline
+        self._options = options or IOOptions()
+        super().__init__(prompt, newline, self._options.fail_patterns)
+        self._reactor = self._options.reactor
+        self._transcript = (
+            TranscriptBuffer(self._options.transcript_size)
+            if self._options.transcript_size
+            else None
+        )
+        pacing = self._options.send_pacing or self._DEFAULT_SEND_PACING
+        self._send_pacer = SendPacer(pacing) if pacing and pacing.limited else None
+
+    @property
+    def prompt(self) -> str:
+        """Expected prompt string to wait for before sending commands."""
+        return self._prompt
+
+    @property
+    def newline(self) -> str:
+        """Newline character appended to commands."""
+        return self._newline
+
+    @property
+    def options(self) -> IOOptions:
+        """Optional behavior given at construction."""
+        return self._options
+
+    @property
+    def fail_patterns(self) -> list[str]:
+        """Default failure patterns that abort waits immediately."""
+        return list(self._fail_patterns)
+
+    @property
+    def send_pacing(self) -> SendPacing | None:
+        """Limits applied when sending commands, or None if unlimited."""
+        return self._send_pacer.pacing if self._send_pacer else None
+
+    @property
+    def transcript(self) -> TranscriptBuffer | None:
+        """Latest received bytes, or None if `transcript_size` is 0.
+
+        The buffer is kept across restarts, so the output that led to a
+        failure can still be inspected after the process is stopped.
+        """
+        return self._transcript
 
     @abstractmethod
     def start(self) -> None:
@@ -58,7 +267,9 @@ class TemplatedIO(ABC):
 
         Wait for the specified pattern to appear in the process output.
         This method must be implemented by subclasses according to their
-        specific process communication mechanism.
+        specific process communication mechanism. Subclasses that search
+        failure patterns add a `fail_on` argument and override
+        `_wait_with_failures`.
 
         Args:
             expect: Regular expression pattern to wait for.
@@ -70,58 +281,510 @@ class TemplatedIO(ABC):
 
         """
 
+    def _wait_with_failures(
+        self, expect: str, timeout_sec: float, fail_on: list[str] | None
+    ) -> str | None:
+        """Wait for a pattern, aborting on failure patterns.
+
+        The helpers of this class wait through this method, so that
+        subclasses implementing `wait_for` without `fail_on` keep working.
+        This implementation calls `wait_for` without failure patterns.
+
+        Args:
+            expect: Regular expression pattern to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used; they are ignored
+                by this implementation.
+
+        Returns:
+            The matched string, or None if timeout occurs.
+
+        Raises:
+            NotImplementedError: If failure patterns are given but the
+                subclass does not search them.
+
+        """
+        if fail_on:
+            msg = f"{type(self).__name__} does not support failure patterns"
+            raise NotImplementedError(msg)
+        return self.wait_for(expect, timeout_sec)
+
+    def wait_for_any(
+        self,
+        patterns: list[str],
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> tuple[int, str] | None:
+        """Wait for any of the expected strings from the process.
+
+        Wait until one of the specified patterns appears in the process output.
+        All patterns are searched in a single pass, so distinguishing several
+        possible responses costs one timeout at most. When several patterns
+        match, the one matching earliest in the output wins.
+
+        This implementation waits for the alternation of the patterns with
+        `wait_for` and finds the matched pattern in the matched string; IO
+        classes whose library searches pattern lists natively override it.
+        Numbered backreferences in the patterns are not supported by it.
+
+        Args:
+            patterns: Regular expression patterns to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            tuple[int, str]: Index of the matched pattern and the matched string.
+            None: If timeout occurs before any pattern is matched.
+
+        Raises:
+            ValueError: If no pattern is given.
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        if not patterns:
+            msg = "At least one pattern is required"
+            raise ValueError(msg)
+
+        alternation = "|".join(f"(?:{pattern})" for pattern in patterns)
+        matched = self._wait_with_failures(alternation, timeout_sec, fail_on)
+        if matched is None:
+            return None
+
+        for index, pattern in enumerate(patterns):
+            if re.fullmatch(pattern, matched, re.DOTALL):
+                return index, matched
+        # Patterns with lookarounds may only match in their context
+        for index, pattern in enumerate(patterns):
+            if re.search(pattern, matched, re.DOTALL):
+                return index, matched
+        return 0, matched
+
+    def drain(self, quiet_sec: float = 0.0, timeout_sec: float = 3.0) -> bytes:
+        """Consume all output the process has sent so far.
+
+        Return the output buffered by earlier waits together with everything
+        that can be read without waiting longer than `quiet_sec` for more.
+
+        This implementation waits for any output with `wait_for` until none
+        arrives within `quiet_sec`, so the output is decoded and encoded
+        again as UTF-8; IO classes reading bytes override it.
+
+        Args:
+            quiet_sec: Time without output after which reading stops.
+                0 reads only what is already available.
+            timeout_sec: Maximum total time to read.
+
+        Returns:
+            The consumed output.
+
+        """
+        deadline = time.monotonic() + timeout_sec
+        output = b""
+        while True:
+            wait_sec = min(quiet_sec, max(deadline - time.monotonic(), 0))
+            data = self._wait_with_failures(r"[\s\S]+", wait_sec, [])
+            if not data:
+                return output
+            output += data.encode("utf-8")
+            if time.monotonic() >= deadline:
+                return output
+
+    def poll(self, expect: str, fail_on: list[str] | None = None) -> str | None:
+        """Check whether a pattern is in the output without waiting.
+
+        Only the buffered output and output that is already available are
+        searched. Unmatched output stays in the buffer.
+
+        Args:
+            expect: Regular expression pattern to search for.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            str: The matched string if the pattern is found.
+            None: If the pattern is not in the available output.
+
+        Raises:
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        return self._wait_with_failures(expect, 0, fail_on)
+
+    def wait_for_match(
+        self,
+        expect: str,
+        timeout_sec: float = 3.0,
+        fail_on: list[str] | None = None,
+    ) -> PatternMatch | None:
+        """Wait for expected pattern and return the match with its groups.
+
+        Like `wait_for`, but the result carries the captured groups and the
+        output before the match, so callers need not search the matched
+        string again. This implementation searches the string returned by
+        `wait_for` again; IO classes with access to the match of the
+        underlying library override it to avoid that and to fill `before`.
+
+        Args:
+            expect: Regular expression pattern to wait for.
+            timeout_sec: Maximum time to wait in seconds.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            PatternMatch: The match if expected pattern is found.
+            None: If timeout occurs before pattern is matched.
+
+        Raises:
+            FailurePatternError: If a failure pattern appears first.
+
+        """
+        matched = self._wait_with_failures(expect, timeout_sec, fail_on)
+        if matched is None:
+            return None
+
+        match = re.search(expect, matched, re.DOTALL)
+        return PatternMatch.from_match(match) if match else PatternMatch(matched)
+
+    @staticmethod
+    def text_decoder(errors: str = "replace") -> codecs.IncrementalDecoder:
+        """Create a decoder turning output received as bytes into text.
+
+        Output read in pieces, e.g. by successive `wait_for_bytes` or `drain`
+        calls, may split a character; the decoder keeps the incomplete bytes
+        until the rest arrives, so each piece is decoded exactly once.
+
+        Args:
+            errors: How to handle bytes that are not valid UTF-8, as for
+                `bytes.decode`.
+
+        Returns:
+            Incremental UTF-8 decoder.
+
+        """
+        return codecs.getincrementaldecoder("utf-8")(errors)
+
     def restart(self) -> None:
         """Restart the process by stopping and starting it again."""
         self.stop()
         self.start()
 
+    @overload
     def run_command(
         self,
         command: str,
         expect: str = "",
         timeout_sec: float = 0.2,
         attempts: int = 1,
-    ) -> str | None:
+        fail_on: list[str] | None = None,
+        *,
+        capture: Literal[False] = False,
+    ) -> str | None: ...
+
+    @overload
+    def run_command(
+        self,
+        command: str,
+        expect: list[str],
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+        *,
+        capture: Literal[False] = False,
+    ) -> tuple[int, str] | None: ...
+
+    @overload
+    def run_command(
+        self,
+        command: str,
+        expect: str = "",
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+        *,
+        capture: Literal[True],
+    ) -> bytes | None: ...
+
+    def run_command(  # noqa: PLR0913
+        self,
+        command: str,
+        expect: str | list[str] = "",
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+        *,
+        capture: bool = False,
+    ) -> str | tuple[int, str] | bytes | None:
         """Send command and wait for expected response.
 
         Wait for a prompt, send the command, and wait for the expected response.
         If the expected string is not found, it remains in the buffer for the
-        next operation. Use `wait_and_consume_logs` to clear the buffer if needed.
+        next operation. Use `drain` to clear the buffer if needed.
+        If a failure pattern appears, the command fails immediately without
+        waiting for the timeout or retrying.
+
+        With `capture`, wait for the next prompt instead and return everything
+        the command printed: the output between the echo of the command and
+        the prompt. The expected pattern, if any, must appear in that output.
 
         Args:
             command: Command string to send.
-            expect: Expected response pattern to wait for.
+            expect: Expected response pattern to wait for. If a list is given,
+                wait for any of the patterns (see `wait_for_any`).
             timeout_sec: Maximum time to wait for response.
             attempts: Number of retry attempts. Must be at least 1.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+            capture: Whether to return the whole output of the command.
 
         Returns:
             str: The matched string if expected pattern is found.
+            tuple[int, str]: Index of the matched pattern and the matched string
+                if a list of patterns is given and one of them is found.
+            bytes: The output of the command if `capture` is set.
+            None: If timeout occurs or pattern not matched after all attempts.
+
+        Raises:
+            ValueError: If attempts is less than 1, or if `capture` is set
+                without a prompt or with a list of patterns.
+            RuntimeError: If the prompt does not appear.
+            FailurePatternError: If a failure pattern appears.
+
+        """
+        if capture:
+            if not self._prompt or isinstance(expect, list):
+                msg = "capture requires a prompt and a single expected pattern"
+                raise ValueError(msg)
+            pattern = expect
+            return self._send_until(
+                command,
+                attempts,
+                lambda: self._capture_output(command, pattern, timeout_sec, fail_on),
+            )
+        if isinstance(expect, list):
+            patterns = expect
+            return self._send_until(
+                command,
+                attempts,
+                lambda: self.wait_for_any(patterns, timeout_sec, fail_on),
+            )
+        return self._send_until(
+            command,
+            attempts,
+            lambda: self._wait_with_failures(expect, timeout_sec, fail_on),
+        )
+
+    def run_command_match(
+        self,
+        command: str,
+        expect: str,
+        timeout_sec: float = 0.2,
+        attempts: int = 1,
+        fail_on: list[str] | None = None,
+    ) -> PatternMatch | None:
+        """Send command and return the match of the expected response.
+
+        Like `run_command`, but waits with `wait_for_match`, so the result
+        carries the captured groups of the response.
+
+        Args:
+            command: Command string to send.
+            expect: Expected response pattern to wait for.
+            timeout_sec: Maximum time to wait for response.
+            attempts: Number of retry attempts. Must be at least 1.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            PatternMatch: The match if expected pattern is found.
             None: If timeout occurs or pattern not matched after all attempts.
 
+        Raises:
+            ValueError: If attempts is less than 1.
+            RuntimeError: If the prompt does not appear.
+            FailurePatternError: If a failure pattern appears.
+
+        """
+        return self._send_until(
+            command,
+            attempts,
+            lambda: self.wait_for_match(expect, timeout_sec, fail_on),
+        )
+
+    def _capture_output(
+        self,
+        command: str,
+        expect: str,
+        timeout_sec: float,
+        fail_on: list[str] | None,
+    ) -> bytes | None:
+        """Wait for the next prompt and return the output of a sent command.
+
+        Returns:
+            The output after the echo of the command, or None if the prompt
+            does not appear or the output does not contain `expect`.
+
+        """
+        output = self._wait_for_before(self._prompt, timeout_sec, fail_on)
+        if output is None:
+            return None
+
+        # Skip the echo of the command by the terminal, if any
+        echo = command.encode("utf-8")
+        if echo and output.startswith(echo):
+            end = output.find(b"\n", len(echo))
+            output = output[end + 1 :] if end >= 0 else b""
+
+        if expect and not re.search(expect.encode("utf-8"), output, re.DOTALL):
+            return None
+        return output
+
+    def _wait_for_before(
+        self,
+        expect: str,
+        timeout_sec: float,
+        fail_on: list[str] | None,
+    ) -> bytes | None:
+        """Wait for a pattern and return the output before it.
+
+        This implementation encodes the text returned by `wait_for_match`;
+        IO classes with access to the received bytes override it to return
+        them as they are.
+
+        Returns:
+            The output between the previous match and this one, or None if
+            timeout occurs.
+
+        """
+        match = self.wait_for_match(expect, timeout_sec, fail_on)
+        return None if match is None else match.before.encode("utf-8")
+
+    def _send_until(
+        self, command: str, attempts: int, wait: Callable[[], _T | None]
+    ) -> _T | None:
+        """Wait for the prompt, then send a command until the wait succeeds.
+
+        Args:
+            command: Command string to send.
+            attempts: Number of times to send the command. Must be at least 1.
+            wait: Wait run after each send. Returns None on timeout.
+
+        Returns:
+            Result of the first successful wait, or None.
+
         Raises:
             ValueError: If attempts is less than 1.
             RuntimeError: If the prompt does not appear.
 
         """
-        if attempts < 1:
-            msg = f"attempts must be at least 1, got {attempts}"
+        self._check_attempts(attempts)
+        self._check_prompt(self.wait_for_prompt())
+
+        for _ in range(attempts):
+            self.send_command(command)
+            result = wait()
+            if result is not None:
+                return result
+        return None
+
+    def run_commands(
+        self,
+        commands: list[tuple[str, str]],
+        timeout_sec: float = 3.0,
+        window: int = 8,
+        fail_on: list[str] | None = None,
+    ) -> list[str | None]:
+        """Send commands ahead of their responses and match them in order.
+
+        Up to `window` commands are written before waiting for the response
+        of the first one, so a batch costs about one round trip instead of one
+        per command. The target must queue input while it is busy.
+
+        Responses are aligned by the prompt: the output of each command ends at
+        the next prompt, so an expected pattern never matches the output of
+        another command. Without a prompt, expected patterns are simply
+        matched in order. Do not use patterns that also match the echo of a
+        command sent ahead.
+
+        Args:
+            commands: Pairs of command and expected response pattern.
+            timeout_sec: Maximum time to wait for each response.
+            window: Maximum number of commands sent ahead. Must be at least 1.
+            fail_on: Failure patterns to abort on. If None, the default
+                failure patterns of the instance are used.
+
+        Returns:
+            The matched string for each command, or None if its expected
+            pattern appeared neither before its prompt nor, without a prompt,
+            within the timeout.
+
+        Raises:
+            ValueError: If window is less than 1.
+            RuntimeError: If a prompt does not appear within the timeout.
+            FailurePatternError: If a failure pattern appears. The remaining
+                commands are not waited for.
+
+        """
+        if window < 1:
+            msg = f"window must be at least 1, got {window}"
             raise ValueError(msg)
 
-        if not self.wait_for_prompt():
+        self._check_prompt(self.wait_for_prompt())
+
+        results: list[str | None] = []
+        sent = 0
+        for index, (_, expect) in enumerate(commands):
+            while sent < min(index + window, len(commands)):
+                self.send_command(commands[sent][0])
+                sent += 1
+
+            results.append(self._wait_response(expect, timeout_sec, fail_on))
+        return results
+
+    def _wait_response(
+        self,
+        expect: str,
+        timeout_sec: float,
+        fail_on: list[str] | None,
+    ) -> str | None:
+        """Wait for the expected response of a command and for its prompt.
+
+        Returns:
+            The matched string, or None if the prompt appears first or, without
+            a prompt, the response does not appear within the timeout.
+
+        Raises:
+            RuntimeError: If the prompt does not appear.
+
+        """
+        if not self._prompt:
+            return self._wait_with_failures(expect, timeout_sec, fail_on)
+
+        # Only prompts consumed from now on end the output of this command
+        self._clear_prompt()
+        match = self.wait_for_any([expect, self._prompt], timeout_sec, fail_on)
+        if match is None:
             msg = "Prompt does not appear"
             raise RuntimeError(msg)
 
-        for _ in range(attempts):
-            self.send_command(command)
-            match = self.wait_for(expect, timeout_sec=timeout_sec)
-            if match is not None:
-                break
+        index, matched = match
+        if index == 1:
+            return None
 
-        return match
+        # The match may have consumed the prompt already
+        self._check_prompt(
+            self._prompt_seen
+            or self._wait_with_failures(self._prompt, timeout_sec, []) is not None
+        )
+        return matched
 
     def wait_for_prompt(self, timeout_sec: float = 3.0) -> bool:
         """Wait for the configured prompt to appear.
 
+        Returns immediately if the prompt has already been consumed by a wait
+        since the last input was sent.
+
         Args:
             timeout_sec: Maximum time to wait for the prompt.
 
@@ -129,20 +792,22 @@ class TemplatedIO(ABC):
             True if prompt appears within timeout, False otherwise.
 
         """
-        # If prompt is not set, ignore it
-        if not self._prompt:
+        if self._prompt_ready():
             return True
 
-        res = self.wait_for(self._prompt, self._FIRST_PROMPT_TIMEOUT_SEC)
+        # Failure patterns are for command responses, not for synchronization
+        res = self._wait_with_failures(self._prompt, self._FIRST_PROMPT_TIMEOUT_SEC, [])
         if res == self._prompt:
             return True
 
         # Send a new line and try again
         self.send_command(self._newline)
-        res = self.wait_for(self._prompt, timeout_sec)
+        res = self._wait_with_failures(self._prompt, timeout_sec, [])
         return res == self._prompt
 
-    def wait_and_consume_logs(self, timeout_sec: float = 3.0) -> None:
+    def wait_and_consume_logs(
+        self, timeout_sec: float = 3.0, quiet_sec: float = 0.0
+    ) -> None:
         """Wait and consume any pending log output.
 
         This method is useful for clearing the output buffer before sending
@@ -150,6 +815,232 @@ class TemplatedIO(ABC):
 
         Args:
             timeout_sec: Maximum time to wait for output.
+            quiet_sec: Time without output after which consuming stops.
+                0 consumes only what is already available.
+
+        """
+        self.drain(quiet_sec, timeout_sec)
+
+    def iter_lines(self, timeout_sec: float | None = 3.0) -> Generator[str, None, None]:
+        """Yield complete lines of output as they arrive.
+
+        Output is consumed in short reads and split at line feeds only, so
+        no pattern is searched. Carriage returns before the line feed are
+        removed, which turns both CRLF and the CR CR LF produced by terminals
+        into plain line ends. A line split across reads is yielded once it is
+        complete. Output is read only when the next line is requested, so a
+        slow consumer makes the process wait instead of growing a buffer.
+
+        If the iterator is closed before the output ends, e.g. with
+        `contextlib.closing`, output read after the last yielded line is put
+        back for the next wait by IO classes that support it (see `_unread`).
+
+        Args:
+            timeout_sec: Time without a new line after which iteration ends.
+                None waits for the end of the output.
+
+        Yields:
+            Each line without its line end. When iteration ends, output after
+            the last line end is yielded as a final line if not empty.
+
+        """
+        pending = b""
+        last_line_at = time.monotonic()
+        while not self._output_ended() and (
+            timeout_sec is None or time.monotonic() - last_line_at < timeout_sec
+        ):
+            data = self.drain(self._STREAM_READ_SEC, self._STREAM_READ_SEC)
+            if not data:
+                continue
+
+            searched = len(pending)
+            pending += data
+            start = 0
+            # A line feed byte is never part of a multi-byte UTF-8 character
+            while (end := pending.find(b"\n", searched)) >= 0:
+                line = pending[start:end].decode("utf-8", "replace").rstrip("\r")
+                start = searched = end + 1
+                last_line_at = time.monotonic()
+                try:
+                    yield line
+                except GeneratorExit:
+                    self._unread(pending[start:])
+                    raise
+            pending = pending[start:]
+
+        if pending:
+            yield pending.decode("utf-8", "replace")
+
+    def send_file(
+        self,
+        local_path: str | os.PathLike[str],
+        remote_path: str,
+        chunk_size: int = 1536,
+        timeout_sec: float = 10.0,
+    ) -> TransferResult:
+        """Write a local file to the target through its shell.
+
+        The file is sent as base64 in heredoc chunks of `chunk_size` bytes.
+        The next chunk is only sent once the shell has reported the exit
+        status of the previous one, so no more than one chunk is ever in
+        flight, and the send pacing of the instance applies within each
+        chunk. The file is then verified with `sha256sum` on the target.
+
+        Args:
+            local_path: File to send.
+            remote_path: Path to write on the target. An existing file is
+                overwritten.
+            chunk_size: Number of file bytes sent per chunk.
+            timeout_sec: Maximum time to wait for each chunk to be written
+                and for the digest.
+
+        Returns:
+            The size, digest and transfer rate of the file.
+
+        Raises:
+            ValueError: If chunk_size is less than 1.
+            RuntimeError: If the prompt does not appear before the transfer.
+            TransferError: If a chunk is not written or the file on the
+                target does not match.
+
+        """
+        if chunk_size < 1:
+            msg = f"chunk_size must be at least 1, got {chunk_size}"
+            raise ValueError(msg)
+
+        data = Path(local_path).read_bytes()
+        started_at = time.monotonic()
+        if not self.wait_for_prompt():
+            msg = "Prompt does not appear"
+            raise RuntimeError(msg)
+
+        line_end = self._newline or "\n"
+        chunks = [data[i : i + chunk_size] for i in range(0, len(data), chunk_size)]
+        for index, chunk in enumerate(chunks or [b""]):
+            # send_command ends the terminator line like any command it sends
+            self._run_with_status(
+                upload_chunk(remote_path, chunk, line_end, append=index > 0),
+                f"Writing {remote_path} at byte {index * chunk_size}",
+                timeout_sec,
+            )
+
+        digest = hashlib.sha256(data).hexdigest()
+        output = self._run_with_status(
+            digest_command(remote_path), f"Hashing {remote_path}", timeout_sec
+        )
+        remote_digest = parse_digest(output)
+        if remote_digest != digest:
+            msg = f"Digest of {remote_path} is {remote_digest}, expected {digest}"
+            raise TransferError(msg)
+        return TransferResult(
+            remote_path, len(data), digest, time.monotonic() - started_at
+        )
+
+    def receive_file(
+        self,
+        remote_path: str,
+        local_path: str | os.PathLike[str],
+        timeout_sec: float = 10.0,
+    ) -> TransferResult:
+        """Read a file from the target through its shell.
+
+        The target prints the digest and the base64 contents of the file,
+        which are streamed with `iter_lines`, so no pattern is searched in
+        the output. The local file is written only once the contents match
+        the digest.
+
+        Args:
+            remote_path: Path of the file on the target.
+            local_path: File to write. An existing file is overwritten.
+            timeout_sec: Maximum time without a new line of output.
+
+        Returns:
+            The size, digest and transfer rate of the file.
+
+        Raises:
+            RuntimeError: If the prompt does not appear before the transfer.
+            TransferError: If the file cannot be read on the target, the
+                output stops, or the contents do not match the digest.
+
+        """
+        started_at = time.monotonic()
+        if not self.wait_for_prompt():
+            msg = "Prompt does not appear"
+            raise RuntimeError(msg)
+
+        self.send_command(download_command(remote_path))
+        parser = DownloadParser()
+        # Closing the lines puts the output after the status back, e.g. the
+        # next prompt
+        with contextlib.closing(self.iter_lines(timeout_sec)) as lines:
+            for line in lines:
+                if parser.feed(line):
+                    break
+
+        if parser.status is None:
+            msg = f"Output of {remote_path} stopped before its end"
+            raise TransferError(msg)
+        if parser.status != 0 or parser.digest is None:
+            msg = f"Reading {remote_path} failed with status {parser.status}"
+            raise TransferError(msg)
+
+        data = parser.data()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != parser.digest:
+            msg = f"Digest of {remote_path} is {parser.digest}, received {digest}"
+            raise TransferError(msg)
+
+        Path(local_path).write_bytes(data)
+        return TransferResult(
+            remote_path, len(data), digest, time.monotonic() - started_at
+        )
+
+    def _run_with_status(self, command: str, action: str, timeout_sec: float) -> str:
+        """Send a command built by `with_status` and check its exit status.
+
+        Args:
+            command: Command printing its exit status.
+            action: Description of the command for error messages.
+            timeout_sec: Maximum time to wait for the exit status.
+
+        Returns:
+            The output before the exit status, including the echo.
+
+        Raises:
+            TransferError: If the status does not appear or is not 0.
+
+        """
+        self.send_command(command)
+        match = self.wait_for_match(STATUS_PATTERN, timeout_sec, fail_on=[])
+        if match is None:
+            msg = f"{action} did not finish within {timeout_sec} s"
+            raise TransferError(msg)
+        if match.group(1) != "0":
+            # The error message of the shell is the last line before the status
+            error = match.before.rstrip().rsplit("\n", 1)[-1].strip()
+            msg = f"{action} failed with status {match.group(1)}: {error}"
+            raise TransferError(msg)
+        return match.before
+
+    def _unread(self, data: bytes) -> None:
+        """Put consumed output back to be read first by the next wait.
+
+        This implementation discards it, since only subclasses know their
+        buffer; IO classes that can put output back override it.
+
+        Args:
+            data: Output to put back.
+
+        """
+
+    def _output_ended(self) -> bool:
+        """Check whether the process cannot send more output.
+
+        IO classes that can detect the end of the output override this so
+        that `iter_lines` stops without waiting for its timeout.
+
+        Returns:
+            True if no more output can arrive.
 
         """
-        self.wait_for(".*", timeout_sec)
+        return False
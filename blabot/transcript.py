@@ -0,0 +1,218 @@
+"""Fixed-size ring buffer keeping the latest output of a session.
+
+This module provides TranscriptBuffer class that keeps the last N bytes
+received from a process in a preallocated bytearray, so that memory stays flat
+no matter how long a session runs, and the output around a failure can be
+searched and sliced by byte offset or by time afterwards.
+"""
+
+import bisect
+import re
+import threading
+import time
+
+
+class TranscriptBuffer:
+    """Ring buffer of the latest received bytes with a time index.
+
+    Offsets are absolute: the first byte ever written has offset 0 and
+    `end_offset` is the total number of bytes written. Only the range from
+    `start_offset` to `end_offset` is still kept. The buffer also works as a
+    log sink, so it can be fed by anything that writes bytes.
+    """
+
+    # Minimum time between two entries of the time index
+    _TIME_INDEX_RESOLUTION_SEC = 0.01
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize TranscriptBuffer instance.
+
+        Args:
+            capacity: Number of bytes to keep. Must be at least 1.
+
+        Raises:
+            ValueError: If capacity is less than 1.
+
+        """
+        if capacity < 1:
+            msg = f"capacity must be at least 1, got {capacity}"
+            raise ValueError(msg)
+
+        self._capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._end = 0
+        # Time of the first write in each 10 ms slice and the offset of the
+        # first byte it wrote; entries before `_index_start` are dropped
+        self._times: list[float] = []
+        self._offsets: list[int] = []
+        self._index_start = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        """Number of bytes the buffer keeps."""
+        return self._capacity
+
+    @property
+    def start_offset(self) -> int:
+        """Offset of the oldest byte still kept."""
+        return max(0, self._end - self._capacity)
+
+    @property
+    def end_offset(self) -> int:
+        """Total number of bytes written so far."""
+        return self._end
+
+    def write(self, data: bytes) -> None:
+        """Append received bytes, overwriting the oldest ones when full.
+
+        Args:
+            data: Received bytes.
+
+        """
+        if not data:
+            return
+
+        view = memoryview(data)[-self._capacity :]
+        with self._lock:
+            self._index_time(time.time())
+            self._end += len(data) - len(view)
+            position = self._end % self._capacity
+            first = min(len(view), self._capacity - position)
+            self._buffer[position : position + first] = view[:first]
+            self._buffer[: len(view) - first] = view[first:]
+            self._end += len(view)
+            self._prune_time_index()
+
+    def flush(self) -> None:
+        """Do nothing; the buffer is always up to date."""
+
+    def slice(self, start: int | None = None, end: int | None = None) -> bytes:
+        """Copy a range of the kept output.
+
+        Args:
+            start: Absolute start offset. Defaults to `start_offset`.
+            end: Absolute end offset (exclusive). Defaults to `end_offset`.
+
+        Returns:
+            Bytes in the range, clamped to what is still kept.
+
+        """
+        with self._lock:
+            return b"".join(bytes(s) for s in self._segments(start, end))
+
+    def offset_at(self, timestamp: float) -> int:
+        """Find the offset of the first byte received at or after a time.
+
+        The time index has a resolution of 10 ms, so the offset may include
+        bytes received up to that long before the given time.
+
+        Args:
+            timestamp: Time as returned by time.time().
+
+        Returns:
+            Absolute offset, clamped to what is still kept.
+
+        """
+        with self._lock:
+            # Bytes are indexed under the time of the first write in a 10 ms
+            # window, so look one window earlier to not miss any of them
+            index = bisect.bisect_left(
+                self._times,
+                timestamp - self._TIME_INDEX_RESOLUTION_SEC,
+                self._index_start,
+            )
+            if index == len(self._times):
+                return self._end
+            return max(self._offsets[index], self.start_offset)
+
+    def since(self, timestamp: float) -> bytes:
+        """Copy the kept output received at or after a time.
+
+        Args:
+            timestamp: Time as returned by time.time().
+
+        Returns:
+            Bytes received since the time.
+
+        """
+        return self.slice(self.offset_at(timestamp))
+
+    def search(
+        self,
+        pattern: str | bytes | re.Pattern[bytes],
+        start: int | None = None,
+    ) -> tuple[int, int] | None:
+        """Search the kept output.
+
+        The kept output lies in at most two contiguous parts of the ring. If
+        it is in one part, that part is searched in place; otherwise both are
+        joined once, so that the first match is found wherever it lies.
+
+        Args:
+            pattern: Regular expression to search for.
+            start: Absolute offset to start searching from.
+                Defaults to `start_offset`.
+
+        Returns:
+            tuple[int, int]: Absolute start and end offsets of the first match.
+            None: If the pattern is not found.
+
+        """
+        regex = self._compile(pattern)
+        with self._lock:
+            first = (
+                self.start_offset if start is None else max(start, self.start_offset)
+            )
+            segments = self._segments(first, None)
+            if not segments:
+                return None
+
+            window = segments[0] if len(segments) == 1 else b"".join(segments)
+            match = regex.search(window)
+            if match:
+                return first + match.start(), first + match.end()
+            return None
+
+    @staticmethod
+    def _compile(pattern: str | bytes | re.Pattern[bytes]) -> re.Pattern[bytes]:
+        """Compile the pattern for searching bytes."""
+        if isinstance(pattern, re.Pattern):
+            return pattern
+        if isinstance(pattern, str):
+            pattern = pattern.encode("utf-8")
+        return re.compile(pattern, re.DOTALL)
+
+    def _segments(self, start: int | None, end: int | None) -> list[memoryview]:
+        """Get views of the ring covering an absolute range, oldest first."""
+        first = self.start_offset if start is None else max(start, self.start_offset)
+        last = self._end if end is None else min(end, self._end)
+        if first >= last:
+            return []
+
+        view = memoryview(self._buffer)
+        begin = first % self._capacity
+        length = last - first
+        if begin + length <= self._capacity:
+            return [view[begin : begin + length]]
+        return [view[begin:], view[: begin + length - self._capacity]]
+
+    def _index_time(self, now: float) -> None:
+        """Record that bytes written from the current end arrived now."""
+        if self._times and now - self._times[-1] < self._TIME_INDEX_RESOLUTION_SEC:
+            return
+        self._times.append(now)
+        self._offsets.append(self._end)
+
+    def _prune_time_index(self) -> None:
+        """Drop index entries whose bytes are no longer kept."""
+        # Keep the last entry at or before the start, which covers it
+        covering = bisect.bisect_right(
+            self._offsets, self.start_offset, self._index_start
+        )
+        self._index_start = max(self._index_start, covering - 1)
+        # Compact only once half of the lists is dropped, for amortized O(1)
+        if self._index_start * 2 > len(self._times):
+            del self._times[: self._index_start]
+            del self._offsets[: self._index_start]
+            self._index_start = 0
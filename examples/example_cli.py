@@ -1,5 +1,3 @@
-import re
-
 from blabot import TemplatedIO
 
 
@@ -20,11 +18,7 @@ class ExampleCliBase:
     def status_show(self):
         pattern = "Sample status: (invalid|on|off)"
 
-        output = self.run_command("sample-status", pattern)
-        if output is None:
-            return None
-
-        match = re.search(pattern, output)
+        match = self.run_command_match("sample-status", pattern)
         return match.group(1) if match else None
 
     def send_on_off(self, command: str):
@@ -31,6 +31,13 @@ def main():
     assert example_cli.run_command("sample-ctrl off", "Sample status changed to 'off'")
     assert example_cli.run_command("sample-status", "Sample status: off")
 
+    # Distinguish several possible responses in a single wait
+    result = example_cli.run_command(
+        "sample-ctrl off",
+        ["Sample status changed to 'off'", "Sample status does not change: 'off'"],
+    )
+    assert result == (1, "Sample status does not change: 'off'")
+
     example_cli.stop()
 
 
@@ -0,0 +1,132 @@
+"""Unit tests for AsyncPexpectIO class."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from blabot.async_pexpect_io import AsyncPexpectIO
+from blabot.device_io import DeviceIO
+from blabot.process_io import ProcessIO
+from blabot.reconnect_policy import ReconnectPolicy
+from blabot.templated_io import FailurePatternError, IOOptions
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# =============================================================================
+# start() / stop() tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_start_and_stop_drive_wrapped_io():
+    """start() and stop() should start and stop the wrapped IO."""
+    io = ProcessIO(start_command="cat")
+    async_io = AsyncPexpectIO(io)
+
+    async def scenario():
+        await async_io.start()
+        assert io.process is not None
+        await async_io.stop()
+
+    run(scenario())
+    assert io.process is None
+
+
+@pytest.mark.unit
+def test_rejects_device_io_that_reconnects():
+    """AsyncPexpectIO should reject a DeviceIO with a reconnect policy."""
+    with patch("blabot.device_io.serial.Serial"):
+        io = DeviceIO("/dev/ttyUSB0", reconnect=ReconnectPolicy())
+
+    with pytest.raises(ValueError, match="reconnects"):
+        AsyncPexpectIO(io)
+
+
+# =============================================================================
+# wait_for() tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_wait_for_returns_match_from_process_output():
+    """wait_for() should return matched output without blocking the loop."""
+    async_io = AsyncPexpectIO(ProcessIO(start_command="cat"))
+
+    async def scenario():
+        await async_io.start()
+        await async_io.send_command("hello async")
+        result = await async_io.wait_for("hello \\w+", timeout_sec=2.0)
+        await async_io.stop()
+        return result
+
+    assert run(scenario()) == "hello async"
+
+
+@pytest.mark.integration
+def test_wait_for_returns_none_on_timeout():
+    """wait_for() should return None when the pattern does not appear."""
+    async_io = AsyncPexpectIO(ProcessIO(start_command="cat"))
+
+    async def scenario():
+        await async_io.start()
+        result = await async_io.wait_for("never", timeout_sec=0.1)
+        await async_io.stop()
+        return result
+
+    assert run(scenario()) is None
+
+
+@pytest.mark.integration
+def test_wait_for_raises_when_failure_pattern_matches():
+    """wait_for() should abort on the default failure patterns of the IO."""
+    options = IOOptions(fail_patterns=["panic"])
+    async_io = AsyncPexpectIO(ProcessIO(start_command="cat", options=options))
+
+    async def scenario():
+        await async_io.start()
+        await async_io.send_command("kernel panic")
+        try:
+            await async_io.wait_for("ready", timeout_sec=2.0)
+        finally:
+            await async_io.stop()
+
+    with pytest.raises(FailurePatternError, match="panic"):
+        run(scenario())
+
+
+@pytest.mark.unit
+def test_wait_for_raises_when_not_started():
+    """wait_for() should raise RuntimeError before start()."""
+    async_io = AsyncPexpectIO(ProcessIO(start_command="cat"))
+
+    with pytest.raises(RuntimeError, match="Process not started"):
+        run(async_io.wait_for("x"))
+
+
+# =============================================================================
+# run_command() tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_run_command_drives_sessions_concurrently():
+    """run_command() should drive many sessions concurrently on one loop."""
+    sessions = [AsyncPexpectIO(ProcessIO(start_command="cat")) for _ in range(10)]
+
+    async def scenario():
+        await asyncio.gather(*(s.start() for s in sessions))
+        results = await asyncio.gather(
+            *(
+                s.run_command(f"ping {i}", ["pong", f"ping {i}"], timeout_sec=2.0)
+                for i, s in enumerate(sessions)
+            )
+        )
+        await asyncio.gather(*(s.stop() for s in sessions))
+        return results
+
+    results = run(scenario())
+    assert results == [(1, f"ping {i}") for i in range(10)]
@@ -0,0 +1,117 @@
+"""Unit tests for DeviceGroup class."""
+
+import os
+import pty
+import threading
+from pathlib import Path
+
+import pytest
+import serial
+
+from blabot.device_group import DeviceGroup
+from blabot.reactor import Reactor
+from blabot.send_pacing import SendPacing
+from blabot.session_group import SessionGroup
+from blabot.templated_io import IOOptions
+
+PORT_COUNT = 16
+
+
+@pytest.fixture
+def pty_pairs():
+    """Pseudo-terminals standing in for serial links: (device side, port path)."""
+    pairs = [pty.openpty() for _ in range(PORT_COUNT)]
+    yield [(master, os.ttyname(slave)) for master, slave in pairs]
+    for master, slave in pairs:
+        os.close(slave)
+        os.close(master)
+
+
+def make_options(**kwargs) -> IOOptions:
+    return IOOptions(log_sink=None, send_pacing=SendPacing(), **kwargs)
+
+
+# =============================================================================
+# Multiplexing tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_group_reads_all_ports_with_one_thread(pty_pairs):
+    """DeviceGroup should serve every port from a single reader thread."""
+    threads_before = threading.active_count()
+    with DeviceGroup([port for _, port in pty_pairs], options=make_options()) as group:
+        assert threading.active_count() == threads_before + 1
+        assert group.reactor.process_count == PORT_COUNT
+
+        for i, (master, _) in enumerate(pty_pairs):
+            os.write(master, f"console {i} ready\n".encode())
+        for i, (_, port) in enumerate(pty_pairs):
+            assert group[port].wait_for(f"console {i} ready", timeout_sec=2.0)
+
+    assert threading.active_count() == threads_before
+
+
+@pytest.mark.unit
+def test_group_ports_work_with_session_group(pty_pairs):
+    """The per-port IOs should be usable as ordinary sessions."""
+    with DeviceGroup([port for _, port in pty_pairs], options=make_options()) as group:
+        for master, _ in pty_pairs:
+            os.write(master, b"login: ")
+        results = SessionGroup(group.devices, max_workers=4).wait_for("login: ")
+
+    assert [result.value for result in results] == ["login: "] * PORT_COUNT
+
+
+@pytest.mark.unit
+def test_group_sends_to_each_port_separately(pty_pairs):
+    """Commands should reach only the port they are sent to."""
+    (master0, port0), (master1, port1) = pty_pairs[:2]
+    with DeviceGroup([port0, port1], newline="\n", options=make_options()) as group:
+        group[port1].send_command("reboot")
+        assert os.read(master1, 64) == b"reboot\n\n"
+        os.set_blocking(master0, False)
+        with pytest.raises(BlockingIOError):
+            os.read(master0, 64)
+
+
+# =============================================================================
+# Lifecycle tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_group_keeps_reactor_given_in_options(pty_pairs):
+    """A reactor passed in the options should be shared and not closed."""
+    with Reactor() as reactor:
+        group = DeviceGroup(
+            [port for _, port in pty_pairs[:2]], options=make_options(reactor=reactor)
+        )
+        group.start()
+        assert reactor.process_count == 2
+        group.close()
+        assert reactor.process_count == 0
+
+        assert group.reactor is reactor
+        assert group.ports == [port for _, port in pty_pairs[:2]]
+
+
+@pytest.mark.unit
+def test_group_rejects_duplicate_ports(pty_pairs):
+    """DeviceGroup should reject a port given twice."""
+    _, port = pty_pairs[0]
+    with pytest.raises(ValueError, match="once"):
+        DeviceGroup([port, port])
+
+
+@pytest.mark.unit
+def test_group_closes_opened_ports_when_a_port_fails(pty_pairs, tmp_path):
+    """A port failing to open should close the ports and the reactor created."""
+    _, port = pty_pairs[0]
+    fd_dir = Path("/proc/self/fd")
+    open_fds = len(list(fd_dir.iterdir()))
+
+    with pytest.raises(serial.SerialException):
+        DeviceGroup([port, str(tmp_path / "missing")])
+
+    assert len(list(fd_dir.iterdir())) == open_fds
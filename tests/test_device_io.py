@@ -1,11 +1,20 @@
 """Unit tests for DeviceIO class."""
 
+import os
+import pty
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pexpect
 import pytest
+import serial
 
 from blabot.device_io import DeviceIO
+from blabot.reactor import Reactor
+from blabot.reconnect_policy import ReconnectPolicy
+from blabot.send_pacing import SendPacing
+from blabot.templated_io import IOOptions
 
 # =============================================================================
 # start() tests
@@ -48,6 +57,19 @@ def test_start_opens_device_if_closed():
             mock_device.open.assert_called_once()
 
 
+@pytest.mark.unit
+def test_reader_thread_cannot_be_combined_with_reactor():
+    """DeviceIO should reject a reader thread together with a reactor."""
+    with (
+        patch("blabot.device_io.serial.Serial"),
+        Reactor() as reactor,
+        pytest.raises(ValueError, match="reactor"),
+    ):
+        DeviceIO(
+            port="/dev/ttyUSB0", options=IOOptions(reactor=reactor), reader_thread=True
+        )
+
+
 # =============================================================================
 # stop() tests
 # =============================================================================
@@ -79,17 +101,49 @@ def test_stop_closes_process_and_device():
 
 @pytest.mark.unit
 def test_send_command_sends_with_newline():
-    """send_command() should append newline and send via sendline()."""
+    """send_command() should append newline and pace the line by default."""
     with patch("blabot.device_io.serial.Serial"):
         io = DeviceIO(port="/dev/ttyUSB0", newline="\r\n")
         mock_process = MagicMock()
+        mock_process.linesep = b"\n"
+        io.process = mock_process
+
+        io.send_command("AT")
+
+        mock_process.send.assert_called_once_with(b"AT\r\n\n")
+
+
+@pytest.mark.unit
+def test_send_command_uses_sendline_without_pacing():
+    """send_command() should send at once when pacing is disabled."""
+    with patch("blabot.device_io.serial.Serial"):
+        io = DeviceIO(
+            port="/dev/ttyUSB0",
+            newline="\r\n",
+            options=IOOptions(send_pacing=SendPacing()),
+        )
+        mock_process = MagicMock()
         io.process = mock_process
 
         io.send_command("AT")
 
+        assert io.send_pacing is None
         mock_process.sendline.assert_called_once_with("AT\r\n")
 
 
+@pytest.mark.unit
+def test_send_bytes_sends_frame_without_newline():
+    """send_bytes() should write the bytes as they are."""
+    with patch("blabot.device_io.serial.Serial"):
+        io = DeviceIO(port="/dev/ttyUSB0", newline="\r\n")
+        mock_process = MagicMock()
+        io.process = mock_process
+
+        io.send_bytes(b"\x02\x10\xff\x03")
+
+        mock_process.send.assert_called_once_with(b"\x02\x10\xff\x03")
+
+
 # =============================================================================
 # wait_for() tests
 # =============================================================================
@@ -115,9 +169,216 @@ def test_wait_for_returns_none_on_timeout():
     with patch("blabot.device_io.serial.Serial"):
         io = DeviceIO(port="/dev/ttyUSB0")
         mock_process = MagicMock()
-        mock_process.expect.side_effect = pexpect.TIMEOUT("timeout")
+        mock_process.expect_list.side_effect = pexpect.TIMEOUT("timeout")
         io.process = mock_process
 
         result = io.wait_for("OK", timeout_sec=1.0)
 
         assert result is None
+
+
+@pytest.mark.unit
+def test_wait_for_any_returns_index_and_match():
+    """wait_for_any() should return the index of the matched pattern."""
+    with patch("blabot.device_io.serial.Serial"):
+        io = DeviceIO(port="/dev/ttyUSB0")
+        mock_process = MagicMock()
+        mock_process.expect_list.return_value = 1
+        mock_process.after = b"ERROR"
+        io.process = mock_process
+
+        result = io.wait_for_any(["OK", "ERROR"], timeout_sec=1.0)
+
+        assert result == (1, "ERROR")
+
+
+# =============================================================================
+# reconnect tests
+# =============================================================================
+
+
+def replug(io: DeviceIO, link, master: int, rest: bytes) -> None:
+    """Unplug the port behind the link, plug in a new one and send `rest`."""
+    os.close(master)
+    time.sleep(0.2)
+    new_master, new_slave = pty.openpty()
+    link.with_suffix(".new").symlink_to(os.ttyname(new_slave))
+    link.with_suffix(".new").replace(link)
+    deadline = time.monotonic() + 5.0
+    while io.reconnect_count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    os.write(new_master, rest)
+    time.sleep(0.5)
+    os.close(new_slave)
+    os.close(new_master)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("reader_thread", [False, True], ids=["pexpect", "reader"])
+def test_wait_for_resumes_across_reconnect(tmp_path, reader_thread):
+    """A wait should resume on the re-opened port with the earlier output."""
+    master, slave = pty.openpty()
+    link = tmp_path / "by-id-console"
+    link.symlink_to(os.ttyname(slave))
+    io = DeviceIO(
+        str(link),
+        options=IOOptions(log_sink=None, send_pacing=SendPacing(), transcript_size=256),
+        reader_thread=reader_thread,
+        reconnect=ReconnectPolicy(initial_delay_sec=0.01, max_delay_sec=0.05),
+    )
+    io.start()
+    os.write(master, b"booting\nre")
+    os.close(slave)
+    plug = threading.Thread(target=replug, args=(io, link, master, b"ady\n"))
+    try:
+        assert io.wait_for("booting", timeout_sec=2.0) == "booting"
+        plug.start()
+        assert io.wait_for("ready", timeout_sec=5.0) == "ready"
+    finally:
+        plug.join()
+        io.stop()
+
+    assert io.reconnect_count == 1
+    assert io.last_reconnect_sec > 0
+    assert io.transcript.search("booting") is not None
+    assert io.transcript.search("ready") is not None
+
+
+@pytest.mark.unit
+def test_wait_for_raises_eof_on_disconnect_without_policy():
+    """Without a reconnect policy, a disconnect should end waits with EOF."""
+    master, slave = pty.openpty()
+    io = DeviceIO(os.ttyname(slave), options=IOOptions(log_sink=None))
+    io.start()
+    os.close(slave)
+    os.close(master)
+    try:
+        with pytest.raises(pexpect.EOF):
+            io.wait_for("never", timeout_sec=2.0)
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_reconnect_gives_up_after_policy_timeout(tmp_path):
+    """Reconnecting should stop at the policy timeout, raising only without one."""
+    master, slave = pty.openpty()
+    link = tmp_path / "by-id-console"
+    link.symlink_to(os.ttyname(slave))
+    io = DeviceIO(
+        str(link),
+        options=IOOptions(log_sink=None),
+        reconnect=ReconnectPolicy(initial_delay_sec=0.01, timeout_sec=0.2),
+    )
+    io.start()
+    os.close(slave)
+    os.close(master)
+    link.unlink()
+    try:
+        start = time.monotonic()
+        assert io.wait_for("never", timeout_sec=2.0) is None
+        assert time.monotonic() - start < 1.0
+        assert io.reconnect(timeout_sec=2.0) is False
+        with pytest.raises(RuntimeError, match="did not come back"):
+            io.reconnect()
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_wait_times_out_while_port_stays_missing(tmp_path):
+    """Reconnecting should stop at the timeout of the wait, not of the policy."""
+    master, slave = pty.openpty()
+    link = tmp_path / "by-id-console"
+    link.symlink_to(os.ttyname(slave))
+    io = DeviceIO(
+        str(link),
+        options=IOOptions(log_sink=None),
+        reconnect=ReconnectPolicy(initial_delay_sec=0.01, timeout_sec=30.0),
+    )
+    io.start()
+    os.close(slave)
+    os.close(master)
+    link.unlink()
+    new_master, new_slave = pty.openpty()
+    try:
+        start = time.monotonic()
+        assert io.wait_for("never", timeout_sec=0.3) is None
+        assert time.monotonic() - start < 1.0
+        assert io.reconnect_count == 0
+
+        # The next wait re-opens the port once it is back
+        link.symlink_to(os.ttyname(new_slave))
+        assert io.wait_for("ready", timeout_sec=0.3) is None
+        assert io.reconnect_count == 1
+        os.write(new_master, b"ready\n")
+        assert io.wait_for("ready", timeout_sec=2.0) == "ready"
+    finally:
+        io.stop()
+        os.close(new_slave)
+        os.close(new_master)
+
+
+def make_failing_send_io(chunks_before_failure: int) -> tuple[DeviceIO, MagicMock]:
+    """Create a DeviceIO whose port fails after some paced writes."""
+    io = DeviceIO(
+        port="/dev/ttyUSB0",
+        options=IOOptions(log_sink=None, send_pacing=SendPacing(bytes_per_sec=1e6)),
+        reconnect=ReconnectPolicy(),
+    )
+    mock_process = MagicMock(linesep=b"\n", sent_bytes=0)
+    writes: list[bytes] = []
+
+    def send(data: bytes) -> int:
+        writes.append(data)
+        if len(writes) == chunks_before_failure + 1:
+            msg = "device disconnected"
+            raise serial.SerialException(msg)
+        mock_process.sent_bytes += len(data)
+        return len(data)
+
+    mock_process.send.side_effect = send
+    io.process = mock_process
+    return io, mock_process
+
+
+@pytest.mark.unit
+def test_send_is_repeated_after_reconnect_if_nothing_was_written():
+    """A send failing before any write should be sent again once reconnected."""
+    with patch("blabot.device_io.serial.Serial"):
+        io, mock_process = make_failing_send_io(chunks_before_failure=0)
+        with patch.object(io, "reconnect", return_value=True) as mock_reconnect:
+            io.send_command("AT")
+
+    mock_reconnect.assert_called_once()
+    assert mock_reconnect.call_args.args[0] < ReconnectPolicy().timeout_sec
+    assert mock_process.sent_bytes == len(b"AT\n")
+
+
+@pytest.mark.unit
+def test_send_is_not_repeated_after_partial_write():
+    """A send failing after some of its writes should raise, not write twice."""
+    with patch("blabot.device_io.serial.Serial"):
+        io, mock_process = make_failing_send_io(chunks_before_failure=1)
+        with (
+            patch.object(io, "reconnect", return_value=True) as mock_reconnect,
+            pytest.raises(serial.SerialException),
+        ):
+            io.send_bytes(b"x" * 40)
+
+    mock_reconnect.assert_called_once()
+    assert mock_process.sent_bytes == SendPacing().burst_bytes
+
+
+@pytest.mark.unit
+def test_send_raises_when_port_does_not_come_back():
+    """A send should raise the port error if reconnecting runs out of time."""
+    with patch("blabot.device_io.serial.Serial"):
+        io, mock_process = make_failing_send_io(chunks_before_failure=0)
+        with (
+            patch.object(io, "reconnect", return_value=False),
+            pytest.raises(serial.SerialException),
+        ):
+            io.send_command("AT")
+
+    assert mock_process.sent_bytes == 0
@@ -55,7 +55,7 @@ def test_docker_run_start_raises_when_docker_fails():
 
     with patch("blabot.docker_io.pexpect.spawn") as mock_spawn:
         mock_process = MagicMock()
-        mock_process.expect.side_effect = pexpect.TIMEOUT("timeout")
+        mock_process.expect_list.side_effect = pexpect.TIMEOUT("timeout")
         mock_spawn.return_value = mock_process
 
         with pytest.raises(RuntimeError, match="Failed to start docker"):
@@ -117,7 +117,7 @@ def test_docker_exec_start_raises_when_docker_fails():
 
     with patch("blabot.docker_io.pexpect.spawn") as mock_spawn:
         mock_process = MagicMock()
-        mock_process.expect.side_effect = pexpect.TIMEOUT("timeout")
+        mock_process.expect_list.side_effect = pexpect.TIMEOUT("timeout")
         mock_spawn.return_value = mock_process
 
         with pytest.raises(RuntimeError, match="Failed to start docker"):
@@ -0,0 +1,193 @@
+"""Unit tests for file transfers through a shell."""
+
+import base64
+import hashlib
+import re
+
+import pytest
+
+from blabot.file_transfer import (
+    STATUS_PATTERN,
+    DownloadParser,
+    TransferError,
+    TransferResult,
+    upload_chunk,
+    with_status,
+)
+from blabot.process_io import ProcessIO
+from blabot.templated_io import IOOptions
+
+
+@pytest.fixture
+def shell():
+    """Started bash session with a fixed prompt."""
+    io = ProcessIO(
+        start_command="env 'PS1=sh> ' bash --norc --noprofile",
+        prompt="sh> ",
+        newline="\n",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    yield io
+    io.stop()
+
+
+# =============================================================================
+# Command building tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_echo_of_status_command_does_not_match_status():
+    """The echoed command should not be mistaken for its exit status."""
+    command = with_status("true")
+
+    assert re.search(STATUS_PATTERN, command) is None
+    assert re.search(STATUS_PATTERN, "BLABOT_STATUS:0").group(1) == "0"
+
+
+@pytest.mark.unit
+def test_upload_chunk_writes_base64_heredoc():
+    """upload_chunk() should wrap the chunk in a quoted heredoc."""
+    text = upload_chunk("/tmp/a b", b"\x00" * 100, "\r", append=True)
+    lines = text.split("\r")
+
+    assert text.endswith("\rBLABOT_EOF")
+    assert lines[0].startswith("base64 -d >> '/tmp/a b' <<'BLABOT_EOF'")
+    assert lines[-1] == "BLABOT_EOF"
+    assert base64.b64decode("".join(lines[1:-1])) == b"\x00" * 100
+
+
+# =============================================================================
+# DownloadParser tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_download_parser_collects_contents_after_digest():
+    """DownloadParser should skip the echo and decode lines after the digest."""
+    digest = hashlib.sha256(b"hello").hexdigest()
+    parser = DownloadParser()
+
+    assert not parser.feed("sh> sha256sum x && base64 x; echo BLABOT_STATUS:$?")
+    assert not parser.feed(f"\x1b[?2004l\r{digest}  x")
+    assert not parser.feed("aGVsbG8=")
+    assert parser.feed("BLABOT_STATUS:0")
+
+    assert parser.digest == digest
+    assert parser.status == 0
+    assert parser.data() == b"hello"
+
+
+@pytest.mark.unit
+def test_transfer_result_reports_rate():
+    """bytes_per_sec should be the size divided by the elapsed time."""
+    assert TransferResult("x", 1000, "", 0.5).bytes_per_sec == 2000
+    assert TransferResult("x", 1000, "", 0.0).bytes_per_sec == 0.0
+
+
+# =============================================================================
+# Transfer tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_send_and_receive_file_round_trip(shell, tmp_path):
+    """A binary file should arrive unchanged in both directions."""
+    source = tmp_path / "source.bin"
+    source.write_bytes(bytes(range(256)) * 200)
+
+    sent = shell.send_file(source, str(tmp_path / "remote.bin"), chunk_size=4096)
+    received = shell.receive_file(str(tmp_path / "remote.bin"), tmp_path / "back")
+
+    assert sent.size == received.size == 51200
+    assert (
+        sent.sha256
+        == received.sha256
+        == hashlib.sha256(source.read_bytes()).hexdigest()
+    )
+    assert (tmp_path / "back").read_bytes() == source.read_bytes()
+    assert shell.run_command("echo done", "done") == "done"
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("chunk_size", [3, 57, 114])
+def test_send_file_whose_size_is_a_multiple_of_chunk_size(shell, tmp_path, chunk_size):
+    """Chunks without base64 padding should end their heredoc cleanly."""
+    source = tmp_path / "source.bin"
+    source.write_bytes(bytes(range(chunk_size)) * 4)
+
+    result = shell.send_file(source, str(tmp_path / "remote"), chunk_size=chunk_size)
+
+    assert result.size == chunk_size * 4
+    assert (tmp_path / "remote").read_bytes() == source.read_bytes()
+    assert shell.run_command("echo done", "done") == "done"
+
+
+@pytest.mark.integration
+def test_send_file_creates_empty_file(shell, tmp_path):
+    """An empty file should be created on the target."""
+    source = tmp_path / "empty"
+    source.write_bytes(b"")
+
+    result = shell.send_file(source, str(tmp_path / "remote"))
+
+    assert result.size == 0
+    assert (tmp_path / "remote").read_bytes() == b""
+
+
+@pytest.mark.integration
+def test_send_file_sends_no_empty_line_without_newline(tmp_path):
+    """Each chunk should end at its terminator, leaving one prompt per command."""
+    io = ProcessIO(
+        start_command="env 'PS1=sh> ' bash --norc --noprofile",
+        prompt="sh> ",
+        options=IOOptions(log_sink=None, transcript_size=65536),
+    )
+    source = tmp_path / "source"
+    source.write_bytes(b"data" * 100)
+    io.start()
+    try:
+        io.send_file(source, str(tmp_path / "remote"), chunk_size=100)
+        io.drain(quiet_sec=0.2)
+    finally:
+        io.stop()
+
+    # The first prompt, one after each of the 4 chunks and one after the digest
+    assert io.transcript.slice().count(b"sh> ") == 6
+
+
+@pytest.mark.integration
+def test_receive_file_leaves_the_next_prompt(shell, tmp_path):
+    """Output after the exit status should stay for the next wait."""
+    (tmp_path / "remote").write_bytes(b"data")
+
+    shell.receive_file(str(tmp_path / "remote"), tmp_path / "local")
+
+    assert shell.wait_for("sh> ", timeout_sec=0.0) == "sh> "
+
+
+@pytest.mark.integration
+def test_send_file_raises_when_target_cannot_be_written(shell, tmp_path):
+    """A failing chunk should raise TransferError with the shell's error."""
+    source = tmp_path / "source"
+    source.write_bytes(b"data")
+
+    with pytest.raises(TransferError, match="No such file or directory"):
+        shell.send_file(source, str(tmp_path / "missing" / "remote"))
+
+
+@pytest.mark.integration
+def test_receive_file_raises_for_missing_file(shell, tmp_path):
+    """Reading a missing file should raise TransferError with its status."""
+    with pytest.raises(TransferError, match="failed with status 1"):
+        shell.receive_file(str(tmp_path / "missing"), tmp_path / "local")
+
+    assert not (tmp_path / "local").exists()
+
+
+@pytest.mark.integration
+def test_send_file_rejects_invalid_chunk_size(shell, tmp_path):
+    """chunk_size should be at least 1."""
+    with pytest.raises(ValueError, match="at least 1"):
+        shell.send_file(tmp_path / "source", "remote", chunk_size=0)
@@ -0,0 +1,134 @@
+"""Unit tests for log sink classes."""
+
+import threading
+
+import pytest
+
+from blabot.log_sink import FileSink, MemorySink, QueueSink, TeeSink
+
+
+class BlockingSink:
+    """Sink whose writes block until released."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.writes: list[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self.release.wait()
+        self.writes.append(data)
+
+    def flush(self) -> None:
+        pass
+
+
+# =============================================================================
+# FileSink tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_file_sink_appends_to_file_on_close(tmp_path):
+    """FileSink should append the transcript to the file."""
+    path = tmp_path / "transcript.log"
+    path.write_bytes(b"old\n")
+
+    sink = FileSink(path)
+    sink.write(b"new ")
+    sink.flush()
+    sink.write(b"output\n")
+    sink.close()
+
+    assert path.read_bytes() == b"old\nnew output\n"
+
+
+# =============================================================================
+# MemorySink tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_memory_sink_keeps_only_latest_bytes():
+    """MemorySink should discard the oldest bytes beyond max_bytes."""
+    sink = MemorySink(max_bytes=8)
+
+    sink.write(b"0123456")
+    sink.write(b"789ab")
+
+    assert sink.getvalue() == b"456789ab"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_bytes", [0, -1], ids=["zero", "negative"])
+def test_memory_sink_raises_value_error_when_max_bytes_is_invalid(max_bytes):
+    """MemorySink should raise ValueError when max_bytes is less than 1."""
+    with pytest.raises(ValueError, match="max_bytes"):
+        MemorySink(max_bytes=max_bytes)
+
+
+# =============================================================================
+# QueueSink tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_queue_sink_writes_all_chunks_to_target_on_close():
+    """QueueSink should write every queued chunk to the target."""
+    target = MemorySink()
+    sink = QueueSink(target)
+
+    for i in range(100):
+        sink.write(f"{i},".encode())
+    sink.close()
+
+    assert target.getvalue() == b"".join(f"{i},".encode() for i in range(100))
+
+
+@pytest.mark.unit
+def test_queue_sink_batches_chunks_queued_while_busy():
+    """QueueSink should join chunks queued during a write into one write."""
+    target = BlockingSink()
+    sink = QueueSink(target)
+
+    sink.write(b"first")
+    sink.write(b"a")
+    sink.write(b"b")
+    target.release.set()
+    sink.close()
+
+    assert b"".join(target.writes) == b"firstab"
+    assert len(target.writes) <= 2
+
+
+@pytest.mark.unit
+def test_queue_sink_drops_chunks_instead_of_blocking_when_full():
+    """QueueSink should count dropped bytes when too many chunks are pending."""
+    target = BlockingSink()
+    sink = QueueSink(target, max_pending=1)
+
+    for _ in range(5):
+        sink.write(b"xx")
+    target.release.set()
+    sink.close()
+
+    assert sink.dropped_bytes > 0
+    assert len(b"".join(target.writes)) + sink.dropped_bytes == 10
+
+
+# =============================================================================
+# TeeSink tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_tee_sink_writes_to_every_target():
+    """TeeSink should write each chunk to all targets in order."""
+    first = MemorySink()
+    second = MemorySink()
+    sink = TeeSink(first, second)
+
+    sink.write(b"abc")
+    sink.write(b"def")
+    sink.flush()
+
+    assert first.getvalue() == second.getvalue() == b"abcdef"
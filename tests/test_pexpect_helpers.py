@@ -0,0 +1,354 @@
+"""Unit tests for pexpect helper functions."""
+
+import re
+from unittest.mock import MagicMock
+
+import pexpect
+import pytest
+from pexpect.expect import searcher_re
+from pexpect.spawnbase import SpawnBase
+
+from blabot._pexpect_helpers import (
+    BufferLimit,
+    PatternCacheInfo,
+    clear_pattern_cache,
+    compile_patterns,
+    drain_output,
+    make_searcher,
+    pattern_cache_info,
+    wait_for_any_bytes,
+    wait_for_any_pattern,
+    wait_for_pattern,
+)
+from blabot.templated_io import FailurePatternError
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_pattern_cache()
+    yield
+    clear_pattern_cache()
+
+
+def make_process(after: bytes = b"OK") -> MagicMock:
+    process = MagicMock()
+    process.encoding = None
+    process.ignorecase = False
+    process.after = after
+    return process
+
+
+# =============================================================================
+# compile_patterns() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_compile_patterns_compiles_bytes_for_bytes_process():
+    """compile_patterns() should compile bytes patterns when no encoding is set."""
+    compiled = compile_patterns(make_process(), ["Sample status: (on|off)"])
+
+    assert compiled[0].pattern == b"Sample status: (on|off)"
+    assert compiled[0].search(b"Sample status: on").group(1) == b"on"
+
+
+@pytest.mark.unit
+def test_compile_patterns_reuses_cached_patterns():
+    """compile_patterns() should compile each pattern list only once."""
+    first = compile_patterns(make_process(), ["> "])
+    second = compile_patterns(make_process(), ["> "])
+
+    assert first[0] is second[0]
+    info = pattern_cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+@pytest.mark.unit
+def test_pattern_cache_info_counts_literal_and_regex_lookups():
+    """pattern_cache_info() should include the literal pattern cache."""
+    make_searcher(make_process(), ["ready"])
+    make_searcher(make_process(), ["ready"])
+    make_searcher(make_process(), ["\\d+"])
+
+    info = pattern_cache_info()
+    # "ready" is cached as literals; "\d+" is looked up in both caches
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 3)
+
+
+@pytest.mark.unit
+def test_clear_pattern_cache_resets_statistics():
+    """clear_pattern_cache() should drop entries and counters."""
+    compile_patterns(make_process(), ["> "])
+    make_searcher(make_process(), ["ready"])
+
+    clear_pattern_cache()
+
+    info = pattern_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (0, 0, 0)
+
+
+# =============================================================================
+# make_searcher() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("patterns", "literal"),
+    [
+        (["Complete startup sequence"], True),
+        ([re.escape("[OK] (1/2)")], True),
+        (["Sample status: on", "Error"], True),
+        (["Sample status: (on|off)"], False),
+        (["ready", "\\d+"], False),
+    ],
+    ids=["literal", "escaped", "many-literals", "regex", "mixed"],
+)
+def test_make_searcher_detects_literal_patterns(patterns, literal):
+    """make_searcher() should use the regex searcher only when needed."""
+    searcher = make_searcher(make_process(), patterns)
+    assert isinstance(searcher, searcher_re) is not literal
+
+
+@pytest.mark.unit
+def test_make_searcher_accepts_bytes_patterns():
+    """make_searcher() should search bytes literals without a regex too."""
+    searcher = make_searcher(make_process(), [b"\x02", re.escape(b"\xff(")])
+    buffer = b"ab\xff(\x02"
+
+    assert searcher.search(buffer, len(buffer)) == 1
+    assert searcher.match == b"\xff("
+    assert isinstance(make_searcher(make_process(), [b"\x02.\x03"]), searcher_re)
+
+
+@pytest.mark.unit
+def test_make_searcher_uses_regex_for_case_insensitive_process():
+    """make_searcher() should leave case-insensitive matching to regexes."""
+    process = make_process()
+    process.ignorecase = True
+    assert isinstance(make_searcher(process, ["ready"]), searcher_re)
+
+
+@pytest.mark.unit
+def test_literal_searcher_returns_earliest_match():
+    """The literal searcher should prefer the earliest match like pexpect."""
+    searcher = make_searcher(make_process(), ["bar", re.escape("[foo]")])
+    buffer = b"xx[foo] bar"
+
+    assert searcher.search(buffer, len(buffer)) == 1
+    assert (searcher.start, searcher.end, searcher.match) == (2, 7, b"[foo]")
+
+
+@pytest.mark.unit
+def test_literal_searcher_prefers_first_pattern_on_tie():
+    """The literal searcher should pick the first of literals starting together."""
+    searcher = make_searcher(make_process(), ["abc", "ab", "b"])
+    buffer = b"xabc"
+
+    assert searcher.search(buffer, len(buffer)) == 0
+    assert (searcher.start, searcher.end, searcher.match) == (1, 4, b"abc")
+
+    searcher = make_searcher(make_process(), ["b", "ab"])
+    assert searcher.search(buffer, len(buffer)) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("unused", [0, 400], ids=["find", "automaton"])
+def test_literal_searcher_matches_the_same_with_many_literals(unused):
+    """Long literal lists should match like short ones, in one pass."""
+    padding = [f"unused-{index}" for index in range(unused)]
+    searcher = make_searcher(make_process(), [*padding, "cd", "abcdef", "bcd"])
+    buffer = b"xxabcdefcd"
+
+    assert searcher.search(buffer, len(buffer)) == unused + 1
+    assert (searcher.start, searcher.end, searcher.match) == (2, 8, b"abcdef")
+
+    searcher = make_searcher(make_process(), [*padding, "cd", "bcdx", "bc", "b"])
+    assert searcher.search(b"abcd", 4) == unused + 2
+    assert searcher.search(b"bc" + b"." * 100 + b"cd", 2) == unused
+
+
+@pytest.mark.unit
+def test_pattern_cache_info_returns_public_named_tuple():
+    """pattern_cache_info() should return a PatternCacheInfo."""
+    make_searcher(make_process(), ["ready"])
+
+    assert pattern_cache_info() == PatternCacheInfo(0, 1, 512, 1)
+
+
+@pytest.mark.unit
+def test_literal_searcher_skips_output_searched_before():
+    """The literal searcher should only search fresh output and its overlap."""
+    searcher = make_searcher(make_process(), ["ready"])
+
+    assert searcher.search(b"ready" + b"." * 100, 10) == -1
+    assert searcher.search(b"." * 100 + b"rea" + b"dy", 2) == 0
+
+
+# =============================================================================
+# wait_for_pattern() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_wait_for_pattern_passes_compiled_patterns_to_expect_list():
+    """wait_for_pattern() should hand pre-compiled patterns to expect_list()."""
+    process = make_process()
+
+    result = wait_for_pattern(process, "O+K", timeout_sec=1.0)
+
+    assert result == "OK"
+    compiled = process.expect_list.call_args[0][0]
+    assert compiled[0].pattern == b"O+K"
+    assert process.expect_list.call_args[1]["timeout"] == 1.0
+
+
+# =============================================================================
+# wait_for_any_pattern() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_wait_for_any_pattern_returns_index_and_match():
+    """wait_for_any_pattern() should return the index reported by expect_list()."""
+    process = make_process(after=b"error")
+    process.expect_list.return_value = 1
+
+    result = wait_for_any_pattern(process, ["ok$", "err(or)?"], timeout_sec=1.0)
+
+    assert result == (1, "error")
+
+
+@pytest.mark.integration
+def test_wait_for_any_pattern_searches_literals_without_regex():
+    """wait_for_any_pattern() should match plain literals on a real process."""
+    process = pexpect.spawn("echo 'Sample status: on'")
+    try:
+        result = wait_for_any_pattern(
+            process, ["never", "Sample status: on"], timeout_sec=2.0
+        )
+    finally:
+        process.close()
+
+    assert result == (1, "Sample status: on")
+
+
+@pytest.mark.unit
+def test_wait_for_any_pattern_raises_on_empty_patterns():
+    """wait_for_any_pattern() should reject an empty pattern list."""
+    with pytest.raises(ValueError, match="pattern"):
+        wait_for_any_pattern(make_process(), [])
+
+
+@pytest.mark.integration
+def test_wait_for_any_pattern_trims_unmatched_output_to_limit():
+    """wait_for_any_pattern() should discard old output beyond the limit."""
+    limit = BufferLimit(256)
+    process = pexpect.spawn("sh -c 'seq 5000; echo done'")
+    try:
+        result = wait_for_any_pattern(process, ["done"], timeout_sec=5.0, limit=limit)
+        before = process.before
+    finally:
+        process.close()
+
+    assert result == (0, "done")
+    assert before.endswith(b"5000\r\n")
+    assert len(before) <= 2 * 256
+    assert limit.discarded_bytes > 0
+
+
+class ChunkSpawn(SpawnBase):
+    """pexpect spawn reading fixed chunks instead of a process."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        super().__init__(timeout=1)
+        self.chunks = chunks
+
+    def read_nonblocking(self, size=1, timeout=None):  # noqa: ARG002
+        if not self.chunks:
+            raise pexpect.EOF("end")  # noqa: EM101
+        return self.chunks.pop(0)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("chunks", "before", "discarded"),
+    [
+        ([b"a" * 250, b"b" * 50 + b"done"], b"a" * 100 + b"b" * 50, 150),
+        ([b"a" * 150, b"b" * 150 + b"done"], b"b" * 100, 200),
+        ([b"a" * 200 + b"done"], b"a" * 200, 0),
+    ],
+)
+def test_buffer_limit_bounds_output_before_match(chunks, before, discarded):
+    """The output before a match should never exceed twice the limit."""
+    limit = BufferLimit(100)
+    process = ChunkSpawn(chunks)
+
+    result = wait_for_any_pattern(process, ["done"], timeout_sec=1.0, limit=limit)
+
+    assert result == (0, "done")
+    assert process.before == before
+    assert limit.discarded_bytes == discarded
+
+
+@pytest.mark.unit
+def test_buffer_limit_rejects_non_positive_size():
+    """BufferLimit should require room for at least one byte."""
+    with pytest.raises(ValueError, match="max_size"):
+        BufferLimit(0)
+
+
+# =============================================================================
+# wait_for_any_bytes() tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_wait_for_any_bytes_returns_raw_match():
+    """wait_for_any_bytes() should match bytes that are not valid UTF-8."""
+    process = pexpect.spawn("printf 'x\\002\\377\\376\\003y'")
+    try:
+        result = wait_for_any_bytes(process, [b"\x02(.*)\x03"], timeout_sec=2.0)
+    finally:
+        process.close()
+
+    assert result == (0, b"\x02\xff\xfe\x03")
+
+
+@pytest.mark.integration
+def test_wait_for_any_bytes_raises_on_failure_pattern():
+    """wait_for_any_bytes() should accept text failure patterns."""
+    process = pexpect.spawn("echo 'panic: \xff'")
+    try:
+        with pytest.raises(FailurePatternError, match="panic"):
+            wait_for_any_bytes(process, [b"never"], timeout_sec=2.0, fail_on=["panic"])
+    finally:
+        process.close()
+
+
+# =============================================================================
+# drain_output() tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_drain_output_consumes_output_left_by_timed_out_wait():
+    """drain_output() should consume output that a timed out wait buffered."""
+    process = pexpect.spawn("sh -c 'echo stale; exec cat'")
+    try:
+        assert wait_for_pattern(process, "never", timeout_sec=0.5) is None
+        assert drain_output(process).strip() == b"stale"
+        assert wait_for_pattern(process, "stale", timeout_sec=0.1) is None
+    finally:
+        process.terminate(force=True)
+
+
+@pytest.mark.integration
+def test_drain_output_stops_at_eof():
+    """drain_output() should return what was read when the process exits."""
+    process = pexpect.spawn("echo bye")
+    try:
+        assert drain_output(process, quiet_sec=1.0).strip() == b"bye"
+    finally:
+        process.close()
@@ -1,11 +1,17 @@
 """Unit tests for ProcessIO class."""
 
+import contextlib
+import re
+import sys
+import time
 from unittest.mock import MagicMock, patch
 
 import pexpect
 import pytest
 
+from blabot.log_sink import MemorySink
 from blabot.process_io import ProcessIO
+from blabot.templated_io import FailurePatternError, IOOptions
 
 # =============================================================================
 # start() tests
@@ -27,6 +33,67 @@ def test_start_spawns_process():
         assert io.process is mock_process
 
 
+@pytest.mark.unit
+def test_start_attaches_configured_log_sink():
+    """start() should write the transcript to the configured log sink."""
+    sink = MemorySink()
+    io = ProcessIO(start_command="python app.py", options=IOOptions(log_sink=sink))
+
+    with patch("blabot.process_io.pexpect.spawn"):
+        io.start()
+
+    assert io.process.logfile is sink
+
+
+@pytest.mark.unit
+def test_start_disables_transcript_when_log_sink_is_none():
+    """start() should not log anything when the log sink is None."""
+    io = ProcessIO(start_command="python app.py", options=IOOptions(log_sink=None))
+
+    with patch("blabot.process_io.pexpect.spawn"):
+        io.start()
+
+    assert io.process.logfile is None
+
+
+@pytest.mark.unit
+def test_start_disables_pexpect_send_delay():
+    """start() should disable the fixed delay pexpect sleeps before each send."""
+    io = ProcessIO(start_command="python app.py")
+
+    with patch("blabot.process_io.pexpect.spawn"):
+        io.start()
+
+    assert io.process.delaybeforesend is None
+    assert io.send_pacing is None
+
+
+@pytest.mark.unit
+def test_start_applies_read_and_search_limits():
+    """start() should configure pexpect with the limits of the options."""
+    options = IOOptions(search_window_size=512, maxread=8192)
+    io = ProcessIO(start_command="python app.py", options=options)
+
+    with patch("blabot.process_io.pexpect.spawn"):
+        io.start()
+
+    assert io.process.searchwindowsize == 512
+    assert io.process.maxread == 8192
+
+
+@pytest.mark.integration
+def test_start_feeds_received_output_to_transcript():
+    """start() should keep received output in the transcript buffer."""
+    io = ProcessIO(start_command="cat", options=IOOptions(transcript_size=64))
+
+    io.start()
+    io.send_command("hello\n")
+    io.wait_for("hello", timeout_sec=2.0)
+    io.stop()
+
+    assert io.transcript.search("hello") is not None
+
+
 # =============================================================================
 # stop() tests
 # =============================================================================
@@ -86,9 +153,319 @@ def test_wait_for_returns_none_on_timeout():
     """wait_for() should return None when pexpect.TIMEOUT is raised."""
     io = ProcessIO(start_command="python app.py")
     mock_process = MagicMock()
-    mock_process.expect.side_effect = pexpect.TIMEOUT("timeout")
+    mock_process.expect_list.side_effect = pexpect.TIMEOUT("timeout")
     io.process = mock_process
 
     result = io.wait_for("expected", timeout_sec=1.0)
 
     assert result is None
+
+
+@pytest.mark.unit
+def test_wait_for_any_returns_index_and_match():
+    """wait_for_any() should return the index of the matched pattern."""
+    io = ProcessIO(start_command="python app.py")
+    mock_process = MagicMock()
+    mock_process.expect_list.return_value = 1
+    mock_process.after = b"does not change"
+    io.process = mock_process
+
+    result = io.wait_for_any(["changed to", "does not change"], timeout_sec=1.0)
+
+    assert result == (1, "does not change")
+    assert len(mock_process.expect_list.call_args[0][0]) == 2
+
+
+@pytest.mark.unit
+def test_wait_for_any_returns_none_on_timeout():
+    """wait_for_any() should return None when pexpect.TIMEOUT is raised."""
+    io = ProcessIO(start_command="python app.py")
+    mock_process = MagicMock()
+    mock_process.expect_list.side_effect = pexpect.TIMEOUT("timeout")
+    io.process = mock_process
+
+    result = io.wait_for_any(["a", "b"], timeout_sec=1.0)
+
+    assert result is None
+
+
+@pytest.mark.unit
+def test_wait_for_raises_when_failure_pattern_matches():
+    """wait_for() should abort immediately when a failure pattern matches."""
+    io = ProcessIO(
+        start_command="python app.py",
+        options=IOOptions(fail_patterns=["Invalid command:"]),
+    )
+    mock_process = MagicMock()
+    mock_process.expect_list.return_value = 1
+    mock_process.after = b"Invalid command:"
+    io.process = mock_process
+
+    with pytest.raises(FailurePatternError, match="Invalid command:") as exc_info:
+        io.wait_for("Sample status", timeout_sec=1.0)
+
+    assert exc_info.value.pattern == "Invalid command:"
+    assert len(mock_process.expect_list.call_args[0][0]) == 2
+
+
+@pytest.mark.unit
+def test_wait_for_fail_on_overrides_default_patterns():
+    """wait_for() should search only the given failure patterns."""
+    io = ProcessIO(
+        start_command="python app.py",
+        options=IOOptions(fail_patterns=["Invalid command:"]),
+    )
+    mock_process = MagicMock()
+    mock_process.expect_list.return_value = 0
+    mock_process.after = b"Sample status"
+    io.process = mock_process
+
+    result = io.wait_for("Sample status", timeout_sec=1.0, fail_on=[])
+
+    assert result == "Sample status"
+    assert len(mock_process.expect_list.call_args[0][0]) == 1
+
+
+# =============================================================================
+# Prompt tracking tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_run_command_sends_immediately_when_prompt_was_consumed():
+    """run_command() should not probe for a prompt that a wait already consumed."""
+    io = ProcessIO(
+        start_command=f"{sys.executable} -c \"while True: input('> ')\"",
+        prompt="> ",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    try:
+        assert io.run_command("first", expect="first\r\n> ", timeout_sec=2.0)
+
+        start = time.monotonic()
+        assert io.run_command("second", expect="second", timeout_sec=2.0)
+        # Probing for the prompt alone would take 0.5 s
+        assert time.monotonic() - start < 0.4
+    finally:
+        io.stop()
+
+
+@pytest.mark.integration
+def test_wait_for_prompt_ignores_prompt_before_the_match():
+    """A prompt-like line before the matched output should not count as idle."""
+    program = (
+        "while True: input('> '); print('> not a prompt yet'); "
+        "__import__('time').sleep(0.3); print(42)"
+    )
+    io = ProcessIO(
+        start_command=f'{sys.executable} -c "{program}"',
+        prompt="> ",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    try:
+        assert io.run_command("go", "not a prompt", timeout_sec=2.0)
+
+        assert io.wait_for_prompt(timeout_sec=2.0)
+        assert b"42" in io.process.before
+    finally:
+        io.stop()
+
+
+# =============================================================================
+# run_commands() tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_run_commands_matches_pipelined_responses_in_order():
+    """run_commands() should match each response within its own prompt."""
+    io = ProcessIO(
+        start_command=f"{sys.executable} -c \"while True: print(input('> ').upper())\"",
+        prompt="> ",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    try:
+        results = io.run_commands(
+            [("a", "A"), ("b", "B"), ("c", "X"), ("d", "D")], timeout_sec=2.0
+        )
+        assert results == ["A", "B", None, "D"]
+    finally:
+        io.stop()
+
+
+@pytest.mark.integration
+def test_run_command_captures_output_until_next_prompt():
+    """run_command(capture=True) should return the whole output of a command."""
+    program = "while True: n = int(input('> ')); print(*range(n), sep='\\n')"
+    io = ProcessIO(
+        start_command=f'{sys.executable} -c "{program}"',
+        prompt="> ",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    try:
+        output = io.run_command("10000", timeout_sec=5.0, capture=True)
+        assert output is not None
+        assert output.splitlines() == [str(i).encode() for i in range(10000)]
+
+        assert io.run_command("3", "^0", timeout_sec=2.0, capture=True) == (
+            b"0\r\n1\r\n2\r\n"
+        )
+        assert io.run_command("2", "missing", timeout_sec=2.0, capture=True) is None
+    finally:
+        io.stop()
+
+
+@pytest.mark.integration
+def test_wait_for_match_decodes_groups_and_before():
+    """wait_for_match() should return pexpect's match decoded with its groups."""
+    io = ProcessIO(
+        start_command="echo 'boot ok; Sample status: off'",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    try:
+        match = io.wait_for_match(
+            "Sample status: (?P<state>on|off)( extra)?", timeout_sec=2.0
+        )
+    finally:
+        io.stop()
+
+    assert match is not None
+    assert match.text == "Sample status: off"
+    assert match.groups == ("off", None)
+    assert match.named_groups == {"state": "off"}
+    assert match.before == "boot ok; "
+    assert match.span == (9, 27)
+
+
+@pytest.mark.integration
+def test_wait_for_match_returns_literal_match_without_groups():
+    """wait_for_match() should work with patterns matched without a regex."""
+    io = ProcessIO(start_command="echo 'a [OK] b'", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        match = io.wait_for_match(re.escape("[OK]"), timeout_sec=2.0)
+    finally:
+        io.stop()
+
+    assert match is not None
+    assert (match.text, match.groups, match.before) == ("[OK]", (), "a ")
+
+
+@pytest.mark.integration
+def test_wait_for_bytes_round_trips_binary_frame():
+    """send_bytes() and wait_for_bytes() should exchange bytes undecoded."""
+    io = ProcessIO(
+        start_command="sh -c 'stty raw -echo; echo ready; exec cat'",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    try:
+        assert io.wait_for_bytes(b"ready", timeout_sec=2.0) == b"ready"
+        io.send_bytes(b"\x02\xc3\x00\x03")
+        assert io.wait_for_bytes(b"\x02.*\x03", timeout_sec=2.0) == (
+            b"\x02\xc3\x00\x03"
+        )
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_text_decoder_joins_characters_split_across_reads():
+    """text_decoder() should decode a character split across two pieces."""
+    decoder = ProcessIO.text_decoder()
+    encoded = "状態: on".encode()
+
+    assert decoder.decode(encoded[:2]) == ""
+    assert decoder.decode(encoded[2:]) == "状態: on"
+
+
+@pytest.mark.integration
+def test_iter_lines_streams_until_end_of_output():
+    """iter_lines() should yield every line and stop when the process exits."""
+    io = ProcessIO(start_command="seq 5000", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        lines = list(io.iter_lines(timeout_sec=None))
+    finally:
+        io.stop()
+
+    assert lines == [str(i) for i in range(1, 5001)]
+
+
+@pytest.mark.integration
+def test_iter_lines_puts_unread_output_back_when_closed():
+    """Closing iter_lines() early should leave the rest for the next wait."""
+    io = ProcessIO(
+        start_command="sh -c 'printf \"one\\ntwo\\nrest\"; exec cat'",
+        options=IOOptions(log_sink=None),
+    )
+    io.start()
+    try:
+        with contextlib.closing(io.iter_lines(timeout_sec=2.0)) as lines:
+            assert next(lines) == "one"
+        assert io.wait_for("rest", timeout_sec=2.0) == "rest"
+        assert io.process.before == b"two\r\n"
+    finally:
+        io.stop()
+
+
+# =============================================================================
+# drain() / poll() tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_drain_consumes_pending_output():
+    """drain() should return all pending output so later waits skip it."""
+    io = ProcessIO(
+        start_command="sh -c 'echo stale; exec cat'", options=IOOptions(log_sink=None)
+    )
+    io.start()
+    try:
+        assert io.poll("never") is None
+        drained = io.drain(quiet_sec=0.5)
+        assert b"stale" in drained
+        assert io.wait_for("stale", timeout_sec=0.1) is None
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_drain_raises_when_not_started():
+    """drain() should raise RuntimeError before start()."""
+    io = ProcessIO(start_command="cat")
+    with pytest.raises(RuntimeError, match="Process not started"):
+        io.drain()
+
+
+# =============================================================================
+# max_buffer_size tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_wait_for_discards_output_beyond_max_buffer_size():
+    """wait_for() should keep only recent unmatched output and count the rest."""
+    io = ProcessIO(
+        start_command="seq 20000",
+        options=IOOptions(log_sink=None, max_buffer_size=1024),
+    )
+    io.start()
+    try:
+        assert io.wait_for("20000", timeout_sec=5.0) == "20000"
+        assert len(io.process.before) <= 2 * 1024
+    finally:
+        io.stop()
+
+    assert io.discarded_bytes > 100_000
+
+
+@pytest.mark.unit
+def test_discarded_bytes_is_zero_without_limit():
+    """discarded_bytes should stay 0 when max_buffer_size is not set."""
+    assert ProcessIO(start_command="cat").discarded_bytes == 0
@@ -0,0 +1,112 @@
+"""Unit tests for Reactor class."""
+
+import threading
+
+import pexpect
+import pytest
+
+from blabot.async_pexpect_io import AsyncPexpectIO
+from blabot.process_io import ProcessIO
+from blabot.reactor import Reactor
+from blabot.templated_io import IOOptions
+
+
+@pytest.fixture
+def reactor():
+    with Reactor() as reactor:
+        yield reactor
+
+
+def reactor_threads() -> list[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name == "blabot-reactor"]
+
+
+@pytest.mark.integration
+def test_sessions_share_one_reader_thread(reactor):
+    """All sessions attached to a reactor should be read by one thread."""
+    options = IOOptions(log_sink=None, reactor=reactor)
+    sessions = [ProcessIO("cat", options=options) for _ in range(5)]
+    for session in sessions:
+        session.start()
+    try:
+        assert reactor.process_count == 5
+        assert len(reactor_threads()) == 1
+        for i, session in enumerate(sessions):
+            session.send_command(f"ping {i}")
+        for i, session in enumerate(sessions):
+            assert session.wait_for(f"ping {i}", timeout_sec=2.0) == f"ping {i}"
+    finally:
+        for session in sessions:
+            session.stop()
+    assert reactor.process_count == 0
+
+
+@pytest.mark.integration
+def test_wait_for_times_out_without_output(reactor):
+    """wait_for() should time out on the reactor buffer like on the process."""
+    io = ProcessIO("cat", options=IOOptions(log_sink=None, reactor=reactor))
+    io.start()
+    try:
+        assert io.wait_for("never", timeout_sec=0.1) is None
+    finally:
+        io.stop()
+
+
+@pytest.mark.integration
+def test_wait_for_raises_eof_after_process_exits(reactor):
+    """Waits should see the end of the output of an exited process."""
+    io = ProcessIO("echo bye", options=IOOptions(log_sink=None, reactor=reactor))
+    io.start()
+    try:
+        assert io.wait_for("bye", timeout_sec=2.0) == "bye"
+        with pytest.raises(pexpect.EOF):
+            io.wait_for("never", timeout_sec=2.0)
+    finally:
+        io.stop()
+
+
+@pytest.mark.integration
+def test_reading_pauses_when_buffer_is_full():
+    """A full buffer should pause reading until the output is consumed."""
+    with Reactor(max_buffer_size=64) as reactor:
+        io = ProcessIO(
+            "sh -c 'seq 1 2000; echo done; exec cat'",
+            options=IOOptions(log_sink=None, reactor=reactor),
+        )
+        io.start()
+        try:
+            assert io.wait_for("done", timeout_sec=5.0) == "done"
+        finally:
+            io.stop()
+
+
+@pytest.mark.integration
+def test_stop_restores_process_read_method(reactor):
+    """stop() should detach the process from the reactor."""
+    io = ProcessIO("cat", options=IOOptions(log_sink=None, reactor=reactor))
+    io.start()
+    process = io.process
+    assert "read_nonblocking" in vars(process)
+
+    io.stop()
+
+    assert "read_nonblocking" not in vars(process)
+
+
+@pytest.mark.integration
+def test_attach_raises_when_closed():
+    """attach() should raise RuntimeError after close()."""
+    reactor = Reactor()
+    reactor.close()
+    io = ProcessIO("cat", options=IOOptions(log_sink=None, reactor=reactor))
+    with pytest.raises(RuntimeError, match="Reactor is closed"):
+        io.start()
+    io.process.terminate(force=True)
+
+
+@pytest.mark.unit
+def test_async_pexpect_io_rejects_io_with_reactor(reactor):
+    """AsyncPexpectIO() should reject an IO that reads through a reactor."""
+    io = ProcessIO("cat", options=IOOptions(reactor=reactor))
+    with pytest.raises(ValueError, match="reactor"):
+        AsyncPexpectIO(io)
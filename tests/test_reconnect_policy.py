@@ -0,0 +1,31 @@
+"""Unit tests for ReconnectPolicy class."""
+
+import itertools
+
+import pytest
+
+from blabot.reconnect_policy import ReconnectPolicy
+
+
+@pytest.mark.unit
+def test_delays_grow_exponentially_up_to_maximum():
+    """delays() should multiply the delay until it reaches the maximum."""
+    policy = ReconnectPolicy(initial_delay_sec=0.1, max_delay_sec=0.5, multiplier=2)
+    assert list(itertools.islice(policy.delays(), 5)) == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"initial_delay_sec": 0},
+        {"initial_delay_sec": 2.0, "max_delay_sec": 1.0},
+        {"multiplier": 0.5},
+        {"timeout_sec": -1},
+    ],
+    ids=["zero-delay", "max-below-initial", "shrinking", "negative-timeout"],
+)
+def test_policy_rejects_out_of_range_values(kwargs):
+    """ReconnectPolicy should validate its values."""
+    with pytest.raises(ValueError, match="must"):
+        ReconnectPolicy(**kwargs)
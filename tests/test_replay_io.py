@@ -0,0 +1,248 @@
+"""Unit tests for ReplayIO class."""
+
+import sys
+import time
+
+import pexpect
+import pytest
+
+from blabot.log_sink import MemorySink
+from blabot.process_io import ProcessIO
+from blabot.replay_io import ReplayError, ReplayIO
+from blabot.session_recorder import SessionRecorder
+from blabot.templated_io import IOOptions
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Recording of a prompt answering two commands, the second one slowly."""
+    path = tmp_path / "session.rec"
+    with SessionRecorder(path) as recorder:
+        recorder.received.write(b"> ")
+        recorder.sent.write(b"status\n")
+        recorder.received.write(b"status\r\nstate: idle\r\n> ")
+        recorder.sent.write(b"start\n")
+        time.sleep(0.2)
+        recorder.received.write(b"start\r\nstarted\r\n> ")
+    return path
+
+
+# =============================================================================
+# Replay tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_replay_answers_commands_from_recording(recording):
+    """Waits should match the output recorded after each command."""
+    io = ReplayIO(recording, prompt="> ", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        match = io.run_command_match("status", r"state: (\w+)")
+        assert match is not None
+        assert match.group(1) == "idle"
+        assert io.run_command("start", "started") == "started"
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_replay_times_out_immediately_for_unrecorded_output(recording):
+    """A wait for output missing from the recording should not take its timeout."""
+    io = ReplayIO(recording, prompt="> ", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        started_at = time.monotonic()
+        assert io.run_command("status", "state: busy", timeout_sec=10.0) is None
+        assert time.monotonic() - started_at < 1.0
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_replay_raises_on_unexpected_input(recording):
+    """Input differing from the recording should raise ReplayError."""
+    io = ReplayIO(recording, prompt="> ", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        with pytest.raises(ReplayError, match="start"):
+            io.send_command("start")
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_replay_raises_eof_at_end_of_recording(recording):
+    """Waiting past the end of the recording should end the output."""
+    io = ReplayIO(recording, prompt="> ", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        io.run_command("status", "idle")
+        io.run_command("start", "started")
+        with pytest.raises(pexpect.EOF):
+            io.wait_for("more")
+        assert list(io.iter_lines(timeout_sec=None)) == []
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("speed", "min_sec", "max_sec"), [(None, 0, 0.1), (2.0, 0.09, 0.5)]
+)
+def test_replay_speed_scales_recorded_delays(recording, speed, min_sec, max_sec):
+    """Output should be delayed by the recorded delay divided by the speed."""
+    io = ReplayIO(recording, prompt="> ", options=IOOptions(log_sink=None), speed=speed)
+    io.start()
+    try:
+        io.run_command("status", "idle")
+        started_at = time.monotonic()
+        assert io.run_command("start", "started", timeout_sec=1.0) == "started"
+        assert min_sec <= time.monotonic() - started_at < max_sec
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_replay_writes_replayed_output_to_log_sink(recording):
+    """The replayed session should be logged like a live one."""
+    sink = MemorySink()
+    io = ReplayIO(recording, prompt="> ", options=IOOptions(log_sink=sink))
+    io.start()
+    io.run_command("status", "idle")
+    io.stop()
+
+    assert sink.getvalue() == b"> status\nstatus\r\nstate: idle\r\n> "
+
+
+@pytest.mark.unit
+def test_iter_lines_ends_before_next_recorded_input(recording):
+    """iter_lines() should stop where the recording waits for input."""
+    io = ReplayIO(recording, prompt="> ", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        io.send_command("status")
+        started_at = time.monotonic()
+        assert list(io.iter_lines(timeout_sec=5.0)) == ["> status", "state: idle", "> "]
+        assert time.monotonic() - started_at < 1.0
+    finally:
+        io.stop()
+
+
+@pytest.fixture
+def login_recording(tmp_path):
+    """Recording that logs in and starts the target before its first prompt."""
+    path = tmp_path / "login.rec"
+    with SessionRecorder(path) as recorder:
+        recorder.received.write(b"Welcome\r\n$ ")
+        recorder.sent.write(b"./app\n")
+        recorder.received.write(b"./app\r\n> ")
+        recorder.sent.write(b"status\n")
+        recorder.received.write(b"status\r\nstate: idle\r\n> ")
+    return path
+
+
+@pytest.mark.unit
+def test_replay_skips_input_sent_before_first_prompt(login_recording):
+    """start() should skip the login and start command of the recording."""
+    io = ReplayIO(login_recording, prompt="> ", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        assert io.run_command("status", "idle") == "idle"
+    finally:
+        io.stop()
+
+    io = ReplayIO(
+        login_recording,
+        prompt="> ",
+        options=IOOptions(log_sink=None),
+        skip_setup=False,
+    )
+    io.start()
+    try:
+        with pytest.raises(ReplayError, match="app"):
+            io.run_command("status", "idle")
+    finally:
+        io.stop()
+
+
+@pytest.fixture
+def prompt_in_banner_recording(tmp_path):
+    """Recording whose login banner already contains the target's prompt."""
+    path = tmp_path / "banner.rec"
+    with SessionRecorder(path) as recorder:
+        recorder.received.write(b"Welcome> \r\n$ ")
+        recorder.sent.write(b"cd /opt\n")
+        recorder.received.write(b"cd /opt\r\n$ ")
+        recorder.sent.write(b"./app\n")
+        recorder.received.write(b"./app\r\n> ")
+        recorder.sent.write(b"status\n")
+        recorder.received.write(b"status\r\nstate: idle\r\n> ")
+    return path
+
+
+@pytest.mark.unit
+def test_replay_skips_input_up_to_the_start_command(prompt_in_banner_recording):
+    """start() should skip up to the recorded start command, not the prompt."""
+    io = ReplayIO(
+        prompt_in_banner_recording,
+        prompt="> ",
+        options=IOOptions(log_sink=None),
+        start_command="./app",
+    )
+    io.start()
+    try:
+        assert io.run_command("status", "idle") == "idle"
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_replay_rejects_start_command_missing_from_recording(login_recording):
+    """start() should fail if the start command was never recorded."""
+    io = ReplayIO(
+        login_recording,
+        prompt="> ",
+        options=IOOptions(log_sink=None),
+        start_command="./other",
+    )
+
+    with pytest.raises(ValueError, match="never sends"):
+        io.start()
+
+
+@pytest.mark.integration
+def test_replay_answers_like_the_recorded_live_session(tmp_path):
+    """A session recorded from a live process should replay the same answers."""
+    program = "while True: print(input('> ').upper())"
+    path = tmp_path / "live.rec"
+    with SessionRecorder(path) as recorder:
+        live = ProcessIO(
+            "env 'PS1=$ ' bash --norc --noprofile",
+            prompt="> ",
+            newline="\n",
+            options=IOOptions(log_sink=None, recorder=recorder),
+        )
+        live.start()
+        assert live.wait_for(r"\$ ")
+        live.send_command(f'{sys.executable} -c "{program}"')
+        recorded = [live.run_command(command, "[A-Z]+") for command in ["a", "bc"]]
+        live.stop()
+    assert recorded == ["A", "BC"]
+
+    io = ReplayIO(path, prompt="> ", newline="\n", options=IOOptions(log_sink=None))
+    io.start()
+    try:
+        assert [io.run_command(command, "[A-Z]+") for command in ["a", "bc"]] == [
+            "A",
+            "BC",
+        ]
+    finally:
+        io.stop()
+
+
+@pytest.mark.unit
+def test_replay_rejects_invalid_speed(recording):
+    """speed should be positive."""
+    with pytest.raises(ValueError, match="positive"):
+        ReplayIO(recording, speed=0)
@@ -0,0 +1,52 @@
+"""Unit tests for SendPacing and SendPacer classes."""
+
+import time
+
+import pytest
+
+from blabot.send_pacing import SendPacer, SendPacing
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"bytes_per_sec": 0}, {"line_gap_sec": -1}, {"burst_bytes": 0}],
+    ids=["rate", "gap", "burst"],
+)
+def test_send_pacing_raises_value_error_on_invalid_limit(kwargs):
+    """SendPacing() should reject limits out of range."""
+    with pytest.raises(ValueError, match=next(iter(kwargs))):
+        SendPacing(**kwargs)
+
+
+@pytest.mark.unit
+def test_send_line_splits_line_into_bursts_at_configured_rate():
+    """send_line() should write bursts no faster than the byte rate."""
+    pacer = SendPacer(SendPacing(bytes_per_sec=1000, burst_bytes=10))
+    written = []
+
+    start = time.monotonic()
+    pacer.send_line(written.append, b"x" * 60)
+    elapsed = time.monotonic() - start
+
+    assert written == [b"x" * 10] * 6
+    # The first burst is free; the other 50 bytes take 50 ms at 1000 B/s
+    assert elapsed >= 0.045
+
+
+@pytest.mark.unit
+def test_send_line_keeps_gap_between_lines():
+    """send_line() should sleep only for the part of the gap not yet elapsed."""
+    pacer = SendPacer(SendPacing(line_gap_sec=0.1))
+    written = []
+
+    pacer.send_line(written.append, b"a\n")
+    start = time.monotonic()
+    pacer.send_line(written.append, b"b\n")
+    assert time.monotonic() - start >= 0.09
+
+    time.sleep(0.1)
+    start = time.monotonic()
+    pacer.send_line(written.append, b"c\n")
+    assert time.monotonic() - start < 0.05
+    assert written == [b"a\n", b"b\n", b"c\n"]
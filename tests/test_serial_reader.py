@@ -0,0 +1,126 @@
+"""Unit tests for SerialReader class."""
+
+import os
+import pty
+import threading
+import time
+
+import pexpect
+import pytest
+import serial
+from pexpect_serial import SerialSpawn
+
+from blabot.device_io import DeviceIO
+from blabot.send_pacing import SendPacing
+from blabot.serial_reader import SerialReader
+from blabot.templated_io import IOOptions
+
+
+@pytest.fixture
+def pty_pair():
+    """Pseudo-terminal standing in for a serial link: (device side, port path)."""
+    master, slave = pty.openpty()
+    yield master, os.ttyname(slave)
+    os.close(slave)
+    os.close(master)
+
+
+def wait_until(condition, timeout_sec: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout_sec
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+# =============================================================================
+# DeviceIO integration tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_device_io_reads_bulk_output_through_reader(pty_pair):
+    """DeviceIO with a reader thread should receive fast output without loss."""
+    master, port = pty_pair
+    payload = b"".join(b"line %06d\n" % i for i in range(20000)) + b"END\n"
+    io = DeviceIO(
+        port,
+        baudrate=921600,
+        options=IOOptions(log_sink=None, send_pacing=SendPacing()),
+        reader_thread=True,
+    )
+    io.start()
+    writer = threading.Thread(target=os.write, args=(master, payload))
+    try:
+        writer.start()
+        assert io.wait_for("END", timeout_sec=5.0) == "END"
+        assert io.process.before.count(b"\n") == 20000
+    finally:
+        writer.join()
+        io.stop()
+
+    assert io.reader.bytes_read == len(payload)
+    assert io.reader.overrun_bytes == 0
+    assert io.reader.read_calls < len(payload) // 100
+    assert io.reader.bytes_per_sec > 0
+
+
+@pytest.mark.unit
+def test_device_io_sends_through_port_read_by_reader(pty_pair):
+    """Commands should still reach the device while the reader runs."""
+    master, port = pty_pair
+    io = DeviceIO(port, options=IOOptions(log_sink=None), reader_thread=True)
+    io.start()
+    try:
+        io.send_bytes(b"ping")
+        assert os.read(master, 16) == b"ping"
+        os.write(master, b"pong")
+        assert io.wait_for("pong", timeout_sec=2.0) == "pong"
+    finally:
+        io.stop()
+
+
+# =============================================================================
+# Buffer limit tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_reader_drops_oldest_output_beyond_buffer_size(pty_pair):
+    """The reader should keep the latest output and count dropped bytes."""
+    master, port = pty_pair
+    device = serial.Serial(port, timeout=0.1)
+    process = SerialSpawn(device)
+    with SerialReader(device, max_buffer_size=1024) as reader:
+        reader.attach(process)
+        os.write(master, bytes(range(256)) * 16)
+
+        assert wait_until(lambda: reader.bytes_read == 4096)
+        assert reader.overrun_bytes == 3072
+        assert process.read_nonblocking(2048, timeout=0) == bytes(range(256)) * 4
+    device.close()
+
+
+@pytest.mark.unit
+def test_reader_close_restores_process_read(pty_pair):
+    """close() should stop the thread and give the process its reads back."""
+    _, port = pty_pair
+    device = serial.Serial(port, timeout=0.1)
+    process = SerialSpawn(device)
+    reader = SerialReader(device)
+    reader.attach(process)
+
+    reader.close()
+
+    assert "read_nonblocking" not in vars(process)
+    with pytest.raises(pexpect.TIMEOUT):
+        process.read_nonblocking(1, timeout=0.1)
+    device.close()
+
+
+@pytest.mark.unit
+def test_reader_rejects_invalid_sizes():
+    """SerialReader should require positive buffer and chunk sizes."""
+    with pytest.raises(ValueError, match="at least 1"):
+        SerialReader(serial.Serial(), chunk_size=0)
@@ -0,0 +1,75 @@
+"""Unit tests for SessionGroup class."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from blabot.session_group import SessionGroup
+from blabot.templated_io import TemplatedIO
+
+
+def make_session() -> MagicMock:
+    return MagicMock(spec=TemplatedIO)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_workers", [0, -1], ids=["zero", "negative"])
+def test_init_raises_value_error_when_max_workers_is_invalid(max_workers):
+    """SessionGroup() should raise ValueError when max_workers is less than 1."""
+    with pytest.raises(ValueError, match="max_workers"):
+        SessionGroup([], max_workers=max_workers)
+
+
+@pytest.mark.unit
+def test_run_command_returns_results_in_session_order():
+    """run_command() should return each session's result in session order."""
+    sessions = [make_session() for _ in range(3)]
+    for i, session in enumerate(sessions):
+        session.run_command.return_value = f"result {i}"
+
+    results = SessionGroup(sessions).run_command("show", "result", timeout_sec=1.0)
+
+    assert [r.value for r in results] == ["result 0", "result 1", "result 2"]
+    assert [r.session for r in results] == sessions
+    assert all(r.ok and r.elapsed_sec >= 0 for r in results)
+    sessions[0].run_command.assert_called_once_with("show", "result", 1.0, 1, None)
+
+
+@pytest.mark.unit
+def test_map_collects_errors_without_stopping_other_sessions():
+    """Errors should be recorded per session while the others still run."""
+    failing, working = make_session(), make_session()
+    failing.start.side_effect = RuntimeError("Failed to login")
+
+    results = SessionGroup([failing, working]).start()
+
+    assert not results[0].ok
+    assert isinstance(results[0].error, RuntimeError)
+    assert results[1].ok
+    working.start.assert_called_once_with()
+
+
+@pytest.mark.unit
+def test_map_runs_sessions_concurrently_up_to_max_workers():
+    """map() should run at most max_workers operations at the same time."""
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def operation(_session):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.1)
+        with lock:
+            running -= 1
+
+    group = SessionGroup([make_session() for _ in range(8)], max_workers=4)
+    start = time.monotonic()
+    group.map(operation)
+
+    assert peak == 4
+    assert time.monotonic() - start < 0.4
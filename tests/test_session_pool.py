@@ -0,0 +1,83 @@
+"""Unit tests for SessionPool class."""
+
+import sys
+import time
+
+import pytest
+
+from blabot.session_pool import SessionPool
+
+SLOW_START_COMMAND = (
+    f"{sys.executable} -c \"import time; time.sleep(0.3); input('> ')\""
+)
+
+
+def wait_until(condition, timeout_sec=5.0):
+    deadline = time.monotonic() + timeout_sec
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("size", [0, -1], ids=["zero", "negative"])
+def test_init_raises_value_error_when_size_is_invalid(size):
+    """SessionPool() should raise ValueError when size is less than 1."""
+    with pytest.raises(ValueError, match="size"):
+        SessionPool("cat", size=size)
+
+
+@pytest.mark.unit
+def test_acquire_raises_when_not_started():
+    """acquire() should raise RuntimeError before start()."""
+    pool = SessionPool("cat")
+    with pytest.raises(RuntimeError, match="Pool not started"), pool.acquire():
+        pass
+
+
+@pytest.mark.integration
+def test_acquire_yields_session_waiting_at_prompt():
+    """acquire() should yield a started session with its prompt unread."""
+    pool = SessionPool(SLOW_START_COMMAND, size=1, prompt="> ")
+    pool.start()
+    try:
+        with pool.acquire(timeout_sec=5.0) as session:
+            assert session.process is not None
+            assert session.wait_for("> ", timeout_sec=0.1) == "> "
+    finally:
+        pool.stop()
+
+
+@pytest.mark.integration
+def test_acquire_stops_session_and_replenishes_on_release():
+    """Released sessions should be stopped and replaced in the background."""
+    pool = SessionPool(SLOW_START_COMMAND, size=2, prompt="> ")
+    pool.start()
+    try:
+        assert wait_until(lambda: pool.ready_count == 2)
+        with pool.acquire() as session:
+            assert pool.ready_count == 1
+        assert session.process is None
+        assert wait_until(lambda: pool.ready_count == 2)
+    finally:
+        pool.stop()
+
+
+@pytest.mark.integration
+def test_acquire_raises_when_no_session_becomes_ready():
+    """acquire() should raise RuntimeError when the prompt never appears."""
+    pool = SessionPool("cat", size=1, prompt="> ", ready_timeout_sec=0.1)
+    pool.start()
+    try:
+        with (
+            pytest.raises(RuntimeError, match="No session became ready"),
+            pool.acquire(timeout_sec=0.3),
+        ):
+            pass
+        assert isinstance(pool.last_error, RuntimeError)
+        with pytest.raises(AttributeError):
+            pool.last_error = None
+    finally:
+        pool.stop()
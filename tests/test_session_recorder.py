@@ -0,0 +1,106 @@
+"""Unit tests for SessionRecorder class."""
+
+import sys
+
+import pytest
+
+from blabot.process_io import ProcessIO
+from blabot.session_recorder import (
+    MAGIC,
+    RecordedChunk,
+    SessionRecorder,
+    read_recording,
+)
+from blabot.templated_io import IOOptions
+from blabot.transcript import TranscriptBuffer
+
+# =============================================================================
+# Recording file tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_recording_round_trips_chunks_in_order(tmp_path):
+    """read_recording() should return the written chunks with their times."""
+    path = tmp_path / "session.rec"
+    with SessionRecorder(path) as recorder:
+        recorder.received.write(b"login: ")
+        recorder.sent.write(b"root\n")
+        recorder.sent.write(b"")
+        recorder.received.write(bytes(range(256)))
+
+    chunks = read_recording(path)
+
+    assert [(c.direction, c.data) for c in chunks] == [
+        ("read", b"login: "),
+        ("send", b"root\n"),
+        ("read", bytes(range(256))),
+    ]
+    assert 0 <= chunks[0].time_sec <= chunks[1].time_sec <= chunks[2].time_sec
+    assert path.stat().st_size == len(MAGIC) + 3 * 13 + 7 + 5 + 256
+
+
+@pytest.mark.unit
+def test_read_recording_rejects_other_files(tmp_path):
+    """read_recording() should reject files without the magic line."""
+    path = tmp_path / "other"
+    path.write_bytes(b"plain text\n")
+
+    with pytest.raises(ValueError, match="not a blabot recording"):
+        read_recording(path)
+
+
+@pytest.mark.unit
+def test_read_recording_rejects_truncated_file(tmp_path):
+    """read_recording() should report a record cut short."""
+    path = tmp_path / "session.rec"
+    with SessionRecorder(path) as recorder:
+        recorder.sent.write(b"command\n")
+    path.write_bytes(path.read_bytes()[:-3])
+
+    with pytest.raises(ValueError, match="truncated"):
+        read_recording(path)
+
+
+@pytest.mark.unit
+def test_recorder_ignores_chunks_after_close(tmp_path):
+    """Chunks written after close() should be dropped without an error."""
+    path = tmp_path / "session.rec"
+    recorder = SessionRecorder(path)
+    recorder.sent.write(b"command\n")
+    recorder.close()
+
+    recorder.received.write(b"late output")
+
+    assert [c.data for c in read_recording(path)] == [b"command\n"]
+
+
+# =============================================================================
+# IO integration tests
+# =============================================================================
+
+
+@pytest.mark.integration
+def test_recorder_records_io_alongside_transcript(tmp_path):
+    """An IO should record its input and output and still fill its transcript."""
+    path = tmp_path / "session.rec"
+    program = "print(input('> ') * 2)"
+    with SessionRecorder(path) as recorder:
+        io = ProcessIO(
+            start_command=f'{sys.executable} -c "{program}"',
+            prompt="> ",
+            options=IOOptions(log_sink=None, transcript_size=1024, recorder=recorder),
+        )
+        io.start()
+        assert io.run_command("ab", "abab") == "abab"
+        io.stop()
+
+    chunks = read_recording(path)
+    sent = b"".join(c.data for c in chunks if c.direction == "send")
+    received = b"".join(c.data for c in chunks if c.direction == "read")
+
+    assert chunks[0] == RecordedChunk(chunks[0].time_sec, "read", b"> ")
+    assert sent.startswith(b"ab\n")
+    assert b"abab" in received
+    assert isinstance(io.transcript, TranscriptBuffer)
+    assert io.transcript.slice() == received
@@ -1,11 +1,52 @@
 """Unit tests for SSHProcessIO class."""
 
+import os
+import shlex
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pexpect
 import pytest
 
-from blabot.ssh_io import SSHConfig, SSHProcessIO
+from blabot.ssh_io import SSHConfig, SSHProcessIO, close_shared_connections
+from blabot.templated_io import IOOptions
+
+# Stand-in for ssh: records its arguments, then acts as the remote shell.
+# The control socket is a plain file: a login creating it is the master, a
+# login finding it reuses the master, and control commands remove it.
+SSH_SHIM = """#!/bin/sh
+printf '%s\\n' "$*" >> "$SSH_SHIM_LOG"
+control_path=
+for arg in "$@"; do
+    case $arg in ControlPath=*) control_path=${arg#ControlPath=} ;; esac
+done
+case " $* " in *" -O "*) rm -f "$control_path"; exit 0 ;; esac
+if [ -n "$control_path" ]; then
+    if [ -e "$control_path" ]; then
+        echo reused >> "$SSH_SHIM_LOG.roles"
+    else
+        : > "$control_path"
+        echo master >> "$SSH_SHIM_LOG.roles"
+    fi
+fi
+PS1='$ ' exec bash --norc --noprofile
+"""
+
+
+@pytest.fixture
+def ssh_shim(tmp_path, monkeypatch):
+    """Put an `ssh` shim first on PATH and return the log of its calls."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    shim = bin_dir / "ssh"
+    shim.write_text(SSH_SHIM)
+    shim.chmod(0o755)
+    log = tmp_path / "ssh.log"
+    monkeypatch.setenv("PATH", str(bin_dir), prepend=os.pathsep)
+    monkeypatch.setenv("SSH_SHIM_LOG", str(log))
+    yield log
+    close_shared_connections()
+
 
 # =============================================================================
 # start() tests
@@ -51,8 +92,136 @@ def test_start_raises_when_login_fails():
 
     with patch("blabot.ssh_io.pexpect.spawn") as mock_spawn:
         mock_process = MagicMock()
-        mock_process.expect.side_effect = pexpect.TIMEOUT("timeout")
+        mock_process.expect_list.side_effect = pexpect.TIMEOUT("timeout")
         mock_spawn.return_value = mock_process
 
         with pytest.raises(RuntimeError, match="Failed to login"):
             io.start()
+
+
+# =============================================================================
+# Connection sharing tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_start_adds_control_master_options_when_sharing_connection():
+    """start() should share the connection via ControlMaster when enabled."""
+    config = SSHConfig(
+        user_name="testuser",
+        host_name="192.168.1.100",
+        key_path="/home/user/.ssh/id_rsa",
+        share_connection=True,
+        control_persist_sec=60,
+    )
+    io = SSHProcessIO(start_command="python app.py", ssh_config=config)
+
+    with (
+        patch("blabot.ssh_io.pexpect.spawn") as mock_spawn,
+        patch("blabot.ssh_io.subprocess.run"),
+    ):
+        mock_process = MagicMock()
+        mock_process.after = b"$"
+        mock_spawn.return_value = mock_process
+
+        io.start()
+        close_shared_connections()
+
+    ssh_login_cmd = mock_spawn.call_args[0][0]
+    assert ssh_login_cmd.startswith("ssh -i /home/user/.ssh/id_rsa -p 22 ")
+    assert "-o ControlMaster=auto" in ssh_login_cmd
+    assert "-o ControlPath=" in ssh_login_cmd
+    assert "-o ControlPersist=60" in ssh_login_cmd
+    assert ssh_login_cmd.endswith(" testuser@192.168.1.100")
+
+
+@pytest.mark.unit
+def test_close_shared_connections_stops_control_masters():
+    """close_shared_connections() should ask each shared connection to stop."""
+    config = SSHConfig(
+        user_name="testuser",
+        host_name="192.168.1.100",
+        key_path="/home/user/.ssh/id_rsa",
+        port=2222,
+        share_connection=True,
+    )
+    io = SSHProcessIO(start_command="python app.py", ssh_config=config)
+
+    with (
+        patch("blabot.ssh_io.pexpect.spawn") as mock_spawn,
+        patch("blabot.ssh_io.subprocess.run") as mock_run,
+    ):
+        mock_spawn.return_value = MagicMock(after=b"$")
+        io.start()
+
+        close_shared_connections()
+
+    ssh_control_command = mock_run.call_args[0][0]
+    assert ssh_control_command[:3] == ["ssh", "-O", "stop"]
+    assert ssh_control_command[-3:] == ["-p", "2222", "testuser@192.168.1.100"]
+
+
+@pytest.mark.unit
+def test_close_shared_connection_does_nothing_without_sharing():
+    """close_shared_connection() should not run ssh when sharing is disabled."""
+    config = SSHConfig(
+        user_name="testuser",
+        host_name="192.168.1.100",
+        key_path="/home/user/.ssh/id_rsa",
+    )
+    io = SSHProcessIO(start_command="python app.py", ssh_config=config)
+
+    with patch("blabot.ssh_io.subprocess.run") as mock_run:
+        io.close_shared_connection()
+
+    mock_run.assert_not_called()
+
+
+@pytest.mark.integration
+def test_shared_connection_is_reused_and_stopped_through_ssh(ssh_shim):
+    """Sessions should reuse one master that close_shared_connections stops."""
+    config = SSHConfig(
+        user_name="testuser",
+        host_name="example.test",
+        key_path="/home/user/.ssh/id_rsa",
+        port=2222,
+        share_connection=True,
+        control_persist_sec=60,
+    )
+    sessions = [
+        SSHProcessIO(
+            "echo started",
+            ssh_config=config,
+            newline="\n",
+            options=IOOptions(log_sink=None),
+        )
+        for _ in range(2)
+    ]
+    for io in sessions:
+        io.start()
+        assert io.wait_for("started", timeout_sec=2.0) == "started"
+    for io in sessions:
+        io.stop()
+
+    logins = [shlex.split(line) for line in ssh_shim.read_text().splitlines()]
+    control_paths = {arg for args in logins for arg in args if "ControlPath=" in arg}
+    assert len(logins) == 2
+    assert all("ControlMaster=auto" in args for args in logins)
+    assert len(control_paths) == 1
+    roles = Path(f"{ssh_shim}.roles").read_text().split()
+    assert roles == ["master", "reused"]
+
+    close_shared_connections()
+
+    calls = [shlex.split(line) for line in ssh_shim.read_text().splitlines()]
+    control_path = control_paths.pop()
+    assert calls[2] == [
+        "-O",
+        "stop",
+        "-o",
+        control_path,
+        "-p",
+        "2222",
+        "testuser@example.test",
+    ]
+    assert not Path(control_path.removeprefix("ControlPath=")).parent.exists()
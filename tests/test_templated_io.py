@@ -1,8 +1,11 @@
 """Unit tests for TemplatedIO class."""
 
+import re
+import time
+
 import pytest
 
-from blabot.templated_io import TemplatedIO
+from blabot.templated_io import IOOptions, PatternMatch, TemplatedIO
 
 
 class StubIO(TemplatedIO):
@@ -11,12 +14,20 @@ class StubIO(TemplatedIO):
     Records method calls and returns pre-configured responses.
     """
 
-    def __init__(self, prompt: str = "", newline: str = "") -> None:
-        super().__init__(prompt, newline)
+    def __init__(
+        self,
+        prompt: str = "",
+        newline: str = "",
+        options: IOOptions | None = None,
+    ) -> None:
+        super().__init__(prompt, newline, options)
         self.call_history: list[str] = []
         self.commands_sent: list[str] = []
         self.wait_for_responses: list[str | None] = []
         self._wait_for_call_index = 0
+        self.wait_for_any_responses: list[tuple[int, str] | None] = []
+        self.fail_on_history: list[list[str] | None] = []
+        self.drain_responses: list[bytes] = []
 
     def start(self) -> None:
         self.call_history.append("start")
@@ -25,6 +36,7 @@ class StubIO(TemplatedIO):
         self.call_history.append("stop")
 
     def send_command(self, command: str) -> None:
+        self._clear_prompt()
         self.commands_sent.append(command)
         self.call_history.append(f"send_command:{command}")
 
@@ -33,15 +45,64 @@ class StubIO(TemplatedIO):
         if self._wait_for_call_index < len(self.wait_for_responses):
             response = self.wait_for_responses[self._wait_for_call_index]
             self._wait_for_call_index += 1
+            if response is not None:
+                self._track_prompt(response.encode())
             return response
         return None
 
+    def drain(self, quiet_sec: float = 0.0, timeout_sec: float = 3.0) -> bytes:
+        self.call_history.append(f"drain:{quiet_sec}:{timeout_sec}")
+        if self.drain_responses:
+            return self.drain_responses.pop(0)
+        return b""
+
+    def wait_for_any(
+        self,
+        patterns: list[str],
+        timeout_sec: float = 3.0,  # noqa: ARG002
+        fail_on: list[str] | None = None,
+    ) -> tuple[int, str] | None:
+        self.call_history.append(f"wait_for_any:{patterns}")
+        self.fail_on_history.append(fail_on)
+        if self.wait_for_any_responses:
+            return self.wait_for_any_responses.pop(0)
+        return None
+
     def set_wait_for_responses(self, responses: list[str | None]) -> None:
         """Configure the sequence of responses for wait_for() calls."""
         self.wait_for_responses = responses
         self._wait_for_call_index = 0
 
 
+class MinimalIO(TemplatedIO):
+    """Subclass implementing only the abstract methods, like third-party IOs.
+
+    Output is a fixed string consumed by matches.
+    """
+
+    def __init__(self, output: str) -> None:
+        super().__init__()
+        self.output = output
+        self.expected: list[str] = []
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def send_command(self, command: str) -> None:
+        pass
+
+    def wait_for(self, expect: str, timeout_sec: float = 3.0) -> str | None:  # noqa: ARG002
+        self.expected.append(expect)
+        match = re.search(expect, self.output, re.DOTALL)
+        if match is None:
+            return None
+        self.output = self.output[match.end() :]
+        return match.group()
+
+
 # =============================================================================
 # restart() tests
 # =============================================================================
@@ -97,6 +158,26 @@ def test_wait_for_prompt_returns_false_when_prompt_never_found():
     assert result is False
 
 
+@pytest.mark.unit
+def test_wait_for_prompt_skips_wait_when_prompt_already_consumed():
+    """wait_for_prompt() should not wait if a wait already consumed the prompt."""
+    io = StubIO(prompt=">>> ")
+    io.set_wait_for_responses(["done\n>>> "])
+    io.wait_for("done\n>>> ")
+    assert io.wait_for_prompt() is True
+    assert io.call_history == ["wait_for:done\n>>> "]
+
+
+@pytest.mark.unit
+def test_wait_for_prompt_waits_again_after_command_is_sent():
+    """Sending a command should make wait_for_prompt() wait for a new prompt."""
+    io = StubIO(prompt=">>> ")
+    io.set_wait_for_responses([">>> ", None, None])
+    assert io.wait_for_prompt() is True
+    io.send_command("cmd")
+    assert io.wait_for_prompt() is False
+
+
 # =============================================================================
 # run_command() tests
 # =============================================================================
@@ -159,14 +240,255 @@ def test_run_command_does_not_send_command_when_attempts_is_invalid(attempts):
     assert io.commands_sent == []
 
 
+@pytest.mark.unit
+def test_run_command_with_pattern_list_uses_wait_for_any():
+    """run_command() should wait for any pattern when a list is given."""
+    io = StubIO(prompt="")
+    io.wait_for_any_responses = [(1, "does not change")]
+    result = io.run_command("cmd", expect=["changed", "does not change"])
+    assert result == (1, "does not change")
+    assert io.call_history == [
+        "send_command:cmd",
+        "wait_for_any:['changed', 'does not change']",
+    ]
+
+
+@pytest.mark.unit
+def test_run_command_with_pattern_list_retries_on_failure():
+    """run_command() should retry pattern lists like single patterns."""
+    io = StubIO(prompt="")
+    io.wait_for_any_responses = [None, (0, "changed")]
+    result = io.run_command("cmd", expect=["changed", "error"], attempts=2)
+    assert result == (0, "changed")
+    assert io.commands_sent == ["cmd", "cmd"]
+
+
+@pytest.mark.unit
+def test_wait_for_any_default_returns_earliest_matching_pattern():
+    """The default wait_for_any() should work with only wait_for implemented."""
+    io = MinimalIO("state: off\nerror: busy\n")
+
+    assert io.wait_for_any(["error: \\w+", "state: (on|off)"]) == (1, "state: off")
+    assert io.wait_for_any(["error: \\w+", "state: (on|off)"]) == (0, "error: busy")
+    assert io.wait_for_any(["error", "state"]) is None
+    assert len(io.expected) == 3
+
+
+@pytest.mark.unit
+def test_wait_for_any_default_raises_value_error_without_patterns():
+    """The default wait_for_any() should require at least one pattern."""
+    with pytest.raises(ValueError, match="At least one pattern"):
+        MinimalIO("").wait_for_any([])
+
+
+@pytest.mark.unit
+def test_drain_default_consumes_output_through_wait_for():
+    """The default drain() should return all output that wait_for() yields."""
+    io = MinimalIO("stale \u72b6\u614b\n")
+
+    assert io.drain().decode("utf-8") == "stale \u72b6\u614b\n"
+    assert io.drain() == b""
+
+
+@pytest.mark.unit
+def test_run_command_passes_fail_on_to_wait():
+    """run_command() should forward failure patterns to the response wait."""
+    io = StubIO(prompt="")
+    io.wait_for_any_responses = [(0, "success")]
+    io.run_command("cmd", expect=["success"], fail_on=["Invalid command:"])
+    assert io.fail_on_history == [["Invalid command:"]]
+
+
+@pytest.mark.unit
+def test_wait_for_prompt_ignores_failure_patterns():
+    """wait_for_prompt() should not pass failure patterns to wait_for()."""
+    io = StubIO(prompt=">>> ", options=IOOptions(fail_patterns=["panic"]))
+    io.set_wait_for_responses([">>> "])
+    assert io.wait_for_prompt() is True
+    assert io.call_history == ["wait_for:>>> "]
+
+
+@pytest.mark.unit
+def test_helpers_work_with_wait_for_without_fail_on():
+    """Subclasses whose wait_for() takes no fail_on should keep working."""
+    io = MinimalIO("ready\nvalue=42\nrest")
+
+    assert io.poll("ready") == "ready"
+    assert io.run_command("cmd", expect=["none", "value=42"]) == (1, "value=42")
+    assert io.drain() == b"\nrest"
+
+
+@pytest.mark.unit
+def test_failure_patterns_require_subclass_support():
+    """Failure patterns should be rejected if wait_for() cannot search them."""
+    io = MinimalIO("ready")
+
+    with pytest.raises(NotImplementedError, match="MinimalIO"):
+        io.run_command("cmd", expect="ready", fail_on=["panic"])
+    assert io.expected == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("prompt", "expect"), [("", ""), (">>> ", ["a", "b"])], ids=["no-prompt", "list"]
+)
+def test_run_command_capture_rejects_unsupported_arguments(prompt, expect):
+    """run_command(capture=True) should need a prompt and a single pattern."""
+    io = StubIO(prompt=prompt)
+    with pytest.raises(ValueError, match="capture"):
+        io.run_command("ls", expect, capture=True)
+    assert io.commands_sent == []
+
+
+# =============================================================================
+# run_commands() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_run_commands_sends_window_ahead_of_responses():
+    """run_commands() should keep up to `window` commands in flight."""
+    io = StubIO(prompt="")
+    io.set_wait_for_responses(["A", "B", None])
+    results = io.run_commands([("a", "A"), ("b", "B"), ("c", "C")], window=2)
+    assert results == ["A", "B", None]
+    assert io.call_history == [
+        "send_command:a",
+        "send_command:b",
+        "wait_for:A",
+        "send_command:c",
+        "wait_for:B",
+        "wait_for:C",
+    ]
+
+
+@pytest.mark.unit
+def test_run_commands_aligns_responses_by_prompt():
+    """run_commands() should end each response at the next prompt."""
+    io = StubIO(prompt=">>> ")
+    io.set_wait_for_responses([">>> ", ">>> "])
+    io.wait_for_any_responses = [(0, "A"), (1, ">>> ")]
+    results = io.run_commands([("a", "A"), ("b", "B")])
+    assert results == ["A", None]
+    assert io.call_history == [
+        "wait_for:>>> ",
+        "send_command:a",
+        "send_command:b",
+        "wait_for_any:['A', '>>> ']",
+        "wait_for:>>> ",
+        "wait_for_any:['B', '>>> ']",
+    ]
+
+
+@pytest.mark.unit
+def test_run_commands_raises_when_prompt_is_lost():
+    """run_commands() should raise RuntimeError when no prompt ends a response."""
+    io = StubIO(prompt=">>> ")
+    io.set_wait_for_responses([">>> "])
+    with pytest.raises(RuntimeError, match="Prompt does not appear"):
+        io.run_commands([("a", "A")])
+
+
+@pytest.mark.unit
+def test_run_commands_raises_value_error_when_window_is_invalid():
+    """run_commands() should raise ValueError when window is less than 1."""
+    io = StubIO()
+    with pytest.raises(ValueError, match="window"):
+        io.run_commands([("a", "A")], window=0)
+
+
 # =============================================================================
 # wait_and_consume_logs() tests
 # =============================================================================
 
 
 @pytest.mark.unit
-def test_wait_and_consume_logs_calls_wait_for_with_wildcard():
-    """wait_and_consume_logs() should call wait_for with '.*' pattern."""
+def test_wait_and_consume_logs_drains_output():
+    """wait_and_consume_logs() should drain output within the timeout."""
     io = StubIO()
     io.wait_and_consume_logs(timeout_sec=1.0)
-    assert "wait_for:.*" in io.call_history
+    assert io.call_history == ["drain:0.0:1.0"]
+
+
+# =============================================================================
+# poll() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_poll_waits_with_zero_timeout():
+    """poll() should search the available output without waiting."""
+    io = StubIO()
+    io.set_wait_for_responses(["ready"])
+    assert io.poll("ready") == "ready"
+    assert io.call_history == ["wait_for:ready"]
+
+
+# =============================================================================
+# wait_for_match() / run_command_match() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_wait_for_match_returns_groups_of_matched_string():
+    """wait_for_match() should return the groups of the string wait_for found."""
+    io = StubIO()
+    io.set_wait_for_responses(["Sample status: on"])
+
+    match = io.wait_for_match("Sample status: (?P<state>on|off)")
+
+    assert match == PatternMatch("Sample status: on", ("on",), {"state": "on"})
+    assert match.group(1) == match.group("state") == "on"
+
+
+@pytest.mark.unit
+def test_wait_for_match_returns_none_on_timeout():
+    """wait_for_match() should return None when wait_for() times out."""
+    io = StubIO()
+    assert io.wait_for_match("ready") is None
+
+
+@pytest.mark.unit
+def test_run_command_match_retries_until_match():
+    """run_command_match() should resend the command like run_command()."""
+    io = StubIO()
+    io.set_wait_for_responses([None, "value=42"])
+
+    match = io.run_command_match("get", r"value=(\d+)", attempts=2)
+
+    assert match is not None
+    assert match.group(1) == "42"
+    assert io.commands_sent == ["get", "get"]
+
+
+@pytest.mark.unit
+def test_pattern_match_span_follows_before():
+    """PatternMatch.span should locate the match after the preceding output."""
+    match = PatternMatch("OK", before="abc\n")
+    assert match.span == (4, 6)
+    with pytest.raises(IndexError):
+        match.group(1)
+
+
+# =============================================================================
+# iter_lines() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_iter_lines_joins_lines_split_across_reads():
+    """iter_lines() should yield complete lines with line ends normalized."""
+    io = StubIO()
+    io.drain_responses = [b"one\r\ntw", b"o\r\r\n\xe7\x8a", b"\xb6\n", b"tail"]
+
+    assert list(io.iter_lines(timeout_sec=0.2)) == ["one", "two", "状", "tail"]
+
+
+@pytest.mark.unit
+def test_iter_lines_ends_after_timeout_without_lines():
+    """iter_lines() should stop when no line arrives within the timeout."""
+    io = StubIO()
+
+    start = time.monotonic()
+    assert list(io.iter_lines(timeout_sec=0.1)) == []
+    assert time.monotonic() - start < 1.0
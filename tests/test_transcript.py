@@ -0,0 +1,173 @@
+"""Unit tests for TranscriptBuffer class."""
+
+import re
+from unittest.mock import patch
+
+import pytest
+
+from blabot.transcript import TranscriptBuffer
+
+# =============================================================================
+# write() / slice() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("capacity", [0, -1], ids=["zero", "negative"])
+def test_init_raises_value_error_when_capacity_is_invalid(capacity):
+    """TranscriptBuffer() should raise ValueError when capacity is less than 1."""
+    with pytest.raises(ValueError, match="capacity"):
+        TranscriptBuffer(capacity)
+
+
+@pytest.mark.unit
+def test_slice_returns_all_bytes_before_wrapping():
+    """slice() should return everything written while the buffer is not full."""
+    buffer = TranscriptBuffer(16)
+    buffer.write(b"hello ")
+    buffer.write(b"world")
+
+    assert buffer.slice() == b"hello world"
+    assert (buffer.start_offset, buffer.end_offset) == (0, 11)
+
+
+@pytest.mark.unit
+def test_write_keeps_only_latest_bytes_when_full():
+    """write() should overwrite the oldest bytes once capacity is reached."""
+    buffer = TranscriptBuffer(8)
+    buffer.write(b"abcdef")
+    buffer.write(b"ghijkl")
+
+    assert buffer.slice() == b"efghijkl"
+    assert (buffer.start_offset, buffer.end_offset) == (4, 12)
+
+
+@pytest.mark.unit
+def test_write_keeps_tail_of_chunk_larger_than_capacity():
+    """write() should keep the last bytes of a chunk larger than the buffer."""
+    buffer = TranscriptBuffer(4)
+    buffer.write(b"x")
+    buffer.write(b"0123456789")
+
+    assert buffer.slice() == b"6789"
+    assert buffer.end_offset == 11
+
+
+@pytest.mark.unit
+def test_slice_uses_absolute_offsets_and_clamps_to_kept_range():
+    """slice() should address bytes by absolute offset."""
+    buffer = TranscriptBuffer(8)
+    buffer.write(b"abcdefghijkl")
+
+    assert buffer.slice(6, 9) == b"ghi"
+    assert buffer.slice(0, 6) == b"ef"
+    assert buffer.slice(20) == b""
+
+
+# =============================================================================
+# search() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "pattern",
+    ["ERR\\d", b"ERR\\d", re.compile(b"ERR\\d")],
+    ids=["str", "bytes", "compiled"],
+)
+def test_search_returns_absolute_span_of_first_match(pattern):
+    """search() should return the absolute offsets of the first match."""
+    buffer = TranscriptBuffer(16)
+    buffer.write(b"0123456789")
+    buffer.write(b"ok ERR1 ERR2")
+
+    assert buffer.search(pattern) == (13, 17)
+
+
+@pytest.mark.unit
+def test_search_finds_match_across_ring_seam():
+    """search() should find matches spanning the end and start of the ring."""
+    buffer = TranscriptBuffer(8)
+    buffer.write(b"......pa")
+    buffer.write(b"nic...")
+
+    span = buffer.search("panic")
+
+    assert span == (6, 11)
+    assert buffer.slice(*span) == b"panic"
+
+
+@pytest.mark.unit
+def test_search_prefers_leftmost_match_spanning_ring_seam():
+    """search() should not stop at a shorter match before the ring seam."""
+    buffer = TranscriptBuffer(8)
+    buffer.write(b"......pa")
+    buffer.write(b"nic...")
+
+    assert buffer.search("panic|pa") == (6, 11)
+
+
+@pytest.mark.unit
+def test_search_starts_from_given_offset():
+    """search() should ignore matches before the start offset."""
+    buffer = TranscriptBuffer(32)
+    buffer.write(b"ERR ok ERR")
+
+    assert buffer.search("ERR", start=1) == (7, 10)
+    assert buffer.search("missing") is None
+
+
+@pytest.mark.unit
+def test_search_clamps_old_start_offset_after_wrapping():
+    """search() should report absolute offsets when start was discarded."""
+    buffer = TranscriptBuffer(8)
+    buffer.write(b"." * 20)
+    buffer.write(b"X!")
+
+    assert buffer.search("X", start=0) == (20, 21)
+    assert buffer.search("X", start=3) == (20, 21)
+
+
+# =============================================================================
+# offset_at() / since() tests
+# =============================================================================
+
+
+@pytest.mark.unit
+def test_since_returns_bytes_received_after_time():
+    """since() should return the output received at or after the given time."""
+    buffer = TranscriptBuffer(64)
+    with patch("blabot.transcript.time.time", side_effect=[100.0, 200.0, 300.0]):
+        buffer.write(b"boot ")
+        buffer.write(b"login ")
+        buffer.write(b"panic")
+
+    assert buffer.offset_at(250.0) == 11
+    assert buffer.since(200.0) == b"login panic"
+    assert buffer.since(0.0) == b"boot login panic"
+
+
+@pytest.mark.unit
+def test_offset_at_clamps_to_kept_range_after_wrapping():
+    """offset_at() should not point before the oldest kept byte."""
+    buffer = TranscriptBuffer(4)
+    with patch("blabot.transcript.time.time", side_effect=[100.0, 200.0]):
+        buffer.write(b"abcd")
+        buffer.write(b"ef")
+
+    assert buffer.offset_at(50.0) == 2
+    assert buffer.since(150.0) == b"ef"
+
+
+@pytest.mark.unit
+def test_offset_at_stays_correct_over_many_wraps():
+    """offset_at() should index the kept bytes after old entries are dropped."""
+    buffer = TranscriptBuffer(4)
+    with patch("blabot.transcript.time.time", side_effect=range(1, 101)):
+        for _ in range(100):
+            buffer.write(b"ab")
+
+    assert buffer.offset_at(0.0) == 196
+    assert buffer.offset_at(99.0) == 196
+    assert buffer.offset_at(100.0) == 198
+    assert buffer.since(100.0) == b"ab"